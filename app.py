@@ -1,10 +1,18 @@
 import streamlit as st
 import os
+import shutil
 import tempfile
-from src.parser import ResumeParser
-from src.rag_engine import RAGEngine
-import pandas as pd
-import plotly.express as px
+import time
+from contextlib import contextmanager
+from src.batch import results_table, screen_resumes
+from src.cache import ResultCache
+from src.jobs import FINISHED_STATES, JOB_STATES, AnalysisJobs, JobStore
+from src.tracing import tracer
+
+# Streamlit reruns this script on every interaction; everything expensive below is either a
+# process-wide cached resource or imported on first use (parser loaders, LangChain/Groq, pandas,
+# plotly, sentence-transformers), so warm reruns only redraw the page
+run_start = time.perf_counter()
 
 # Validations
 if "GROQ_API_KEY" not in os.environ:
@@ -107,6 +115,69 @@ st.markdown("""
     <div class="sub-header">AI-Powered Screening & Matching System</div>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def startup_profile():
+    # Process-wide: the first script run is the cold start, later runs are warm reruns
+    return {"first_render": None, "last_rerun": None, "resources": {}}
+
+
+@contextmanager
+def profile_load(name):
+    # Records how long a cached resource took to import and build, the first time it is needed
+    start = time.perf_counter()
+    yield
+    startup_profile()["resources"][name] = time.perf_counter() - start
+
+
+@st.cache_resource
+def get_result_cache():
+    with profile_load("result cache"):
+        return ResultCache()
+
+
+@st.cache_resource
+def get_parser():
+    with profile_load("parser"):
+        from src.parser import ResumeParser
+        return ResumeParser()
+
+
+@st.cache_resource
+def get_engine(api_key: str, token_budget: int = 0):
+    # Keyed on the API key and budget; engines for the same key share one process-wide LLM gateway
+    with profile_load("analysis engine"):
+        from src.rag_engine import RAGEngine
+        compactor = None
+        if token_budget:
+            from src.compaction import PromptCompactor
+            compactor = PromptCompactor(get_embedding_model(), token_budget=token_budget)
+        return RAGEngine(cache=get_result_cache(), compactor=compactor)
+
+
+@st.cache_resource
+def get_job_runner():
+    # Process-wide worker pool for single-resume analyses; finished jobs are kept in a local store
+    with profile_load("analysis jobs"):
+        return AnalysisJobs(get_parser().parse, store=JobStore())
+
+
+@st.cache_resource
+def get_embedding_model():
+    # Lazy wrapper: sentence-transformers and MiniLM load on the first shortlist, then stay in memory
+    with profile_load("embedding model"):
+        from src.vector_store import LazyHuggingFaceEmbeddings
+        return LazyHuggingFaceEmbeddings()
+
+
+# Shared on-disk cache of validation/analysis results, keyed on resume, job description and model
+result_cache = get_result_cache()
+
+# This session's analysis job IDs, newest first. They are mirrored in the URL so a page reload finds
+# the stored results again, and finished jobs are also kept here so reruns render without a lookup
+if "analysis_jobs" not in st.session_state:
+    st.session_state.analysis_jobs = [job_id for job_id in st.query_params.get("jobs", "").split(",") if job_id]
+    st.session_state.finished_jobs = {}
+
 # Sidebar
 with st.sidebar:
     st.markdown("### Configuration")
@@ -121,12 +192,40 @@ with st.sidebar:
             os.environ["GROQ_API_KEY"] = api_key_input
             st.success("API Key saved for session")
     
+    concurrent_validation = st.checkbox(
+        "Validate and analyze concurrently", value=True,
+        help="Start the analysis while the document check is still running. Faster, but tokens are "
+             "spent on the analysis even if the document turns out not to be a resume.")
+
+    token_budget = st.number_input(
+        "Resume token budget (0 = send the full resume)", min_value=0, max_value=8000, value=0, step=250,
+        help="Send only the resume sections most relevant to the job description, within this many "
+             "tokens, plus the resume's opening (contact details and summary).")
+
+    with st.expander("Result Cache"):
+        bypass_cache = st.checkbox("Bypass cache (force a fresh analysis)", value=False)
+        stats = result_cache.stats()
+        st.caption(f"{stats['entries']} cached results · {stats['hits']} hits · {stats['misses']} misses")
+        if st.button("Clear cache"):
+            result_cache.clear()
+            st.success("Cache cleared")
+
+    with st.expander("Performance"):
+        trace_enabled = st.checkbox(
+            "Record pipeline timings", value=tracer.enabled,
+            help="Time parsing, cleaning, validation, analysis and post-processing and count LLM tokens. "
+                 "Applies to the whole app process.")
+        tracer.configure(enabled=trace_enabled)
+        # Filled in once the page has rendered
+        performance_slot = st.empty()
+
+    with st.expander("Startup Profile"):
+        # Filled in once the page has rendered
+        startup_slot = st.empty()
+
     st.markdown("---")
     st.markdown("Upload your resume and a job description to get a detailed match analysis.")
 
-# Initialize modules
-parser = ResumeParser()
-# We initialize RAG engine only when needed effectively, or check for key
 
 col1, col2 = st.columns([1, 1])
 
@@ -136,155 +235,411 @@ with col1:
 
 with col2:
     st.subheader("2. Upload Resume")
-    uploaded_file = st.file_uploader("Upload PDF, DOCX, or TXT", type=["pdf", "docx", "txt"])
+    uploaded_files = st.file_uploader("Upload PDF, DOCX, or TXT (select several for bulk screening)",
+                                      type=["pdf", "docx", "txt"], accept_multiple_files=True)
+
+uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
+bulk_mode = len(uploaded_files) > 1
+
+if bulk_mode:
+    concurrency = st.slider("Concurrent analyses", min_value=1, max_value=16, value=8,
+                            help="Maximum number of LLM calls in flight while screening multiple resumes.")
+    shortlist_top_n = st.number_input(
+        "Shortlist size (0 = analyze every resume)", min_value=0, max_value=len(uploaded_files), value=0,
+        help="Rank all resumes by embedding similarity to the job description first and only send "
+             "the top N to the LLM.")
+
+
+VALIDATION_PATH_LABELS = {
+    "local": "recognised instantly by the local classifier",
+    "cache": "served from cache",
+    "llm": "verified by the LLM",
+}
+
+
+def parse_upload(uploaded_file):
+    # Parsed straight from the upload buffer; nothing is written to disk
+    return get_parser().parse(uploaded_file, file_name=uploaded_file.name)
+
+
+def run_bulk_screening(uploaded_files, job_description, concurrency, shortlist_top_n=0):
+    import pandas as pd
+
+    rag_engine = get_engine(os.environ["GROQ_API_KEY"], token_budget)
+    shortlist_store = None
+    if shortlist_top_n:
+        from src.vector_store import VectorStoreManager
+        # Throwaway in-memory index: only this upload batch is ranked, nothing is persisted
+        shortlist_dir = tempfile.mkdtemp(prefix="shortlist_")
+        shortlist_store = VectorStoreManager(persist_directory=shortlist_dir, embedding_model=get_embedding_model())
+    status = st.empty()
+    progress = st.progress(0.0)
+    table = st.empty()
+    rows = []
+    start = time.perf_counter()
+
+    for row in screen_resumes(uploaded_files, job_description, rag_engine, parse_upload,
+                              max_workers=concurrency, name_fn=lambda f: f.name,
+                              use_cache=not bypass_cache, shortlist_store=shortlist_store,
+                              shortlist_top_n=shortlist_top_n):
+        rows.append(row)
+        # Re-rank and redraw after every candidate so the table streams in as results arrive
+        progress.progress(len(rows) / len(uploaded_files))
+        status.caption(f"Screened {len(rows)} of {len(uploaded_files)} resumes")
+        table.dataframe(pd.DataFrame(results_table(rows)), use_container_width=True, hide_index=True)
+
+    elapsed = time.perf_counter() - start
+    if shortlist_store is not None:
+        shutil.rmtree(shortlist_dir, ignore_errors=True)
+    st.success(f"Screened {len(rows)} resumes in {elapsed:.1f}s ({len(rows) / elapsed * 60:.1f} resumes/min)")
+
+
+RESULT_DEFAULTS = {
+    "match_score": 0,
+    "match_breakdown": {},
+    "resume_improvements": [],
+    "matching_skills": [],
+    "missing_skills": [],
+    "summary": "No summary available.",
+    "recommendation": "N/A",
+    "interview_questions": [],
+}
+
+
+def render_score(score):
+    # Display Score
+    st.metric(label="Match Score", value=f"{score}/100")
+    
+    # Progress Bar
+    st.progress(score / 100)
+
+
+def render_breakdown(breakdown):
+    # Detailed Breakdown with Radar Chart
+    if breakdown:
+        import pandas as pd
+        import plotly.express as px
+
+        st.divider()
+        st.subheader("Match Analysis Visualization")
+        
+        # Create DataFrame for Plotly
+        data = pd.DataFrame(dict(
+            r=[
+                breakdown.get('skills_match', 0),
+                breakdown.get('experience_match', 0),
+                breakdown.get('education_match', 0),
+                breakdown.get('communication_style', 0),
+                breakdown.get('skills_match', 0) # Close the loop
+            ],
+            theta=['Skills', 'Experience', 'Education', 'Communication', 'Skills']
+        ))
+        
+        fig = px.line_polar(data, r='r', theta='theta', line_close=True, range_r=[0, 100])
+        fig.update_traces(fill='toself', line_color='#00CC96')
+        fig.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, range=[0, 100])
+            ),
+            showlegend=False,
+            height=400,
+            margin=dict(l=40, r=40, t=20, b=20)
+        )
+        
+        # Display Chart and Metrics side-by-side
+        viz_col1, viz_col2 = st.columns([1.5, 1])
+        with viz_col1:
+            st.plotly_chart(fig, use_container_width=True)
+        with viz_col2:
+            st.caption("Score Breakdown")
+            st.progress(breakdown.get('skills_match', 0) / 100, text=f"Skills: {breakdown.get('skills_match', 0)}%")
+            st.progress(breakdown.get('experience_match', 0) / 100, text=f"Experience: {breakdown.get('experience_match', 0)}%")
+            st.progress(breakdown.get('education_match', 0) / 100, text=f"Education: {breakdown.get('education_match', 0)}%")
+            st.progress(breakdown.get('communication_style', 0) / 100, text=f"Communication: {breakdown.get('communication_style', 0)}%")
+
+
+def render_improvements(improvements):
+    # Resume Improvements
+    if improvements:
+        st.divider()
+        st.subheader("Resume Refinement Suggestions")
+        for item in improvements:
+            with st.expander(f"Improvement for: {item.get('section', 'General')}"):
+                st.write(f"**Suggestion:** {item.get('suggestion')}")
+                st.info(f"**Example Rewrite:** {item.get('example')}")
+
+
+def render_skill_match(match):
+    # Keyword-matched skill coverage; computed locally, so it shows before the model's answer
+    if match and match.get("skills_score") is not None:
+        st.metric(label="Required Skills Found",
+                  value=f"{len(match['matching_skills'])}/{len(match['required_skills'])}",
+                  help="Skills named in the job description and found in the resume by keyword matching.")
+        st.progress(match["skills_score"] / 100)
+
+
+def render_matching_skills(skills):
+    st.info("### Matching Skills")
+    for skill in skills:
+        st.write(f"- {skill}")
+
+
+def render_missing_skills(skills):
+    st.warning("### Missing Skills")
+    for skill in skills:
+        st.write(f"- {skill}")
+
+
+def render_summary(summary):
+    st.markdown(f"""
+    <div class="card">
+        {summary}
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def render_recommendation(rec):
+    if rec.lower() == "hire":
+        st.success(f"**{rec}**")
+    elif rec.lower() == "interview":
+        st.warning(f"**{rec}**")
+    else:
+        st.error(f"**{rec}**")
+
+
+def render_questions(questions):
+    if questions:
+        st.divider()
+        st.subheader("Interview Preparation Hub")
+        st.markdown("ask specific questions tailored to your profile to help you **crack the interview**.")
+        
+        for i, item in enumerate(questions, 1):
+            # Handle both simple string (fallback) and new dict format
+            if isinstance(item, str):
+                q_text = item
+                q_context = "General fit"
+                q_tip = "Use the STAR method (Situation, Task, Action, Result) to structure your answer."
+            else:
+                q_text = item.get("question", "Question")
+                q_context = item.get("context", "Relevant to your background")
+                q_tip = item.get("answer_tip", "Be confident and concise.")
+
+            with st.expander(f"**Q{i}: {q_text}**"):
+                st.markdown(f"**Why this question?**\n\n_{q_context}_")
+                st.info(f"**Pro Tip:** {q_tip}")
+
+
+RESULT_RENDERERS = {
+    "match_score": render_score,
+    "match_breakdown": render_breakdown,
+    "resume_improvements": render_improvements,
+    "skill_match": render_skill_match,
+    "matching_skills": render_matching_skills,
+    "missing_skills": render_missing_skills,
+    "summary": render_summary,
+    "recommendation": render_recommendation,
+    "interview_questions": render_questions,
+}
+
+
+def create_result_slots():
+    """
+    Lays out one placeholder per analysis field, in display order, so fields can be filled in
+    whichever order the model streams them.
+    """
+    slots = {}
+    slots["match_score"] = st.empty()
+    slots["match_breakdown"] = st.empty()
+    slots["resume_improvements"] = st.empty()
+
+    # Layout for details
+    st.divider()
+    st.subheader("Skills Analysis")
+    slots["skill_match"] = st.empty()
+    res_col1, res_col2 = st.columns(2)
+    with res_col1:
+        slots["matching_skills"] = st.empty()
+    with res_col2:
+        slots["missing_skills"] = st.empty()
+
+    st.divider()
+    st.subheader("Summary")
+    slots["summary"] = st.empty()
+
+    st.subheader("Recommendation")
+    slots["recommendation"] = st.empty()
+
+    slots["interview_questions"] = st.empty()
+    return slots
+
+
+def render_startup_profile():
+    profile = startup_profile()
+    render_seconds = time.perf_counter() - run_start
+    if profile["first_render"] is None:
+        profile["first_render"] = render_seconds
+    else:
+        profile["last_rerun"] = render_seconds
+    lines = [f"First render (cold): {profile['first_render'] * 1000:.0f} ms"]
+    if profile["last_rerun"] is not None:
+        lines.append(f"Last rerun (warm): {profile['last_rerun'] * 1000:.0f} ms")
+    lines += [f"Loaded {name}: {seconds * 1000:.0f} ms" for name, seconds in profile["resources"].items()]
+    startup_slot.caption("  \n".join(lines))
+
+
+def render_performance_panel():
+    summary = tracer.summary()
+    with performance_slot.container():
+        if not summary["stages"]:
+            st.caption("No timings recorded yet." if tracer.enabled else "Timing is off.")
+            return
+        st.dataframe([{"Stage": name, "Count": stats["count"], "Mean ms": round(stats["mean_ms"], 1),
+                       "p95 ms": round(stats["p95_ms"], 1)} for name, stats in summary["stages"].items()],
+                     hide_index=True, use_container_width=True)
+        for model, usage in summary["models"].items():
+            st.caption(f"{model}: {usage['input_tokens']} prompt + {usage['output_tokens']} completion tokens "
+                       f"(~${usage['cost_usd']:.4f})")
+        st.download_button("Prometheus metrics", tracer.prometheus(), file_name="metrics.prom",
+                           mime="text/plain")
+
+
+def render_stage_timings(spans):
+    # Spans recorded while the analysis ran, in the order they finished
+    if not spans:
+        return
+    with st.expander("Stage timings"):
+        for span in spans:
+            tokens = ""
+            if span.get("input_tokens") or span.get("output_tokens"):
+                tokens = f" · {span['input_tokens']} + {span['output_tokens']} tokens ({span.get('model')})"
+            st.caption(f"{span['span']}: {span['duration_ms']:.0f} ms{tokens}")
+
+
+JOB_STATUS_LABELS = {
+    "queued": "Queued",
+    "parsing": "Parsing resume...",
+    "validating": "Verifying document type...",
+    "analyzing": "Streaming analysis...",
+    "done": "Analysis complete",
+    "rejected": "Not a resume",
+    "failed": "Failed",
+}
+
+
+def load_job(job_id):
+    # Finished jobs are served from session state; running ones from the job runner (or its store)
+    job = st.session_state.finished_jobs.get(job_id)
+    if job is None:
+        job = get_job_runner().get(job_id)
+        if job is not None and job["status"] in FINISHED_STATES:
+            st.session_state.finished_jobs[job_id] = job
+    return job
+
+
+def job_label(job):
+    score = job["result"].get("match_score")
+    label = f"{job['file_name']} · {JOB_STATUS_LABELS[job['status']]}"
+    return label + (f" · {score}/100" if job["status"] == "done" and score is not None else "")
+
+
+def render_job(job):
+    """
+    Renders one analysis job from its stored state: progress while it runs, partial fields as they
+    stream in, and the full result (with defaults for anything the model left out) once done.
+    """
+    status = job["status"]
+    if status == "failed":
+        st.error(f"An error occurred: {job['error']}. Please try again.")
+        if job["traceback"]:
+            st.text(job["traceback"])
+        return
+    if status == "rejected":
+        st.error("The uploaded document does not appear to be a valid Resume or CV. Please upload a valid resume.")
+        return
+    if status not in FINISHED_STATES:
+        st.progress(JOB_STATES.index(status) / JOB_STATES.index("done"), text=JOB_STATUS_LABELS[status])
+    if job["validation"]:
+        validation_path = job["validation"]["path"]
+        st.caption(f"Document check: {VALIDATION_PATH_LABELS.get(validation_path, validation_path)}")
+    if status != "analyzing" and status != "done":
+        return
+
+    status_slot = st.empty()
+    slots = create_result_slots()
+    result = job["result"]
+    for key, renderer in RESULT_RENDERERS.items():
+        if key in result:
+            with slots[key].container():
+                renderer(result[key])
+        elif status == "done":
+            # Fill in defaults for anything the model left out
+            with slots[key].container():
+                renderer(RESULT_DEFAULTS.get(key))
+    if status != "done":
+        return
+
+    status_slot.success("Analysis Complete!")
+    metrics = job["metrics"]
+    if metrics.get("time_to_first_score") is not None:
+        st.caption(f"First score after {metrics['time_to_first_score']:.2f}s · "
+                   f"full analysis in {metrics['total']:.2f}s"
+                   + (" (cached)" if metrics.get("cached") else ""))
+    if metrics.get("resume_tokens_after") is not None:
+        st.caption(f"Resume prompt compacted from ~{metrics['resume_tokens_before']} to "
+                   f"~{metrics['resume_tokens_after']} tokens")
+    render_stage_timings(job["spans"])
+
+
+def analysis_jobs_panel(polling: bool):
+    jobs = {job_id: load_job(job_id) for job_id in st.session_state.analysis_jobs}
+    jobs = {job_id: job for job_id, job in jobs.items() if job is not None}
+    if not jobs:
+        return
+    running = any(job["status"] not in FINISHED_STATES for job in jobs.values())
+    if polling and not running:
+        # The last running job just finished; a full rerun redraws the page without polling
+        st.rerun()
+
+    st.divider()
+    st.subheader("Analyses")
+    if st.session_state.get("selected_job") not in jobs:
+        st.session_state.selected_job = next(iter(jobs))
+    selected = st.radio("Analyses", options=list(jobs), format_func=lambda job_id: job_label(jobs[job_id]),
+                        key="selected_job", label_visibility="collapsed")
+    render_job(jobs[selected])
+
+
+def render_analysis_jobs():
+    """
+    Lists this session's analyses and shows the selected one. Everything is rendered from stored
+    job state, so reruns and switching between analyses never call the LLM again. While any job is
+    running, only this panel reruns, once a second.
+    """
+    running = any(job is not None and job["status"] not in FINISHED_STATES
+                  for job in map(load_job, st.session_state.analysis_jobs))
+    st.fragment(run_every=1.0 if running else None)(analysis_jobs_panel)(running)
+
+
+render_startup_profile()
+render_performance_panel()
 
 if st.button("Analyze Resume", type="primary"):
     if not os.environ.get("GROQ_API_KEY"):
         st.error("Please enter your Groq API Key in the sidebar.")
     elif not job_description:
         st.warning("Please provide a Job Description.")
-    elif not uploaded_file:
+    elif not uploaded_files:
         st.warning("Please upload a resume.")
+    elif bulk_mode:
+        run_bulk_screening(uploaded_files, job_description, concurrency, shortlist_top_n)
     else:
-        with st.spinner("Analyzing..."):
-            try:
-                # Save uploaded file temporarily
-                with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-                    tmp_file.write(uploaded_file.getbuffer())
-                    tmp_path = tmp_file.name
-
-                # Parse Resume
-                resume_text = parser.parse(tmp_path)
-                
-                # Cleanup temp file
-                os.remove(tmp_path)
-                
-                # Initialize RAG Engine
-                rag_engine = RAGEngine()
-                
-                # Validate if it's a resume
-                with st.spinner("Verifying document type..."):
-                    if not rag_engine.validate_resume(resume_text):
-                        st.error("The uploaded document does not appear to be a valid Resume or CV. Please upload a valid resume.")
-                        st.stop()
-                
-                # Analyze with RAG Engine
-                analysis_result = rag_engine.analyze_resume(resume_text, job_description)
-
-                # Display Results
-                st.success("Analysis Complete!")
-                
-                # Display Score
-                score = analysis_result.get("match_score", 0)
-                st.metric(label="Match Score", value=f"{score}/100")
-                
-                # Progress Bar
-                st.progress(score / 100)
-                
-                # Detailed Breakdown with Radar Chart
-                breakdown = analysis_result.get("match_breakdown", {})
-                if breakdown:
-                    st.divider()
-                    st.subheader("Match Analysis Visualization")
-                    
-                    # Create DataFrame for Plotly
-                    data = pd.DataFrame(dict(
-                        r=[
-                            breakdown.get('skills_match', 0),
-                            breakdown.get('experience_match', 0),
-                            breakdown.get('education_match', 0),
-                            breakdown.get('communication_style', 0),
-                            breakdown.get('skills_match', 0) # Close the loop
-                        ],
-                        theta=['Skills', 'Experience', 'Education', 'Communication', 'Skills']
-                    ))
-                    
-                    fig = px.line_polar(data, r='r', theta='theta', line_close=True, range_r=[0, 100])
-                    fig.update_traces(fill='toself', line_color='#00CC96')
-                    fig.update_layout(
-                        polar=dict(
-                            radialaxis=dict(visible=True, range=[0, 100])
-                        ),
-                        showlegend=False,
-                        height=400,
-                        margin=dict(l=40, r=40, t=20, b=20)
-                    )
-                    
-                    # Display Chart and Metrics side-by-side
-                    viz_col1, viz_col2 = st.columns([1.5, 1])
-                    with viz_col1:
-                        st.plotly_chart(fig, use_container_width=True)
-                    with viz_col2:
-                        st.caption("Score Breakdown")
-                        st.progress(breakdown.get('skills_match', 0) / 100, text=f"Skills: {breakdown.get('skills_match', 0)}%")
-                        st.progress(breakdown.get('experience_match', 0) / 100, text=f"Experience: {breakdown.get('experience_match', 0)}%")
-                        st.progress(breakdown.get('education_match', 0) / 100, text=f"Education: {breakdown.get('education_match', 0)}%")
-                        st.progress(breakdown.get('communication_style', 0) / 100, text=f"Communication: {breakdown.get('communication_style', 0)}%")
-                
-                # Resume Improvements
-                improvements = analysis_result.get("resume_improvements", [])
-                if improvements:
-                    st.divider()
-                    st.subheader("Resume Refinement Suggestions")
-                    for item in improvements:
-                        with st.expander(f"Improvement for: {item.get('section', 'General')}"):
-                            st.write(f"**Suggestion:** {item.get('suggestion')}")
-                            st.info(f"**Example Rewrite:** {item.get('example')}")
-
-                # Layout for details
-                st.divider()
-                st.subheader("Skills Analysis")
-                res_col1, res_col2 = st.columns(2)
-                
-                with res_col1:
-                    st.info("### Matching Skills")
-                    for skill in analysis_result.get("matching_skills", []):
-                        st.write(f"- {skill}")
-
-                with res_col2:
-                    st.warning("### Missing Skills")
-                    for skill in analysis_result.get("missing_skills", []):
-                        st.write(f"- {skill}")
-                
-                st.divider()
-                st.subheader("Summary")
-                st.markdown(f"""
-                <div class="card">
-                    {analysis_result.get("summary", "No summary available.")}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                st.subheader("Recommendation")
-                rec = analysis_result.get("recommendation", "N/A")
-                if rec.lower() == "hire":
-                    st.success(f"**{rec}**")
-                elif rec.lower() == "interview":
-                    st.warning(f"**{rec}**")
-                else:
-                    st.error(f"**{rec}**")
-                
-                questions = analysis_result.get("interview_questions", [])
-                if questions:
-                    st.divider()
-                    st.subheader("Interview Preparation Hub")
-                    st.markdown("ask specific questions tailored to your profile to help you **crack the interview**.")
-                    
-                    for i, item in enumerate(questions, 1):
-                        # Handle both simple string (fallback) and new dict format
-                        if isinstance(item, str):
-                            q_text = item
-                            q_context = "General fit"
-                            q_tip = "Use the STAR method (Situation, Task, Action, Result) to structure your answer."
-                        else:
-                            q_text = item.get("question", "Question")
-                            q_context = item.get("context", "Relevant to your background")
-                            q_tip = item.get("answer_tip", "Be confident and concise.")
-
-                        with st.expander(f"**Q{i}: {q_text}**"):
-                            st.markdown(f"**Why this question?**\n\n_{q_context}_")
-                            st.info(f"**Pro Tip:** {q_tip}")
-                    
-            except Exception as e:
-                st.error(f"An error occurred: {str(e)}")
-                import traceback
-                st.text(traceback.format_exc())
+        job_id = get_job_runner().submit(
+            get_engine(os.environ["GROQ_API_KEY"], token_budget), uploaded_file.name, uploaded_file.getvalue(),
+            job_description, use_cache=not bypass_cache, concurrent=concurrent_validation,
+            options={"token_budget": token_budget})
+        # Resubmitting the same inputs returns the existing job, which moves back to the top
+        st.session_state.analysis_jobs = [job_id] + [i for i in st.session_state.analysis_jobs if i != job_id]
+        st.session_state.selected_job = job_id
+        st.query_params["jobs"] = ",".join(st.session_state.analysis_jobs)
+
+render_analysis_jobs()
@@ -0,0 +1,162 @@
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from src.batch import find_resumes, iter_parsed_files, results_table, screen_parsed
+from src.cache import ResultCache
+from src.llm_gateway import LLMGateway, get_gateway
+from src.parser import ResumeParser
+from src.rag_engine import DEFAULT_MODEL_NAME, RAGEngine
+from src.tracing import tracer
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Screen a directory of resumes against one job description.")
+    arg_parser.add_argument("directory", help="Directory containing PDF, DOCX or TXT resumes")
+    arg_parser.add_argument("--jd", required=True, help="Path to a text file with the job description")
+    arg_parser.add_argument("--parse-workers", type=int, default=os.cpu_count(), help="Parallel parsing processes")
+    arg_parser.add_argument("--parse-timeout", type=float, default=60.0,
+                            help="Seconds before a file's parser process is killed and the file reported")
+    arg_parser.add_argument("--parse-memory-mb", type=int, default=None,
+                            help="Memory each parsing process may use beyond its startup footprint (POSIX only)")
+    arg_parser.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent LLM calls")
+    arg_parser.add_argument("--rpm", type=int, help="Requests-per-minute quota of the API key (default GROQ_REQUESTS_PER_MINUTE)")
+    arg_parser.add_argument("--tpm", type=int, help="Tokens-per-minute quota of the API key (default GROQ_TOKENS_PER_MINUTE)")
+    arg_parser.add_argument("--no-validate", action="store_true", help="Skip the resume validation call")
+    arg_parser.add_argument("--no-local-classifier", action="store_true",
+                            help="Always validate with the LLM instead of the local fast-path classifier")
+    arg_parser.add_argument("--no-cache", action="store_true", help="Bypass the result cache and force fresh LLM calls")
+    arg_parser.add_argument("--cache-path", default="./data/cache/results.sqlite", help="Result cache database")
+    arg_parser.add_argument("--shortlist", type=int, default=0,
+                            help="Rank all resumes by embedding similarity and only send the top N to the LLM")
+    arg_parser.add_argument("--compact-budget", type=int, default=0,
+                            help="Send only the resume chunks most relevant to the job, within this many tokens")
+    arg_parser.add_argument("--trace-log", help="Record per-stage timings and append them to this JSON-lines file")
+    arg_parser.add_argument("--metrics-out", help="Write Prometheus text-format metrics to this file at the end")
+    arg_parser.add_argument("--output", help="Write the final ranked table to this CSV file")
+    arg_parser.add_argument("--fake-llm", action="store_true", help="Use the offline deterministic chat model")
+    arg_parser.add_argument("--fake-latency", type=float, default=0.5, help="Seconds per fake LLM call")
+    arg_parser.add_argument("--fake-defect-rate", type=float, default=0.0,
+                            help="Fraction of fake analysis answers cut off mid-JSON, to exercise repair")
+    args = arg_parser.parse_args()
+
+    with open(args.jd, encoding="utf-8") as f:
+        job_description = f.read()
+
+    paths = find_resumes(args.directory)
+    if not paths:
+        print(f"No resumes found in {args.directory}")
+        sys.exit(1)
+
+    llm = None
+    if args.fake_llm:
+        from src.fake_llm import FakeChatModel
+        llm = FakeChatModel(latency=args.fake_latency, defect_rate=args.fake_defect_rate)
+    elif not os.environ.get("GROQ_API_KEY"):
+        print("GROQ_API_KEY is not set (use --fake-llm for an offline run).")
+        sys.exit(1)
+
+    if args.trace_log or args.metrics_out:
+        tracer.configure(enabled=True, log_path=args.trace_log)
+
+    parser = ResumeParser()
+    cache = ResultCache(args.cache_path)
+    compactor = None
+    if args.compact_budget:
+        from src.compaction import PromptCompactor
+        compactor = PromptCompactor(token_budget=args.compact_budget)
+    if llm is not None:
+        gateway = LLMGateway(llm, requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    else:
+        gateway = get_gateway(DEFAULT_MODEL_NAME, requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    engine = RAGEngine(cache=cache, local_classifier=not args.no_local_classifier, compactor=compactor,
+                       gateway=gateway)
+
+    shortlist_store = None
+    if args.shortlist:
+        from src.vector_store import VectorStoreManager
+        # Throwaway in-memory index: only this run's resumes are ranked, nothing is persisted
+        shortlist_dir = tempfile.mkdtemp(prefix="shortlist_")
+        shortlist_store = VectorStoreManager(persist_directory=shortlist_dir)
+
+    rows = []
+    start = time.perf_counter()
+    parsed = iter_parsed_files(paths, parser, workers=args.parse_workers, timeout=args.parse_timeout,
+                               max_memory_mb=args.parse_memory_mb)
+    for row in screen_parsed(parsed, job_description, engine, max_workers=args.concurrency,
+                             validate=not args.no_validate, use_cache=not args.no_cache,
+                             shortlist_store=shortlist_store, shortlist_top_n=args.shortlist):
+        rows.append(row)
+        score = row["match_score"] if row["match_score"] is not None else "-"
+        print(f"[{len(rows)}/{len(paths)}] {row['name']}: {score} {row['error'] or ''}".rstrip(), flush=True)
+    elapsed = time.perf_counter() - start
+    if shortlist_store is not None:
+        shutil.rmtree(shortlist_dir, ignore_errors=True)
+
+    table = results_table(rows)
+    print()
+    print(f"{'Rank':>4}  {'Score':>5}  {'Sim':>6}  {'Recommendation':<14}  Candidate")
+    for record in table:
+        score = record["Match Score"] if record["Match Score"] is not None else "-"
+        similarity = record["Similarity"] if record["Similarity"] is not None else "-"
+        print(f"{record['Rank']:>4}  {score:>5}  {similarity:>6}  {record['Recommendation'] or '-':<14}  {record['Candidate']}")
+
+    print()
+    print(f"Screened {len(rows)} resumes in {elapsed:.1f}s "
+          f"({len(rows) / elapsed * 60:.1f} resumes/min at concurrency {args.concurrency})")
+    stats = cache.stats()
+    print(f"Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+    validation = engine.validation_stats()
+    if validation["total"]:
+        paths_taken = ", ".join(f"{path}={count}" for path, count in sorted(validation["counts"].items()))
+        print(f"Validation paths: {paths_taken} "
+              f"({validation['llm_call_reduction']:.0%} of validations avoided an LLM call)")
+
+    structured = engine.structured_output_stats()
+    if structured.get("repaired") or structured.get("reasks"):
+        print(f"Output repair: {structured.get('repaired', 0)} of {structured['responses']} analyses repaired, "
+              f"{structured.get('reasks', 0)} follow-ups for missing fields ({structured['reask_rate']:.0%}), "
+              f"{structured['tokens_saved']} tokens saved versus full retries")
+    normalization = parser.normalization_stats()
+    if normalization["documents"]:
+        print(f"Text normalization: ~{normalization['tokens_before']} -> ~{normalization['tokens_after']} tokens "
+              f"over {normalization['documents']} documents ({normalization['header_footer_lines']} header/footer "
+              f"lines, {normalization['page_numbers']} page numbers dropped, {normalization['hyphenations']} "
+              f"hyphenations rejoined), {normalization['mb_per_second']:.1f} MB/s")
+    gateway_stats = engine.gateway_stats()
+    if gateway_stats.get("rate_limited") or gateway_stats.get("coalesced") or args.rpm or args.tpm:
+        waited = sum(gateway_stats["waited_seconds"].values())
+        print(f"LLM gateway: {gateway_stats.get('requests', 0)} requests, {gateway_stats.get('coalesced', 0)} "
+              f"duplicates coalesced, {gateway_stats.get('rate_limited', 0)} rate-limit retries, "
+              f"{waited:.1f}s queued for quota")
+    compaction = engine.compaction_stats()
+    if compaction.get("calls"):
+        print(f"Prompt compaction: {compaction['compacted']} of {compaction['calls']} resumes compacted, "
+              f"resume tokens {compaction['tokens_before']} -> {compaction['tokens_after']} "
+              f"({compaction['token_reduction']:.0%} fewer)")
+
+    if tracer.enabled:
+        summary = tracer.summary()
+        print("Stage timings: " + ", ".join(f"{name} {stats['count']}x mean {stats['mean_ms']:.0f} ms"
+                                            for name, stats in summary["stages"].items()))
+        for model, usage in summary["models"].items():
+            print(f"Tokens ({model}): {usage['input_tokens']} prompt, {usage['output_tokens']} completion, "
+                  f"~${usage['cost_usd']:.4f}")
+        if args.metrics_out:
+            tracer.write_prometheus(args.metrics_out)
+            print(f"Metrics written to {args.metrics_out}")
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(table[0].keys()))
+            writer.writeheader()
+            writer.writerows(table)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+A/B test of prompt compaction: match scores and resume tokens, full text versus compacted.
+
+    python -m benchmarks.ab_compaction --resumes 50 --budget 600
+    python -m benchmarks.ab_compaction --resumes 20 --groq          # real model, needs GROQ_API_KEY
+
+Every synthetic resume is analyzed twice, once with the full text and once through PromptCompactor,
+with the result cache disabled. The offline default uses the deterministic fake chat model, which
+scores by job/resume term overlap, so it shows whether compaction keeps the evidence the job asks for;
+--groq repeats the comparison against the real model. Use --fake-embeddings to skip loading MiniLM
+(chunk selection is then arbitrary, which makes a useful lower bound).
+"""
+import argparse
+import json
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_job_description, synthetic_resume
+from src.compaction import PromptCompactor
+from src.rag_engine import RAGEngine
+
+
+def make_embeddings(fake: bool):
+    if fake:
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        return DeterministicFakeEmbedding(size=384)
+    from src.vector_store import LazyHuggingFaceEmbeddings
+    return LazyHuggingFaceEmbeddings()
+
+
+def make_llm(groq: bool):
+    if groq:
+        return None
+    from src.fake_llm import FakeChatModel
+    return FakeChatModel()
+
+
+def spearman(a: list, b: list) -> float:
+    ranks_a = np.argsort(np.argsort(a))
+    ranks_b = np.argsort(np.argsort(b))
+    if np.std(ranks_a) == 0 or np.std(ranks_b) == 0:
+        return 1.0
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--resumes", type=int, default=50)
+    arg_parser.add_argument("--jobs", type=int, default=8, help="Jobs per synthetic resume (controls length)")
+    arg_parser.add_argument("--bullets", type=int, default=6, help="Bullets per job")
+    arg_parser.add_argument("--budget", type=int, default=600, help="Resume token budget for the compacted prompt")
+    arg_parser.add_argument("--groq", action="store_true", help="Use the real Groq model instead of the fake one")
+    arg_parser.add_argument("--fake-embeddings", action="store_true")
+    arg_parser.add_argument("--json", help="Also write per-resume results to this JSON file")
+    args = arg_parser.parse_args()
+
+    job_description = synthetic_job_description()
+    compactor = PromptCompactor(make_embeddings(args.fake_embeddings), token_budget=args.budget,
+                                embedding_cache_dir=None)
+    full = RAGEngine(llm=make_llm(args.groq))
+    compacted = RAGEngine(llm=make_llm(args.groq), compactor=compactor)
+
+    rows = []
+    for index in range(args.resumes):
+        resume = synthetic_resume(index, jobs=args.jobs, bullets_per_job=args.bullets)
+        compaction = compactor.compact(resume, job_description)
+        rows.append({
+            "resume": index,
+            "tokens_full": compaction["tokens_before"],
+            "tokens_compacted": compaction["tokens_after"],
+            "score_full": full.analyze_resume(resume, job_description, use_cache=False).get("match_score"),
+            "score_compacted": compacted.analyze_resume(resume, job_description, use_cache=False).get("match_score"),
+        })
+
+    scored = [row for row in rows if row["score_full"] is not None and row["score_compacted"] is not None]
+    full_scores = [row["score_full"] for row in scored]
+    compacted_scores = [row["score_compacted"] for row in scored]
+    differences = np.abs(np.array(full_scores, dtype=float) - np.array(compacted_scores, dtype=float))
+    tokens_full = sum(row["tokens_full"] for row in rows)
+    tokens_compacted = sum(row["tokens_compacted"] for row in rows)
+
+    summary = {
+        "resumes": len(rows),
+        "budget": args.budget,
+        "resume_tokens_full": tokens_full,
+        "resume_tokens_compacted": tokens_compacted,
+        "token_reduction": 1 - tokens_compacted / tokens_full if tokens_full else 0.0,
+        "llm_input_tokens_full": full.token_usage.get("input_tokens", 0),
+        "llm_input_tokens_compacted": compacted.token_usage.get("input_tokens", 0),
+        "mean_abs_score_diff": float(differences.mean()) if len(scored) else None,
+        "max_abs_score_diff": float(differences.max()) if len(scored) else None,
+        "rank_correlation": spearman(full_scores, compacted_scores) if len(scored) > 1 else None,
+    }
+
+    print(f"Resume tokens: {tokens_full} full -> {tokens_compacted} compacted "
+          f"({summary['token_reduction']:.0%} fewer, budget {args.budget} per resume)")
+    print(f"LLM input tokens: {summary['llm_input_tokens_full']} -> {summary['llm_input_tokens_compacted']}")
+    if scored:
+        print(f"Match score |full - compacted|: mean {summary['mean_abs_score_diff']:.1f}, "
+              f"max {summary['max_abs_score_diff']:.0f}")
+    if summary["rank_correlation"] is not None:
+        print(f"Spearman rank correlation of scores: {summary['rank_correlation']:.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
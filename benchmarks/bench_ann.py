@@ -0,0 +1,125 @@
+"""
+Recall@k, query latency and memory of the vector store's index backends.
+
+    python -m benchmarks.bench_ann --vectors 100000 --queries 500 --k 10
+
+Exact flat search provides the ground truth. By default the corpus is a clustered Gaussian mixture
+shaped like MiniLM embeddings (384-d), which is fast to generate at large sizes; pass --minilm to embed
+synthetic resume chunks with the real model instead (slow, but realistic neighbourhoods).
+"""
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+from src.vector_store import build_index, set_search_params
+
+
+def clustered_vectors(count: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, clusters, size=count)
+    vectors = centers[assignments] + 0.35 * rng.normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def minilm_vectors(count: int, queries: int):
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from benchmarks.synthetic import synthetic_job_description, synthetic_resume
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    chunks, index = [], 0
+    while len(chunks) < count:
+        chunks.extend(splitter.split_text(synthetic_resume(index, jobs=4)))
+        index += 1
+    corpus = np.asarray(model.embed_documents(chunks[:count]), dtype=np.float32)
+    query_vectors = np.asarray(model.embed_documents([synthetic_job_description(seed) for seed in range(queries)]),
+                               dtype=np.float32)
+    return corpus, query_vectors
+
+
+def index_bytes(index) -> int:
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def evaluate(index, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    latencies = []
+    found = np.empty((len(queries), k), dtype=np.int64)
+    # One query at a time, as the app issues them
+    for row, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        found[row] = ids[0]
+    recall = np.mean([len(set(found[i]) & set(truth[i])) / k for i in range(len(queries))])
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "recall_at_k": float(recall),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "qps": float(len(queries) / sum(latencies)),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--vectors", type=int, default=100000)
+    arg_parser.add_argument("--queries", type=int, default=500)
+    arg_parser.add_argument("--k", type=int, default=10)
+    arg_parser.add_argument("--dim", type=int, default=384)
+    arg_parser.add_argument("--nlist", type=int, default=1024)
+    arg_parser.add_argument("--pq-m", type=int, default=48)
+    arg_parser.add_argument("--hnsw-m", type=int, default=32)
+    arg_parser.add_argument("--nprobe", default="1,8,32,128")
+    arg_parser.add_argument("--ef-search", default="16,64,256")
+    arg_parser.add_argument("--minilm", action="store_true", help="Embed synthetic resume chunks with MiniLM")
+    arg_parser.add_argument("--json", help="Also write results to this JSON file")
+    args = arg_parser.parse_args()
+
+    if args.minilm:
+        corpus, queries = minilm_vectors(args.vectors, args.queries)
+    else:
+        corpus = clustered_vectors(args.vectors + args.queries, args.dim, clusters=max(16, args.vectors // 500), seed=0)
+        corpus, queries = corpus[:args.vectors], corpus[args.vectors:]
+
+    exact = build_index("flat", corpus)
+    exact.add(corpus)
+    _, truth = exact.search(queries, args.k)
+
+    configs = [("flat", {}, [{}])]
+    configs.append(("ivf_flat", {"nlist": args.nlist}, [{"nprobe": int(n)} for n in args.nprobe.split(",")]))
+    configs.append(("ivf_pq", {"nlist": args.nlist, "pq_m": args.pq_m}, [{"nprobe": int(n)} for n in args.nprobe.split(",")]))
+    configs.append(("hnsw", {"hnsw_m": args.hnsw_m}, [{"ef_search": int(e)} for e in args.ef_search.split(",")]))
+
+    results = []
+    for index_type, build_args, search_settings in configs:
+        start = time.perf_counter()
+        index = build_index(index_type, corpus, **build_args)
+        index.add(corpus)
+        build_seconds = time.perf_counter() - start
+        memory_mb = index_bytes(index) / 2 ** 20
+        for settings in search_settings:
+            set_search_params(index, **settings)
+            result = {"index_type": index_type, **build_args, **settings,
+                      "build_seconds": build_seconds, "memory_mb": memory_mb}
+            result.update(evaluate(index, queries, truth, args.k))
+            results.append(result)
+
+    print(f"{'index':<9} {'setting':<14} {'recall@' + str(args.k):>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'QPS':>8} {'MB':>8} {'build s':>8}")
+    for r in results:
+        setting = ", ".join(f"{key}={r[key]}" for key in ("nprobe", "ef_search") if key in r) or "exact"
+        print(f"{r['index_type']:<9} {setting:<14} {r['recall_at_k']:>9.3f} {r['p50_ms']:>8.3f} "
+              f"{r['p95_ms']:>8.3f} {r['qps']:>8.0f} {r['memory_mb']:>8.1f} {r['build_seconds']:>8.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"vectors": len(corpus), "queries": len(queries), "k": args.k, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
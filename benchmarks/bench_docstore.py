@@ -0,0 +1,172 @@
+"""
+Startup time and resident memory of a saved vector store: pickled docstore versus the SQLite docstore.
+
+    python -m benchmarks.bench_docstore --chunks 100000
+
+Builds one synthetic corpus twice: in the old format (LangChain FAISS.save_local, which pickles every
+chunk's text and metadata next to the index) and with VectorStoreManager (index.faiss plus
+docstore.sqlite). Each is then opened in a fresh interpreter, which reports the seconds to load,
+the resident memory the load added, and the latency of the first similarity search; the new store
+is opened both normally and with mmap=True. For the new store it also times upserting and deleting
+one resume in place. Embeddings are deterministic fakes (384-d, MiniLM's size), so no model is needed.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+from benchmarks.synthetic import synthetic_resume
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIM = 384
+
+
+def rss_mb() -> float:
+    # Current (not peak) resident set size, from /proc on Linux
+    with open("/proc/self/status", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def directory_mb(directory: str) -> float:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)) / 2 ** 20
+
+
+def make_corpus(chunks: int) -> list:
+    # Synthetic resumes of ~4 chunks each, until the target chunk count is reached
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    corpus, total, index = [], 0, 0
+    while total < chunks:
+        text = synthetic_resume(index, jobs=4)
+        corpus.append((text, {"resume_id": f"resume-{index}", "source": f"resume-{index}.pdf"}))
+        total += len(splitter.split_text(text))
+        index += 1
+    return corpus
+
+
+def build_pickled(directory: str, corpus: list, embeddings):
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+    import faiss
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    texts, metadatas = [], []
+    for text, metadata in corpus:
+        for chunk in splitter.split_text(text):
+            texts.append(chunk)
+            metadatas.append(dict(metadata))
+    store = FAISS(embeddings, faiss.IndexFlatL2(DIM), InMemoryDocstore(), {})
+    store.add_embeddings(zip(texts, embeddings.embed_documents(texts)), metadatas=metadatas)
+    store.save_local(directory)
+
+
+def build_sqlite(directory: str, corpus: list, embeddings):
+    from src.vector_store import VectorStoreManager
+    store = VectorStoreManager(directory, embedding_model=embeddings, embedding_cache_dir=None)
+    store.add_resumes(corpus)
+    store.compact()
+    store.docstore.close()
+
+
+def load(mode: str, directory: str, query: str) -> dict:
+    """
+    Runs in the child interpreter: opens the store and measures it.
+    """
+    warnings.filterwarnings("ignore")
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    embeddings = DeterministicFakeEmbedding(size=DIM)
+    if mode == "pickle":
+        from langchain_community.vectorstores import FAISS
+    else:
+        from src.vector_store import VectorStoreManager
+    baseline = rss_mb()
+
+    start = time.perf_counter()
+    if mode == "pickle":
+        store = FAISS.load_local(directory, embeddings, allow_dangerous_deserialization=True)
+    else:
+        store = VectorStoreManager(directory, embedding_model=embeddings, embedding_cache_dir=None,
+                                   mmap=mode == "mmap")
+    result = {"load_seconds": time.perf_counter() - start, "load_rss_mb": rss_mb() - baseline}
+
+    start = time.perf_counter()
+    hits = store.similarity_search(query, k=5)
+    result["first_search_ms"] = (time.perf_counter() - start) * 1000
+    result["hits"] = len(hits)
+
+    if mode != "pickle":
+        start = time.perf_counter()
+        store.upsert_resume("resume-0", synthetic_resume(10 ** 6, jobs=4), {"source": "resume-0.pdf"})
+        result["upsert_ms"] = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        store.delete_resume("resume-1")
+        result["delete_ms"] = (time.perf_counter() - start) * 1000
+        result["chunks"] = store.index_stats()["chunks"]
+    else:
+        result["chunks"] = store.index.ntotal
+    result["total_rss_mb"] = rss_mb()
+    return result
+
+
+def measure(mode: str, directory: str, query: str) -> dict:
+    completed = subprocess.run([sys.executable, "-m", "benchmarks.bench_docstore", "--load", mode, directory,
+                                "--query", query], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--chunks", type=int, default=100000)
+    arg_parser.add_argument("--query", default="Senior Python engineer with Kubernetes and AWS experience")
+    arg_parser.add_argument("--load", nargs=2, metavar=("MODE", "DIRECTORY"), help=argparse.SUPPRESS)
+    arg_parser.add_argument("--json", help="Write results to this JSON file")
+    args = arg_parser.parse_args()
+
+    if args.load:
+        print(json.dumps(load(args.load[0], args.load[1], args.query)))
+        return
+
+    warnings.filterwarnings("ignore")
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    embeddings = DeterministicFakeEmbedding(size=DIM)
+    corpus = make_corpus(args.chunks)
+    workdir = tempfile.mkdtemp(prefix="bench_docstore_")
+    results = {}
+    try:
+        for mode, build in (("pickle", build_pickled), ("sqlite", build_sqlite)):
+            directory = os.path.join(workdir, mode)
+            start = time.perf_counter()
+            build(directory, corpus, embeddings)
+            results[mode] = {"build_seconds": time.perf_counter() - start, "disk_mb": directory_mb(directory)}
+        # The measurement upserts and deletes a resume, so the mmap run gets its own copy of the build
+        shutil.copytree(os.path.join(workdir, "sqlite"), os.path.join(workdir, "mmap"))
+        results["mmap"] = dict(results["sqlite"])
+        for mode in results:
+            results[mode].update(measure(mode, os.path.join(workdir, mode), args.query))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{len(corpus)} resumes, {results['sqlite']['chunks']} chunks")
+    print(f"{'docstore':<8} {'load s':>8} {'load RSS MB':>12} {'total RSS MB':>13} {'1st search ms':>14} "
+          f"{'disk MB':>8} {'upsert ms':>10} {'delete ms':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<8} {result['load_seconds']:>8.2f} {result['load_rss_mb']:>12.1f} "
+              f"{result['total_rss_mb']:>13.1f} {result['first_search_ms']:>14.1f} {result['disk_mb']:>8.1f} "
+              f"{result.get('upsert_ms', float('nan')):>10.1f} {result.get('delete_ms', float('nan')):>10.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"resumes": len(corpus), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
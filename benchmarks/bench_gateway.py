@@ -0,0 +1,134 @@
+"""
+Shared LLM gateway versus one client per engine, against a local rate-limited stub of the Groq API.
+
+    python -m benchmarks.bench_gateway --resumes 40 --rpm 60 --tpm 60000 --concurrency 8
+
+Both modes analyze the same synthetic resumes with ChatGroq pointed at benchmarks.stub_llm_server.
+"naive" builds a ChatGroq and RAGEngine per resume, as separate sessions did before the gateway, and
+leaves 429s to the SDK's own retries. "gateway" runs the whole batch through one process-wide
+LLMGateway on the batch lane while --probes interactive requests are sent alongside it. Reports
+wall-clock time, requests that reached the server, 429s, TCP connections opened, failed analyses,
+coalesced duplicates (--duplicates of the resumes are uploaded twice) and interactive latency.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_llm_server import start_server
+from benchmarks.synthetic import synthetic_job_description, synthetic_resume
+from src.llm_gateway import LLMGateway, get_gateway
+from src.rag_engine import RAGEngine
+
+MODEL = "llama-3.3-70b-versatile"
+
+
+def make_resumes(count: int, duplicates: float) -> list:
+    # A duplicate follows its original immediately, like the same file uploaded twice at once
+    every = round(1 / duplicates) if duplicates else count + 1
+    resumes, seed = [], 0
+    while len(resumes) < count:
+        resumes.append((f"candidate-{len(resumes)}", synthetic_resume(seed, jobs=3)))
+        if len(resumes) % every == 0 and len(resumes) < count:
+            resumes.append((f"candidate-{len(resumes)}", resumes[-1][1]))
+        seed += 1
+    return resumes
+
+
+def run_naive(base_url: str, resumes: list, job_description: str, concurrency: int) -> dict:
+    from langchain_groq import ChatGroq
+
+    def screen(name, text):
+        # New client per engine and the SDK's default retries, with no coordination between threads
+        llm = ChatGroq(temperature=0, groq_api_key="gsk_stub", model_name=MODEL, base_url=base_url)
+        engine = RAGEngine(gateway=LLMGateway(llm, max_retries=0))
+        return engine.screen_resume(name, text, job_description, validate=False, use_cache=False)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        rows = list(executor.map(lambda row: screen(*row), resumes))
+    return {"failed": sum(1 for row in rows if row["error"])}
+
+
+def run_gateway(base_url: str, resumes: list, job_description: str, concurrency: int, rpm: int, tpm: int,
+                probes: int) -> dict:
+    gateway = get_gateway(MODEL, api_key="gsk_stub", base_url=base_url, requests_per_minute=rpm,
+                          tokens_per_minute=tpm)
+    engine = RAGEngine(gateway=gateway)
+    probe_latencies = []
+
+    def probe():
+        # Interactive requests from "another user" while the batch saturates the quota
+        for index in range(probes):
+            time.sleep(0.5)
+            start = time.perf_counter()
+            engine.analyze_resume(synthetic_resume(10_000 + index, jobs=2), job_description, use_cache=False)
+            probe_latencies.append(time.perf_counter() - start)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    rows = list(engine.analyze_many(resumes, job_description, max_workers=concurrency, validate=False,
+                                    use_cache=False))
+    prober.join()
+    stats = engine.gateway_stats()
+    waited = stats.get("waited_seconds", {})
+    admitted = stats.get("admitted", {})
+    return {
+        "failed": sum(1 for row in rows if row["error"]),
+        "coalesced": stats.get("coalesced", 0),
+        "retried_429": stats.get("rate_limited", 0),
+        "interactive_p50_seconds": statistics.median(probe_latencies) if probe_latencies else None,
+        "interactive_mean_wait_seconds": waited.get("interactive", 0.0) / admitted["interactive"]
+        if admitted.get("interactive") else None,
+        "batch_mean_wait_seconds": waited.get("batch", 0.0) / admitted["batch"] if admitted.get("batch") else None,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--resumes", type=int, default=40)
+    arg_parser.add_argument("--duplicates", type=float, default=0.25, help="Fraction of resumes uploaded twice")
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    arg_parser.add_argument("--rpm", type=int, default=60, help="Stub's requests-per-minute limit")
+    arg_parser.add_argument("--tpm", type=int, default=60000, help="Stub's tokens-per-minute limit")
+    arg_parser.add_argument("--latency", type=float, default=0.2, help="Stub seconds per completion")
+    arg_parser.add_argument("--probes", type=int, default=3, help="Interactive requests during the gateway run")
+    arg_parser.add_argument("--modes", default="naive,gateway")
+    arg_parser.add_argument("--json", help="Write results to this JSON file")
+    args = arg_parser.parse_args()
+
+    resumes = make_resumes(args.resumes, args.duplicates)
+    job_description = synthetic_job_description()
+    results = {}
+    for mode in args.modes.split(","):
+        # A fresh stub per mode, so each starts with its full quota
+        server = start_server(args.rpm, args.tpm, args.latency)
+        start = time.perf_counter()
+        try:
+            if mode == "naive":
+                result = run_naive(server.base_url, resumes, job_description, args.concurrency)
+            else:
+                result = run_gateway(server.base_url, resumes, job_description, args.concurrency, args.rpm,
+                                     args.tpm, args.probes)
+        finally:
+            server.shutdown()
+        result["elapsed_seconds"] = time.perf_counter() - start
+        server_stats = server.stats()
+        result["server_requests"] = server_stats.get("requests", 0)
+        result["server_429s"] = server_stats.get("rate_limited", 0)
+        result["connections"] = server_stats.get("connections", 0)
+        results[mode] = result
+
+    for mode, result in results.items():
+        print(f"{mode}:")
+        for key, value in result.items():
+            print(f"  {key:<30} {value:.3f}" if isinstance(value, float) else f"  {key:<30} {value}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Ingest throughput of VectorStoreManager versus batch size.
+
+    python -m benchmarks.bench_ingest --resumes 500 --batch-sizes 1,16,64,256
+
+Each run ingests the same synthetic corpus into a fresh temporary index. The "legacy" row reproduces
+the old behaviour (one resume per call, full index rewrite after every add) for comparison.
+Use --fake-embeddings to isolate indexing and I/O cost from MiniLM inference, and --embedding-cache
+to ingest every batch size twice through one shared embedding cache (cold, then warm).
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_corpus
+from src.vector_store import VectorStoreManager
+
+
+def make_embeddings(fake: bool):
+    if fake:
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        return DeterministicFakeEmbedding(size=384)
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+
+
+def run_batched(corpus, embeddings, batch_size: int, embedding_cache_dir=None, label: str = "") -> dict:
+    directory = tempfile.mkdtemp(prefix="bench_ingest_")
+    try:
+        store = VectorStoreManager(directory, embedding_model=embeddings, embedding_cache_dir=embedding_cache_dir)
+        start = time.perf_counter()
+        chunks = 0
+        for offset in range(0, len(corpus), batch_size):
+            chunks += store.add_resumes(corpus[offset:offset + batch_size])
+        store.compact()
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {"mode": f"batch={batch_size}{label}", "seconds": elapsed, "chunks": chunks,
+            "embedding_cache": store.embedding_stats()}
+
+
+def run_legacy(corpus, embeddings) -> dict:
+    directory = tempfile.mkdtemp(prefix="bench_ingest_")
+    try:
+        store = VectorStoreManager(directory, embedding_model=embeddings, embedding_cache_dir=None)
+        start = time.perf_counter()
+        chunks = 0
+        for item in corpus:
+            chunks += store.add_resumes([item], persist=False)
+            store.compact()
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {"mode": "legacy", "seconds": elapsed, "chunks": chunks}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--resumes", type=int, default=500)
+    arg_parser.add_argument("--batch-sizes", default="1,16,64,256")
+    arg_parser.add_argument("--jobs", type=int, default=4, help="Jobs per synthetic resume (controls length)")
+    arg_parser.add_argument("--fake-embeddings", action="store_true")
+    arg_parser.add_argument("--skip-legacy", action="store_true")
+    arg_parser.add_argument("--embedding-cache", action="store_true",
+                            help="Run each batch size cold and then warm against a temporary embedding cache")
+    arg_parser.add_argument("--json", help="Also write results to this JSON file")
+    args = arg_parser.parse_args()
+
+    corpus = synthetic_corpus(args.resumes, jobs=args.jobs)
+    embeddings = make_embeddings(args.fake_embeddings)
+
+    results = []
+    if not args.skip_legacy:
+        results.append(run_legacy(corpus, embeddings))
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        if args.embedding_cache:
+            cache_dir = tempfile.mkdtemp(prefix="bench_embedding_cache_")
+            try:
+                results.append(run_batched(corpus, embeddings, batch_size, cache_dir, " cold"))
+                results.append(run_batched(corpus, embeddings, batch_size, cache_dir, " warm"))
+            finally:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+        else:
+            results.append(run_batched(corpus, embeddings, batch_size))
+
+    print(f"{'mode':<16} {'seconds':>8} {'resumes/s':>10} {'chunks/s':>10} {'cache hit':>9}")
+    for result in results:
+        result["resumes_per_second"] = len(corpus) / result["seconds"]
+        result["chunks_per_second"] = result["chunks"] / result["seconds"]
+        hit_rate = result.get("embedding_cache", {}).get("hit_rate")
+        print(f"{result['mode']:<16} {result['seconds']:>8.2f} "
+              f"{result['resumes_per_second']:>10.1f} {result['chunks_per_second']:>10.1f} "
+              f"{'-' if hit_rate is None else f'{hit_rate:.0%}':>9}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"resumes": len(corpus), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Offline end-to-end benchmark: parsing, text cleaning, vector store ingest/search and the LLM pipeline.
+
+    python -m benchmarks.bench_pipeline --resumes 60 --json results.json
+    python -m benchmarks.bench_pipeline --json new.json --compare results.json --tolerance 0.15
+
+Synthetic resumes of one to four pages are written as PDF, DOCX and TXT. ChatGroq is replaced by the
+deterministic fake chat model with --llm-latency seconds per call, and embeddings are deterministic
+fakes unless --minilm is given, so runs need no network and are comparable between versions.
+Each stage reports throughput and p50/p95/p99 latency. With --compare, stages whose p50/p95 grew or
+whose throughput dropped by more than --tolerance against a previous JSON run are listed as
+regressions and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_job_description, write_corpus
+from src.fake_llm import FakeChatModel
+from src.parser import ResumeParser
+from src.rag_engine import RAGEngine
+from src.utils import clean_text, normalization_summary, normalize_pages
+from src.vector_store import VectorStoreManager
+
+# Metrics where a larger value in the new run is a regression, and the one where a smaller value is
+LOWER_IS_BETTER = ("p50_ms", "p95_ms")
+HIGHER_IS_BETTER = ("throughput_per_second",)
+
+
+def summarize(latencies: list, total_seconds: float = None) -> dict:
+    """
+    Latency percentiles (ms) and throughput for one stage. `total_seconds` defaults to the sum of the
+    latencies; pass the wall-clock time for stages that run items concurrently.
+    """
+    latencies_ms = np.array(latencies) * 1000
+    total_seconds = sum(latencies) if total_seconds is None else total_seconds
+    return {
+        "count": len(latencies),
+        "total_seconds": total_seconds,
+        "throughput_per_second": len(latencies) / total_seconds if total_seconds else 0.0,
+        "mean_ms": float(latencies_ms.mean()),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_parse(paths: list, parser: ResumeParser) -> dict:
+    stages = {}
+    by_format = {}
+    for path in paths:
+        _, seconds = timed(parser.parse, path)
+        by_format.setdefault(os.path.splitext(path)[1], []).append(seconds)
+    stages["parse"] = summarize([s for latencies in by_format.values() for s in latencies])
+    for extension, latencies in sorted(by_format.items()):
+        stages[f"parse{extension}"] = summarize(latencies)
+    return stages
+
+
+def bench_clean_text(raw_texts: list, repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        for text in raw_texts:
+            latencies.append(timed(clean_text, text)[1])
+    stats = summarize(latencies)
+    stats["mb_per_second"] = sum(len(text.encode("utf-8")) for text in raw_texts) * repeat / 2 ** 20 / stats["total_seconds"]
+    return stats
+
+
+def bench_normalize(documents: list, repeat: int) -> dict:
+    # `documents` are (pages, is_pdf) pairs, normalized the way ResumeParser.parse does it
+    latencies, reports = [], []
+    for _ in range(repeat):
+        for pages, is_pdf in documents:
+            report = {}
+            latencies.append(timed(normalize_pages, pages, is_pdf, report)[1])
+            reports.append(report)
+    stats = summarize(latencies)
+    summary = normalization_summary(reports[:len(documents)])
+    size = sum(len(page.encode("utf-8")) for pages, _ in documents for page in pages)
+    stats["mb_per_second"] = size * repeat / 2 ** 20 / stats["total_seconds"]
+    stats["tokens_removed_per_document"] = summary["tokens_removed"] / len(documents)
+    stats["token_reduction"] = summary["token_reduction"]
+    stats["header_footer_lines"] = summary["header_footer_lines"]
+    stats["page_numbers"] = summary["page_numbers"]
+    return stats
+
+
+def bench_vector_store(texts: list, job_description: str, embeddings, queries: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        store = VectorStoreManager(directory, embedding_model=embeddings, embedding_cache_dir=None)
+        ingest = [timed(store.add_resume, text, {"resume_id": f"resume-{i}"})[1] for i, text in enumerate(texts)]
+        search = [timed(store.similarity_search, job_description, k=5)[1] for _ in range(queries)]
+        rank = [timed(store.rank_candidates, job_description, top_n=10)[1] for _ in range(queries)]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {"vector_ingest": summarize(ingest), "vector_search": summarize(search),
+            "vector_rank_candidates": summarize(rank)}
+
+
+def bench_llm_pipeline(texts: list, job_description: str, latency: float, llm_validation: bool,
+                       concurrency: int) -> dict:
+    engine = RAGEngine(llm=FakeChatModel(latency=latency), local_classifier=not llm_validation)
+
+    def pipeline(text):
+        if engine.validate_resume(text):
+            engine.analyze_resume(text, job_description)
+
+    sequential = [timed(pipeline, text)[1] for text in texts]
+    stages = {"pipeline": summarize(sequential)}
+
+    # Same work through analyze_many, reported with wall-clock throughput
+    start = time.perf_counter()
+    rows = list(engine.analyze_many(((str(i), text) for i, text in enumerate(texts)), job_description,
+                                    max_workers=concurrency, use_cache=False))
+    stages[f"pipeline_concurrent_{concurrency}"] = summarize([row["elapsed"] for row in rows],
+                                                             time.perf_counter() - start)
+    return stages
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """
+    Returns human-readable regressions of `current` against `baseline` (both bench_pipeline JSON results).
+    """
+    regressions = []
+    for stage, stats in current["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if old is None:
+            continue
+        for metric in LOWER_IS_BETTER:
+            if old[metric] and stats[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{stage}: {metric} {old[metric]:.3f} -> {stats[metric]:.3f} "
+                                   f"(+{stats[metric] / old[metric] - 1:.0%})")
+        for metric in HIGHER_IS_BETTER:
+            if old[metric] and stats[metric] < old[metric] * (1 - tolerance):
+                regressions.append(f"{stage}: {metric} {old[metric]:.1f} -> {stats[metric]:.1f} "
+                                   f"({stats[metric] / old[metric] - 1:.0%})")
+    return regressions
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def make_embeddings(minilm: bool):
+    if minilm:
+        from src.vector_store import LazyHuggingFaceEmbeddings
+        return LazyHuggingFaceEmbeddings()
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    return DeterministicFakeEmbedding(size=384)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--resumes", type=int, default=60, help="Synthetic resumes (split across formats)")
+    arg_parser.add_argument("--max-jobs", type=int, default=10, help="Longest resume, in jobs (~0.4 pages each)")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    arg_parser.add_argument("--llm-validation", action="store_true",
+                            help="Validate with the LLM instead of the local classifier")
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    arg_parser.add_argument("--queries", type=int, default=100, help="Vector searches to time")
+    arg_parser.add_argument("--clean-repeat", type=int, default=20,
+                            help="Passes over the corpus for clean_text and normalize_pages")
+    arg_parser.add_argument("--minilm", action="store_true", help="Embed with MiniLM instead of fake embeddings")
+    arg_parser.add_argument("--json", help="Write results to this JSON file")
+    arg_parser.add_argument("--compare", help="Previous JSON results to check for regressions")
+    arg_parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown")
+    args = arg_parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench_corpus_")
+    try:
+        paths = write_corpus(directory, args.resumes, max_jobs=args.max_jobs)
+        parser = ResumeParser()
+        # Untimed warm-up so lazy imports are not charged to the first file
+        parser.parse(paths[0])
+        stages = bench_parse(paths, parser)
+        documents = [(list(parser.iter_pages(path)), path.endswith(".pdf")) for path in paths]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    raw_texts = [" ".join(pages) for pages, _ in documents]
+    texts = [normalize_pages(pages, is_pdf) for pages, is_pdf in documents]
+    job_description = synthetic_job_description()
+    stages["clean_text"] = bench_clean_text(raw_texts, args.clean_repeat)
+    stages["normalize_pages"] = bench_normalize(documents, args.clean_repeat)
+    stages.update(bench_vector_store(texts, job_description, make_embeddings(args.minilm), args.queries))
+    stages.update(bench_llm_pipeline(texts, job_description, args.llm_latency, args.llm_validation,
+                                     args.concurrency))
+
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": vars(args),
+        },
+        "stages": stages,
+    }
+
+    print(f"{'stage':<24} {'count':>6} {'per s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, stats in stages.items():
+        print(f"{stage:<24} {stats['count']:>6} {stats['throughput_per_second']:>10.1f} {stats['p50_ms']:>9.3f} "
+              f"{stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f}")
+    normalize = stages["normalize_pages"]
+    print(f"\nnormalize_pages: {normalize['mb_per_second']:.1f} MB/s, "
+          f"~{normalize['tokens_removed_per_document']:.0f} tokens removed per document "
+          f"({normalize['token_reduction']:.0%}; {normalize['header_footer_lines']} header/footer lines and "
+          f"{normalize['page_numbers']} page numbers dropped); "
+          f"clean_text: {stages['clean_text']['mb_per_second']:.1f} MB/s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.tolerance)
+        print(f"\nCompared with {baseline.get('meta', {}).get('revision', args.compare)}: "
+              f"{len(regressions) or 'no'} regression(s) beyond {args.tolerance:.0%}")
+        for line in regressions:
+            print(f"  {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
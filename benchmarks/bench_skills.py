@@ -0,0 +1,109 @@
+"""
+Throughput of the local skill matcher on a synthetic resume corpus, against one regex per alias.
+
+    python -m benchmarks.bench_skills --resumes 10000
+
+SkillMatcher scans each resume once with its Aho-Corasick automaton; the baseline runs a word-boundary
+regex for every alias in the taxonomy over every resume, which is what a straightforward
+implementation does. The baseline runs on --baseline-sample resumes only (it is much slower) and
+its results are checked against the matcher's. Resumes vary from one to several pages.
+"""
+import argparse
+import json
+import re
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_job_description, synthetic_resume
+from src.skills import SkillMatcher
+
+
+def regex_baseline(taxonomy: dict, matched_aliases: dict):
+    # matched_aliases is SkillMatcher.aliases: the lower-cased spellings matched for each skill
+    patterns = [(canonical, re.compile(r"(?<![a-z0-9])" + re.escape(alias) + r"(?![a-z0-9])"))
+                for canonical, aliases in matched_aliases.items()
+                for alias in aliases]
+
+    def extract(text: str) -> list:
+        lowered = text.lower()
+        found = {canonical for canonical, pattern in patterns if pattern.search(lowered)}
+        return [skill for skill in taxonomy if skill in found]
+    return extract, len(patterns)
+
+
+def run(extract, texts: list) -> dict:
+    latencies = []
+    results = []
+    for text in texts:
+        start = time.perf_counter()
+        results.append(extract(text))
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 2 ** 20
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "resumes": len(texts),
+        "total_seconds": total,
+        "resumes_per_second": len(texts) / total,
+        "mb_per_second": megabytes / total,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+    }, results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--resumes", type=int, default=10000)
+    arg_parser.add_argument("--baseline-sample", type=int, default=500, help="Resumes to run the regex baseline on")
+    arg_parser.add_argument("--json", help="Write results to this JSON file")
+    args = arg_parser.parse_args()
+
+    # One to six jobs per resume, i.e. roughly half a page to three pages
+    texts = [synthetic_resume(i, jobs=1 + i % 6) for i in range(args.resumes)]
+    job_description = synthetic_job_description()
+
+    start = time.perf_counter()
+    matcher = SkillMatcher()
+    build_seconds = time.perf_counter() - start
+    matcher_stats, matcher_results = run(matcher.extract, texts)
+
+    start = time.perf_counter()
+    for text in texts:
+        matcher.match(text, job_description)
+    match_seconds = time.perf_counter() - start
+
+    baseline, alias_count = regex_baseline(matcher.taxonomy, matcher.aliases)
+    sample = texts[:args.baseline_sample]
+    baseline_stats, baseline_results = run(baseline, sample)
+    mismatches = sum(1 for a, b in zip(matcher_results, baseline_results) if a != b)
+
+    results = {
+        "taxonomy_skills": len(matcher.taxonomy),
+        "aliases": alias_count,
+        "automaton_states": len(matcher._goto),
+        "build_ms": build_seconds * 1000,
+        "aho_corasick": matcher_stats,
+        "match_with_job_description_seconds": match_seconds,
+        "regex_per_alias": baseline_stats,
+        "speedup": matcher_stats["resumes_per_second"] / baseline_stats["resumes_per_second"],
+        "baseline_mismatches": mismatches,
+    }
+
+    print(f"Taxonomy: {results['taxonomy_skills']} skills, {alias_count} aliases, "
+          f"{results['automaton_states']} automaton states, built in {results['build_ms']:.1f} ms")
+    for name in ("aho_corasick", "regex_per_alias"):
+        stats = results[name]
+        print(f"{name:<16} {stats['resumes']:>6} resumes  {stats['resumes_per_second']:>8.0f}/s  "
+              f"{stats['mb_per_second']:>6.2f} MB/s  p50 {stats['p50_ms']:.3f} ms  p95 {stats['p95_ms']:.3f} ms")
+    print(f"Full match() against one job description for {len(texts)} resumes: {match_seconds:.2f}s")
+    print(f"Speed-up over per-alias regexes: {results['speedup']:.1f}x, "
+          f"{mismatches} of {len(sample)} sampled resumes disagree")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Cold-start budget of the Streamlit app: import time per module and time to first render.
+
+    python -m benchmarks.bench_startup --reruns 20
+
+Import times come from `python -X importtime` in a fresh interpreter per module, so each row is the
+cold cost of importing that module (and everything it pulls in) on its own. When Streamlit is
+installed, app.py is then run headlessly with streamlit.testing: the first run is the cold start and
+the following reruns show the warm per-interaction overhead.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = ["streamlit", "src.cache", "src.batch", "src.parser", "src.rag_engine", "src.vector_store",
+           "pandas", "plotly.express", "langchain_huggingface", "sentence_transformers", "faiss"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(module: str):
+    """
+    Returns (cumulative import seconds, number of modules loaded) for `module`, or None if it is not installed.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return None
+    # Lines look like "import time:   self [us] | cumulative | imported package"; the last one is the root
+    rows = [line for line in completed.stderr.splitlines() if line.startswith("import time:") and "|" in line]
+    rows = [row for row in rows if not row.rstrip().endswith("imported package")]
+    cumulative_us = int(rows[-1].split("|")[1])
+    return cumulative_us / 1e6, len(rows)
+
+
+def render_times(reruns: int):
+    """
+    Runs app.py headlessly once cold and `reruns` more times warm. Returns None without Streamlit.
+    """
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    start = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        warm.append(time.perf_counter() - start)
+    return {"cold_seconds": cold, "warm_p50_seconds": statistics.median(warm) if warm else None,
+            "warm_max_seconds": max(warm) if warm else None}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--reruns", type=int, default=20)
+    arg_parser.add_argument("--modules", default=",".join(MODULES))
+    arg_parser.add_argument("--warm-budget", type=float, default=1.0, help="Target seconds per warm rerun")
+    arg_parser.add_argument("--json", help="Also write results to this JSON file")
+    args = arg_parser.parse_args()
+
+    imports = {}
+    print(f"{'module':<24} {'import ms':>10} {'modules':>8}")
+    for module in args.modules.split(","):
+        measured = import_time(module)
+        imports[module] = None if measured is None else {"seconds": measured[0], "modules": measured[1]}
+        if measured is None:
+            print(f"{module:<24} {'not installed':>19}")
+        else:
+            print(f"{module:<24} {measured[0] * 1000:>10.0f} {measured[1]:>8}")
+
+    render = render_times(args.reruns)
+    if render is None:
+        print("\nStreamlit is not installed; skipping time to first render")
+    else:
+        print(f"\nFirst render (cold): {render['cold_seconds'] * 1000:.0f} ms")
+        if render["warm_p50_seconds"] is not None:
+            verdict = "within" if render["warm_max_seconds"] <= args.warm_budget else "OVER"
+            print(f"Warm rerun: p50 {render['warm_p50_seconds'] * 1000:.0f} ms, "
+                  f"max {render['warm_max_seconds'] * 1000:.0f} ms ({verdict} the {args.warm_budget:.1f}s budget)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"imports": imports, "render": render}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
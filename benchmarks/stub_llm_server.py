@@ -0,0 +1,184 @@
+"""
+Local stand-in for the Groq chat completions API that enforces rate limits, for testing the LLM gateway.
+
+    python -m benchmarks.stub_llm_server --port 8765 --rpm 120 --tpm 60000
+    GROQ_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+
+Serves POST /openai/v1/chat/completions (plain and "stream": true) with the deterministic fake chat
+model's answers and realistic usage. Requests beyond the --rpm or --tpm budget get a 429 with a
+Retry-After header, like the real API. Counters are available at GET /stats.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.fake_llm import FakeChatModel
+
+
+class RateBuckets:
+    """
+    Requests-per-minute and tokens-per-minute buckets that refill continuously, as Groq's limits do.
+    A request is rejected unless both buckets can cover it.
+    """
+
+    def __init__(self, requests_per_minute: int = None, tokens_per_minute: int = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def admit(self, tokens: int) -> float:
+        """
+        Takes capacity and returns 0 if the request is within the limits, else the seconds until it would be.
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed, self._updated = now - self._updated, now
+            retry = 0.0
+            if self.requests_per_minute:
+                self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+                if self._requests < 1:
+                    retry = (1 - self._requests) * 60 / self.requests_per_minute
+            if self.tokens_per_minute:
+                self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+                needed = min(tokens, self.tokens_per_minute)
+                if self._tokens < needed:
+                    retry = max(retry, (needed - self._tokens) * 60 / self.tokens_per_minute)
+            if retry > 0:
+                return retry
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            return 0.0
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, requests_per_minute: int = None, tokens_per_minute: int = None,
+                 latency: float = 0.0):
+        super().__init__(address, StubHandler)
+        self.limits = RateBuckets(requests_per_minute, tokens_per_minute)
+        self.model = FakeChatModel()
+        self.latency = latency
+        self.counts = Counter()
+        self.counts_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str):
+        with self.counts_lock:
+            self.counts[key] += 1
+
+    def stats(self) -> dict:
+        with self.counts_lock:
+            return dict(self.counts)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # One handler per TCP connection, so this shows whether clients reuse pooled connections
+        super().setup()
+        self.server.count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/stats":
+            return self._json(404, {"error": {"message": "not found"}})
+        self._json(200, self.server.stats())
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            return self._json(404, {"error": {"message": "not found"}})
+        self.server.count("requests")
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        content = self.server.model._respond(prompt)
+        usage = FakeChatModel._usage(prompt, content)
+        usage = {"prompt_tokens": usage["input_tokens"], "completion_tokens": usage["output_tokens"],
+                 "total_tokens": usage["total_tokens"]}
+
+        retry = self.server.limits.admit(usage["total_tokens"])
+        if retry:
+            self.server.count("rate_limited")
+            return self._json(429, {"error": {"message": "Rate limit reached", "type": "tokens",
+                                              "code": "rate_limit_exceeded"}},
+                              {"Retry-After": f"{retry:.2f}"})
+        self.server.count("completed")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        completion = {"id": f"chatcmpl-{uuid.uuid4().hex}", "created": int(time.time()),
+                      "model": body.get("model", "stub")}
+        if not body.get("stream"):
+            return self._json(200, {**completion, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}]})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+        for index, piece in enumerate(pieces):
+            last = index == len(pieces) - 1
+            chunk = {**completion, "object": "chat.completion.chunk", "choices": [
+                {"index": 0, "delta": {"content": piece}, "finish_reason": "stop" if last else None}]}
+            if last:
+                # Groq reports streaming usage under x_groq on the final chunk
+                chunk["x_groq"] = {"usage": usage}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def _json(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_server(requests_per_minute: int = None, tokens_per_minute: int = None, latency: float = 0.0,
+                 port: int = 0) -> StubLLMServer:
+    """
+    Starts the stub on a background thread (port 0 picks a free one) and returns it; call shutdown() to stop.
+    """
+    server = StubLLMServer(("127.0.0.1", port), requests_per_minute, tokens_per_minute, latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--rpm", type=int, help="Requests per minute before 429s")
+    arg_parser.add_argument("--tpm", type=int, help="Tokens per minute before 429s")
+    arg_parser.add_argument("--latency", type=float, default=0.2, help="Seconds per completion")
+    args = arg_parser.parse_args()
+    server = StubLLMServer(("127.0.0.1", args.port), args.rpm, args.tpm, args.latency)
+    print(f"Stub LLM API on {server.base_url} (rpm={args.rpm}, tpm={args.tpm})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
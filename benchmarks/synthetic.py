@@ -0,0 +1,182 @@
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+FIRST_NAMES = ["Aarav", "Maya", "Liam", "Sofia", "Noah", "Priya", "Ethan", "Chen", "Fatima", "Lucas"]
+LAST_NAMES = ["Sharma", "Garcia", "Smith", "Nguyen", "Okafor", "Müller", "Kim", "Rossi", "Patel", "Silva"]
+TITLES = ["Software Engineer", "Data Scientist", "DevOps Engineer", "Backend Developer",
+          "Machine Learning Engineer", "Frontend Developer", "Data Engineer", "QA Engineer"]
+SKILLS = ["Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "SQL", "PostgreSQL", "MongoDB",
+          "Docker", "Kubernetes", "AWS", "Azure", "GCP", "Terraform", "React", "Django", "Flask",
+          "FastAPI", "Spark", "Airflow", "PyTorch", "TensorFlow", "scikit-learn", "Pandas", "Kafka",
+          "Redis", "GraphQL", "CI/CD", "Linux"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech"]
+VERBS = ["Built", "Designed", "Led", "Optimized", "Migrated", "Automated", "Scaled", "Refactored"]
+OBJECTS = ["a real-time analytics pipeline", "the payments API", "an internal ML platform",
+           "the customer onboarding flow", "a distributed job scheduler", "the search service",
+           "monitoring and alerting", "the data warehouse"]
+DEGREES = ["B.Tech in Computer Science", "BSc in Mathematics", "MSc in Data Science", "MEng in Software Engineering"]
+
+
+def synthetic_resume(index: int, jobs: int = 3, bullets_per_job: int = 4, seed: int = 0) -> str:
+    """
+    Returns a deterministic, plausible plain-text resume. `jobs` and `bullets_per_job` control length,
+    so the same generator covers one-page and multi-page documents.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    title = rng.choice(TITLES)
+    skills = rng.sample(SKILLS, 8)
+
+    lines = [
+        name,
+        f"{title} | {name.split()[0].lower()}.{index}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "",
+        "Summary",
+        f"{title} with {rng.randint(2, 15)} years of experience delivering production systems using "
+        f"{skills[0]}, {skills[1]} and {skills[2]}.",
+        "",
+        "Experience",
+    ]
+    year = 2024
+    for _ in range(jobs):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({start} - {year})")
+        for _ in range(bullets_per_job):
+            lines.append(f"• {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(skills)}, "
+                         f"improving throughput by {rng.randint(10, 80)}%.")
+        year = start
+    lines += [
+        "",
+        "Education",
+        f"{rng.choice(DEGREES)}, {year - 4} - {year}",
+        "",
+        "Skills",
+        ", ".join(skills),
+    ]
+    return "\n".join(lines)
+
+
+def synthetic_job_description(seed: int = 0) -> str:
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, 6)
+    return (
+        f"We are hiring a {rng.choice(TITLES)}.\n"
+        "Requirements:\n"
+        + "\n".join(f"- Strong experience with {skill}" for skill in skills)
+        + "\n- Bachelor's degree in Computer Science or a related field\n"
+        "- Excellent communication skills"
+    )
+
+
+def synthetic_corpus(count: int, jobs: int = 3, bullets_per_job: int = 4, seed: int = 0) -> list:
+    """
+    Returns `count` (text, metadata) pairs ready for VectorStoreManager.add_resumes.
+    """
+    return [
+        (synthetic_resume(i, jobs, bullets_per_job, seed), {"resume_id": f"resume-{i}", "source": f"resume-{i}.txt"})
+        for i in range(count)
+    ]
+
+
+def write_txt(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_pdf(path: str, text: str, lines_per_page: int = 48, running_header: bool = True):
+    """
+    Writes `text` as a plain multi-page PDF (Helvetica, one text line per input line) using only the
+    standard library, so benchmarks need no PDF-generation dependency. With running_header, every
+    page starts with the first line of `text` as a header and ends with a "Page i of n" footer, as
+    word-processor exports do.
+    """
+    lines = text.splitlines() or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    if running_header:
+        pages = [[f"{lines[0]} - Curriculum Vitae"] + page + [f"Page {number} of {len(pages)}"]
+                 for number, page in enumerate(pages, 1)]
+    # 1: catalog, 2: page tree, 3: font, then a (page, content stream) pair per page
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for page in pages:
+        body = b"".join(b"(" + _pdf_escape(line) + b") Tj T* " for line in page)
+        stream = b"BT /F1 10 Tf 14 TL 56 790 Td " + body + b"ET"
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R".encode())
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+                       f"/Contents {page_number + 1} 0 R >>".encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + f"] /Count {len(pages)} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def _pdf_escape(line: str) -> bytes:
+    data = line.encode("cp1252", "replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def write_docx(path: str, text: str):
+    """
+    Writes `text` as a minimal DOCX (one paragraph per line) with the standard library's zipfile.
+    """
+    paragraphs = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>"
+                         for line in text.splitlines())
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f"<w:body>{paragraphs}</w:body></w:document>")
+    content_types = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                     '<Default Extension="xml" ContentType="application/xml"/>'
+                     '<Override PartName="/word/document.xml" '
+                     'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                     '</Types>')
+    relationships = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                     '<Relationship Id="rId1" Target="word/document.xml" '
+                     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+                     '</Relationships>')
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", content_types)
+        archive.writestr("_rels/.rels", relationships)
+        archive.writestr("word/document.xml", document)
+
+
+WRITERS = {".txt": write_txt, ".pdf": write_pdf, ".docx": write_docx}
+
+
+def write_corpus(directory: str, count: int, formats=(".pdf", ".docx", ".txt"), min_jobs: int = 1,
+                 max_jobs: int = 10, seed: int = 0, pdf_lines_per_page: int = 16) -> list:
+    """
+    Writes `count` synthetic resumes to `directory`, cycling through `formats` and through lengths
+    from min_jobs to max_jobs jobs. PDFs are paginated at `pdf_lines_per_page` lines, so every one
+    of them spans several pages (two to four by default) and the running-header/footer and
+    page-number handling of normalize_pages is exercised. Returns the file paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        extension = formats[i % len(formats)]
+        jobs = min_jobs + (i // len(formats)) % (max_jobs - min_jobs + 1)
+        path = os.path.join(directory, f"resume-{i}{extension}")
+        text = synthetic_resume(i, jobs=jobs, seed=seed)
+        if extension == ".pdf":
+            write_pdf(path, text, lines_per_page=pdf_lines_per_page)
+        else:
+            WRITERS[extension](path, text)
+        paths.append(path)
+    return paths
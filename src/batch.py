@@ -0,0 +1,164 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from src.tracing import tracer
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+def find_resumes(directory: str) -> list:
+    """
+    Returns the sorted paths of all supported resume files directly inside `directory`.
+    """
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS
+    )
+
+
+def iter_parsed(sources, parse_fn, workers: int = 4, name_fn=os.path.basename):
+    """
+    Parses `sources` on a worker pool and yields (name, text) pairs in input order.
+    Sources that fail to parse are yielded with the exception instead of the text, so the
+    screening stage can report them without stopping the pipeline.
+    """
+    sources = list(sources)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # executor.map submits everything up front, so parsing runs ahead of the LLM stage
+        results = executor.map(_safe_parse, [parse_fn] * len(sources), sources)
+        for source, text in zip(sources, results):
+            yield name_fn(source), text
+
+
+def iter_parsed_files(paths, parser, workers: int = None, timeout: float = 60.0, max_memory_mb: int = None):
+    """
+    Process-pool variant of iter_parsed for files on disk, backed by ResumeParser.parse_many.
+    Yields (name, text) pairs in completion order; files that fail, time out or exceed the memory
+    budget are yielded with a RuntimeError instead of the text.
+    """
+    for result in parser.parse_many(paths, workers=workers, timeout=timeout, max_memory_mb=max_memory_mb):
+        name = os.path.basename(result["path"])
+        # Spans recorded inside the worker processes are lost, so the parse is traced from here
+        tracer.record("parse", result["elapsed"], format=os.path.splitext(name)[1].lower(), worker=True,
+                      error=result["error"])
+        if result["error"] is not None:
+            yield name, RuntimeError(result["error"])
+        else:
+            yield name, result["text"]
+
+
+def _safe_parse(parse_fn, source):
+    try:
+        return parse_fn(source)
+    except Exception as e:
+        return e
+
+
+def shortlist_resumes(resumes, job_description: str, store, top_n: int, aggregate: str = "mean_top_k"):
+    """
+    Indexes (name, text) pairs in a VectorStoreManager and keeps the top_n most similar to the job
+    description, so only the shortlist is sent to the LLM. Resumes are keyed by their position, since
+    upload and file names may repeat; the name is only stored as metadata. Returns (positions of the
+    shortlisted resumes in input order, similarity of every resume aligned with `resumes`).
+    """
+    resumes = list(resumes)
+    ids = [str(index) for index in range(len(resumes))]
+    store.add_resumes([(text, {"resume_id": resume_id, "name": name})
+                       for resume_id, (name, text) in zip(ids, resumes)], persist=False)
+    ranked = store.rank_candidates(job_description, top_n=len(ids), aggregate=aggregate, resume_ids=ids)
+    similarities = [None] * len(resumes)
+    for candidate in ranked:
+        similarities[int(candidate["resume_id"])] = candidate["score"]
+    keep = sorted(int(candidate["resume_id"]) for candidate in ranked[:top_n])
+    return keep, similarities
+
+
+def _row(name: str, error: str, similarity=None) -> dict:
+    return {"name": name, "is_resume": None, "match_score": None, "recommendation": None,
+            "analysis": None, "error": error, "elapsed": 0.0, "similarity": similarity}
+
+
+def screen_resumes(sources, job_description: str, engine, parse_fn, parse_workers: int = 4,
+                   max_workers: int = 8, validate: bool = True, name_fn=os.path.basename,
+                   use_cache: bool = True, shortlist_store=None, shortlist_top_n: int = None):
+    """
+    Full bulk-screening pipeline: parse on a worker pool, then fan out to RAGEngine.analyze_many.
+    Yields one result row per source as soon as that candidate finishes. See screen_parsed for
+    the shortlist options.
+    """
+    return screen_parsed(iter_parsed(sources, parse_fn, parse_workers, name_fn), job_description, engine,
+                         max_workers=max_workers, validate=validate, use_cache=use_cache,
+                         shortlist_store=shortlist_store, shortlist_top_n=shortlist_top_n)
+
+
+def screen_parsed(parsed, job_description: str, engine, max_workers: int = 8, validate: bool = True,
+                  use_cache: bool = True, shortlist_store=None, shortlist_top_n: int = None):
+    """
+    Screening stage of the pipeline, fed by any iterable of (name, text-or-exception) pairs such as
+    iter_parsed or iter_parsed_files. Yields one result row per candidate as soon as it finishes.
+    With a shortlist_store (a VectorStoreManager) and shortlist_top_n, all resumes are parsed and
+    ranked by embedding similarity first, and only the top shortlist_top_n reach the LLM; the others
+    are yielded immediately with status "Not shortlisted".
+    """
+    failed = []
+
+    def successful():
+        for name, text in parsed:
+            if isinstance(text, Exception):
+                failed.append(_row(name, f"Parse error: {text}"))
+            else:
+                yield name, text
+
+    entries = []
+
+    def keyed(candidates):
+        # Rows are matched back to their (name, similarity) by position, since names may repeat
+        for name, text, similarity in candidates:
+            entries.append((name, similarity))
+            yield str(len(entries) - 1), text
+
+    candidates = ((name, text, None) for name, text in successful())
+    if shortlist_store is not None and shortlist_top_n:
+        parsed_resumes = list(successful())
+        keep, similarities = shortlist_resumes(parsed_resumes, job_description, shortlist_store, shortlist_top_n)
+        shortlisted = set(keep)
+        for index, (name, _) in enumerate(parsed_resumes):
+            if index not in shortlisted:
+                yield _row(name, "Not shortlisted", similarities[index])
+        candidates = [(*parsed_resumes[index], similarities[index]) for index in keep]
+
+    for row in engine.analyze_many(keyed(candidates), job_description, max_workers=max_workers,
+                                   validate=validate, use_cache=use_cache):
+        row["name"], row["similarity"] = entries[int(row["name"])]
+        while failed:
+            yield failed.pop()
+        yield row
+    while failed:
+        yield failed.pop()
+
+
+def rank_results(rows: list) -> list:
+    """
+    Orders screening rows best match first; rows without a score (rejected or failed) go last.
+    """
+    return sorted(rows, key=lambda row: (row["match_score"] is None, -(row["match_score"] or 0), row["name"]))
+
+
+def results_table(rows: list) -> list:
+    """
+    Flattens ranked rows into plain records suitable for a DataFrame or CSV writer.
+    """
+    return [
+        {
+            "Rank": rank,
+            "Candidate": row["name"],
+            "Match Score": row["match_score"],
+            "Recommendation": row["recommendation"],
+            "Similarity": None if row.get("similarity") is None else round(row["similarity"], 3),
+            # Share of the job's keyword-matched skills found in the resume (src.skills)
+            "Skills Coverage": ((row["analysis"] or {}).get("skill_match") or {}).get("skills_score"),
+            "Status": row["error"] or "OK",
+            "Seconds": round(row.get("elapsed", 0.0), 2),
+        }
+        for rank, row in enumerate(rank_results(rows), 1)
+    ]
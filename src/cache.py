@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def normalize_for_key(text: str) -> str:
+    """
+    Collapses whitespace so re-extracted or re-pasted copies of the same text share a cache key.
+    """
+    return " ".join((text or "").split())
+
+
+class ResultCache:
+    """
+    Disk-backed, content-addressed cache for LLM results.
+    Keys are SHA-256 hashes of the normalized inputs, prompt template version and model name,
+    values are JSON. Entries expire after `max_age_seconds` and the least recently used ones are
+    evicted once the cache holds more than `max_entries`.
+    """
+
+    def __init__(self, path: str = "./data/cache/results.sqlite", max_entries: int = 10000,
+                 max_age_seconds: float = 30 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One shared connection guarded by a lock; analyze_many calls in from worker threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, kind TEXT, value TEXT, created_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(kind: str, model_name: str, prompt_version: str, *texts: str) -> str:
+        digest = hashlib.sha256()
+        for part in (kind, model_name, prompt_version) + tuple(normalize_for_key(t) for t in texts):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """
+        Returns the cached value for `key`, or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value, kind: str = ""):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, kind, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(value), now, now),
+            )
+            self._conn.commit()
+            self._writes_since_evict += 1
+            # Amortize eviction instead of scanning the table on every write
+            if self._writes_since_evict >= 100:
+                self._evict_locked(now)
+
+    def evict(self):
+        """
+        Drops expired entries and trims the cache down to `max_entries`, least recently used first.
+        """
+        with self._lock:
+            self._evict_locked(time.time())
+
+    def _evict_locked(self, now: float):
+        self._writes_since_evict = 0
+        self._conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.max_age_seconds,))
+        self._conn.execute(
+            "DELETE FROM results WHERE key IN ("
+            "SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
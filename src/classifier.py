@@ -0,0 +1,100 @@
+import re
+
+# Resume section headings; a section counts only when its heading stands on a line of its own
+SECTION_PATTERNS = {
+    "experience": re.compile(r"\b(work experience|professional experience|experience|employment history|work history)\b", re.I),
+    "education": re.compile(r"\b(education|academic background|qualifications)\b", re.I),
+    "skills": re.compile(r"\b(skills|technical skills|core competencies|technologies)\b", re.I),
+    "projects": re.compile(r"\bprojects?\b", re.I),
+    "summary": re.compile(r"\b(summary|profile|objective|about me)\b", re.I),
+    "certifications": re.compile(r"\b(certifications?|awards|achievements)\b", re.I),
+}
+# A whole line that is one of the section headings, optionally followed by a colon
+HEADING_RE = re.compile("(?:" + "|".join(pattern.pattern for pattern in SECTION_PATTERNS.values()) + r")\s*:?", re.I)
+
+EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+(\.[\w-]+)+\b")
+PHONE_RE = re.compile(r"(\+?\d[\d\s().-]{7,}\d)")
+PROFILE_URL_RE = re.compile(r"\b(linkedin\.com/in/|github\.com/)", re.I)
+
+ID_DOCUMENT_PATTERNS = [
+    re.compile(r"\bpassport\b", re.I),
+    re.compile(r"\b(date of birth|d\.o\.b\.?)\b", re.I),
+    re.compile(r"\bnationality\b", re.I),
+    re.compile(r"\b(place|date) of (issue|expiry)\b", re.I),
+    re.compile(r"\bdriv(er'?s|ing) licen[cs]e\b", re.I),
+    re.compile(r"\b(aadhaa?r|permanent account number|social security)\b", re.I),
+    re.compile(r"P<[A-Z]{3}[A-Z<]{5,}"),  # machine readable zone
+]
+
+INVOICE_PATTERNS = [
+    re.compile(r"\b(invoice|receipt)\b", re.I),
+    re.compile(r"\bbill(ed)? to\b", re.I),
+    re.compile(r"\bsub-?total\b", re.I),
+    re.compile(r"\b(amount due|balance due|total due)\b", re.I),
+    re.compile(r"\b(qty|quantity|unit price)\b", re.I),
+    re.compile(r"\b(gst|vat|tax)\b", re.I),
+    re.compile(r"\bpayment terms\b", re.I),
+]
+
+ACCEPT = "accept"
+REJECT = "reject"
+UNCERTAIN = "uncertain"
+
+
+def classify_document(text: str) -> dict:
+    """
+    Cheap, CPU-only check of whether `text` is a resume.
+    Returns a dict with "decision" (accept / reject / uncertain), "document_type", "confidence"
+    (0-100) and the raw "signals" it was based on. Only clear-cut documents get a decision;
+    anything ambiguous is left "uncertain" so the caller can escalate it to the LLM.
+    Sections are recognised from heading lines (as kept by src.utils.normalize_pages), so prose that
+    merely mentions "experience" or "skills", like a cover letter or a job posting, has none.
+    """
+    sample = text[:3000]
+    headings = _heading_lines(sample)
+    sections = sorted(name for name, pattern in SECTION_PATTERNS.items()
+                      if any(pattern.fullmatch(heading) for heading in headings))
+    has_email = bool(EMAIL_RE.search(sample))
+    has_phone = bool(PHONE_RE.search(sample))
+    has_profile = bool(PROFILE_URL_RE.search(sample))
+    id_hits = sum(1 for pattern in ID_DOCUMENT_PATTERNS if pattern.search(sample))
+    invoice_hits = sum(1 for pattern in INVOICE_PATTERNS if pattern.search(sample))
+
+    signals = {
+        "sections": sections,
+        "email": has_email,
+        "phone": has_phone,
+        "profile_url": has_profile,
+        "id_document_hits": id_hits,
+        "invoice_hits": invoice_hits,
+    }
+    contact = has_email or has_phone or has_profile
+
+    if id_hits >= 3 and len(sections) <= 1:
+        return _result(REJECT, "Passport", 90, signals)
+    if invoice_hits >= 3 and len(sections) <= 1:
+        return _result(REJECT, "Invoice", 90, signals)
+    if not sections:
+        return _result(UNCERTAIN, "Unknown", 50, signals)
+    if len(sections) >= 3 and contact and id_hits <= 1 and invoice_hits <= 1:
+        return _result(ACCEPT, "Resume", min(99, 75 + 5 * len(sections)), signals)
+    return _result(UNCERTAIN, "Unknown", 50, signals)
+
+
+def _heading_lines(sample: str) -> list:
+    # Heading text without the "## " marker normalize_pages adds or a trailing colon
+    headings = []
+    for line in sample.splitlines():
+        line = line.strip().lstrip("#").strip()
+        if len(line) <= 40 and HEADING_RE.fullmatch(line):
+            headings.append(line.rstrip(":").rstrip())
+    return headings
+
+
+def _result(decision: str, document_type: str, confidence: int, signals: dict) -> dict:
+    return {
+        "decision": decision,
+        "document_type": document_type,
+        "confidence": confidence,
+        "signals": signals,
+    }
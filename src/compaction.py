@@ -0,0 +1,104 @@
+import re
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.embedding_cache import CachedEmbeddings
+from src.utils import estimate_tokens
+from src.vector_store import LazyHuggingFaceEmbeddings
+
+BULLET_RE = re.compile(r"^\s*(?:[-*•▪◦]|\d+[.)])\s+")
+SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+SEPARATOR = "\n[...]\n"
+
+
+def split_requirements(job_description: str) -> list:
+    """
+    Splits a job description into individual requirements: bullet or numbered lines when it has
+    them, otherwise its sentences. Fragments of fewer than three words are dropped.
+    """
+    lines = [line for line in job_description.splitlines() if line.strip()]
+    bullets = [BULLET_RE.sub("", line).strip() for line in lines if BULLET_RE.match(line)]
+    candidates = bullets or [part.strip() for part in SENTENCE_RE.split(job_description)]
+    return [text for text in candidates if len(text.split()) >= 3] or [job_description.strip()]
+
+
+class PromptCompactor:
+    """
+    Shrinks a resume to the parts that matter for a job description before it is sent to the LLM.
+    The resume keeps a fixed header block (its opening: name, contact details, summary); the rest is
+    chunked with the same splitter and embedding setup as VectorStoreManager, and chunks are picked
+    round-robin across the job's requirements, best match first, until token_budget is spent.
+    Selected chunks are emitted in document order. Resumes already within budget are left untouched.
+    """
+
+    def __init__(self, embedding_model=None, token_budget: int = 1500, header_tokens: int = 200,
+                 chunk_size: int = 500, chunk_overlap: int = 100,
+                 embedding_cache_dir="./data/embedding_cache"):
+        self.embedding_model = embedding_model or LazyHuggingFaceEmbeddings()
+        # Shares the vector store's on-disk cache, so chunks that were already ingested embed for free.
+        # Pass the store's CachedEmbeddings to reuse it; otherwise instances on the same directory share
+        # its rows through src.embedding_cache's per-directory registry, so neither overwrites the other
+        if embedding_cache_dir and not isinstance(self.embedding_model, CachedEmbeddings):
+            self.embedding_model = CachedEmbeddings(self.embedding_model, embedding_cache_dir)
+        self.token_budget = token_budget
+        self.header_tokens = header_tokens
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    @property
+    def signature(self) -> str:
+        # Part of the result-cache key: a different budget or chunking produces a different prompt
+        return f"compact:{self.token_budget}:{self.header_tokens}:{self.chunk_size}:{self.chunk_overlap}"
+
+    def compact(self, resume_text: str, job_description: str) -> dict:
+        """
+        Returns {"text", "tokens_before", "tokens_after", "chunks_total", "chunks_selected", "compacted"}.
+        """
+        tokens_before = estimate_tokens(resume_text)
+        result = {"text": resume_text, "tokens_before": tokens_before, "tokens_after": tokens_before,
+                  "chunks_total": 0, "chunks_selected": 0, "compacted": False}
+        if tokens_before <= self.token_budget:
+            return result
+
+        header, body = self._split_header(resume_text)
+        chunks = self.text_splitter.split_text(body)
+        if not chunks:
+            return result
+        budget = self.token_budget - estimate_tokens(header)
+        selected = self._select(chunks, split_requirements(job_description), budget)
+
+        text = SEPARATOR.join([header] + [chunks[i] for i in sorted(selected)])
+        result.update({"text": text, "tokens_after": estimate_tokens(text), "chunks_total": len(chunks),
+                       "chunks_selected": len(selected), "compacted": True})
+        return result
+
+    def _split_header(self, text: str):
+        # Cut at a word boundary so the header never ends mid-word
+        limit = self.header_tokens * 4
+        cut = text.rfind(" ", 0, limit)
+        cut = limit if cut <= 0 else cut
+        return text[:cut].strip(), text[cut:].strip()
+
+    def _select(self, chunks: list, requirements: list, budget: int) -> set:
+        vectors = self._embed(chunks + requirements)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        similarity = vectors[len(chunks):] @ vectors[:len(chunks)].T
+        # rankings[r] lists chunk indices from best to worst match for requirement r
+        rankings = np.argsort(-similarity, axis=1)
+
+        selected, spent = set(), 0
+        for rank in range(len(chunks)):
+            for requirement in range(len(requirements)):
+                chunk = int(rankings[requirement, rank])
+                cost = estimate_tokens(chunks[chunk]) + estimate_tokens(SEPARATOR)
+                if chunk not in selected and spent + cost <= budget:
+                    selected.add(chunk)
+                    spent += cost
+            if len(selected) == len(chunks) or spent >= budget:
+                break
+        return selected
+
+    def _embed(self, texts: list) -> np.ndarray:
+        if isinstance(self.embedding_model, CachedEmbeddings):
+            return np.array(self.embedding_model.embed_documents_array(texts))
+        return np.asarray(self.embedding_model.embed_documents(texts), dtype=np.float32)
@@ -0,0 +1,139 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+class ChunkStore:
+    """
+    On-disk docstore for the vector index, in SQLite. Each chunk row holds its text and the resume it
+    belongs to and is keyed by the chunk's FAISS id; resume metadata and a digest of the indexed
+    content are stored once per resume. Nothing is read when the store is opened: search hits are
+    fetched by id, so resident memory does not grow with the number of stored chunks.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # AUTOINCREMENT never hands out an id twice, so a deleted chunk that is still in the FAISS
+        # index until the next compaction can never be mistaken for a new one
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS resumes (resume_id TEXT PRIMARY KEY, digest TEXT, metadata TEXT);"
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, resume_id TEXT NOT NULL, text TEXT);"
+            "CREATE INDEX IF NOT EXISTS idx_chunks_resume ON chunks(resume_id);"
+        )
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups writes into one commit; everything inside is rolled back if the block raises.
+        """
+        with self._lock:
+            try:
+                yield self
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def digest(self, resume_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, resume_id: str, texts: list, metadata: dict, digest: str):
+        """
+        Replaces a resume's chunks with `texts` (call inside transaction()).
+        Returns (ids of the chunks removed, ids assigned to the new ones, in order).
+        """
+        removed = self.remove(resume_id)
+        if not texts:
+            return removed, []
+        self._conn.execute("INSERT INTO resumes (resume_id, digest, metadata) VALUES (?, ?, ?)",
+                           (resume_id, digest, json.dumps(metadata, default=str)))
+        # Ids are allocated up front so the whole batch goes in with one executemany
+        row = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'chunks'").fetchone()
+        first = (row[0] if row else 0) + 1
+        ids = list(range(first, first + len(texts)))
+        self._conn.executemany("INSERT INTO chunks (id, resume_id, text) VALUES (?, ?, ?)",
+                               [(chunk_id, resume_id, text) for chunk_id, text in zip(ids, texts)])
+        return removed, ids
+
+    def remove(self, resume_id: str) -> list:
+        """
+        Deletes a resume and its chunks (call inside transaction()). Returns the removed chunk ids.
+        """
+        removed = [row[0] for row in self._conn.execute("SELECT id FROM chunks WHERE resume_id = ?", (resume_id,))]
+        self._conn.execute("DELETE FROM chunks WHERE resume_id = ?", (resume_id,))
+        self._conn.execute("DELETE FROM resumes WHERE resume_id = ?", (resume_id,))
+        return removed
+
+    def discard(self, ids):
+        """
+        Deletes chunks by id, and any resume left without chunks.
+        """
+        with self.transaction():
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(int(chunk_id),) for chunk_id in ids])
+            self._conn.execute("DELETE FROM resumes WHERE resume_id NOT IN (SELECT resume_id FROM chunks)")
+
+    def get(self, ids: list) -> list:
+        """
+        Returns the chunks with the given ids as Documents, in the order asked for; unknown ids are skipped.
+        """
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunks.id, chunks.text, chunks.resume_id, resumes.metadata FROM chunks "
+                f"JOIN resumes USING (resume_id) WHERE chunks.id IN ({placeholders})",
+                [int(chunk_id) for chunk_id in ids],
+            ).fetchall()
+        found = {
+            chunk_id: Document(id=str(chunk_id), page_content=text,
+                               metadata={**json.loads(metadata), "resume_id": resume_id})
+            for chunk_id, text, resume_id, metadata in rows
+        }
+        return [found[int(chunk_id)] for chunk_id in ids if int(chunk_id) in found]
+
+    def ids(self) -> np.ndarray:
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM chunks").fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def owners(self) -> dict:
+        """
+        Maps every chunk id to its resume id.
+        """
+        with self._lock:
+            return dict(self._conn.execute("SELECT id, resume_id FROM chunks"))
+
+    def resume_metadata(self) -> dict:
+        """
+        Maps every resume id to its metadata (with "resume_id" filled in).
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT resume_id, metadata FROM resumes").fetchall()
+        return {resume_id: {**json.loads(metadata), "resume_id": resume_id} for resume_id, metadata in rows}
+
+    def stats(self) -> dict:
+        with self._lock:
+            resumes = self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+            chunks = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        # Recent writes sit in the write-ahead log until SQLite checkpoints them into the main file
+        files = (self.path, self.path + "-wal")
+        return {"resumes": resumes, "chunks": chunks,
+                "bytes": sum(os.path.getsize(path) for path in files if os.path.exists(path))}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+KEYS_FILE = "keys.bin"
+VECTORS_FILE = "vectors.f32"
+META_FILE = "meta.json"
+DIGEST_SIZE = 32
+
+
+class _VectorFile:
+    """
+    The on-disk rows of one cache directory: digests in KEYS_FILE and vectors in VECTORS_FILE, row for
+    row. There is one per directory in the process (see _vector_file), so every CachedEmbeddings on
+    the same directory sees the same rows; appends hold an exclusive lock on KEYS_FILE and first pick
+    up rows other processes appended, so concurrent writers never overwrite each other.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.rows = {}
+        # Rows read from disk; can exceed len(rows) if two writers ever stored the same digest
+        self.count = 0
+        self.dim = None
+        self.vectors = None
+        os.makedirs(cache_dir, exist_ok=True)
+        self.refresh()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def refresh(self):
+        """
+        Picks up rows appended since the last read (by this or another process). Call with `lock` held.
+        """
+        if self.dim is None:
+            if not os.path.exists(self._path(META_FILE)):
+                return
+            with open(self._path(META_FILE), encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        rows = self._complete_rows()
+        if rows <= self.count:
+            return
+        with open(self._path(KEYS_FILE), "rb") as f:
+            f.seek(self.count * DIGEST_SIZE)
+            keys = f.read((rows - self.count) * DIGEST_SIZE)
+        for i in range(rows - self.count):
+            self.rows.setdefault(keys[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE], self.count + i)
+        self.count = rows
+        self.vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def _complete_rows(self) -> int:
+        # Only trust rows whose digest and vector were both fully written
+        if not os.path.exists(self._path(KEYS_FILE)) or not os.path.exists(self._path(VECTORS_FILE)):
+            return 0
+        return min(os.path.getsize(self._path(KEYS_FILE)) // DIGEST_SIZE,
+                   os.path.getsize(self._path(VECTORS_FILE)) // (4 * self.dim))
+
+    def append(self, digests: list, vectors: np.ndarray):
+        """
+        Appends rows for `digests` that are not stored yet. Call with `lock` held.
+        """
+        with open(self._path(KEYS_FILE), "ab") as keys_file, _file_lock(keys_file):
+            if self.dim is None and os.path.exists(self._path(META_FILE)):
+                self.refresh()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self._path(META_FILE), "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding cache {self.cache_dir} holds {self.dim}-d vectors, "
+                                 f"got {vectors.shape[1]}-d; use a separate cache_dir per embedding size")
+            self.refresh()
+            todo = [i for i, digest in enumerate(digests) if digest not in self.rows]
+            if not todo:
+                return
+            first_row = self._complete_rows()
+            # Only a torn tail (a crash mid-append) is cut off; complete rows are never truncated
+            with open(self._path(VECTORS_FILE), "ab") as f:
+                f.truncate(first_row * 4 * self.dim)
+                f.write(vectors[todo].tobytes())
+            keys_file.truncate(first_row * DIGEST_SIZE)
+            keys_file.write(b"".join(digests[i] for i in todo))
+            keys_file.flush()
+            self.refresh()
+
+
+@contextmanager
+def _file_lock(f):
+    # Exclusive across processes where flock exists; threads are already serialized by _VectorFile.lock
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+_vector_files = {}
+_vector_files_lock = threading.Lock()
+
+
+def _vector_file(cache_dir: str) -> _VectorFile:
+    key = os.path.realpath(cache_dir)
+    with _vector_files_lock:
+        if key not in _vector_files:
+            _vector_files[key] = _VectorFile(cache_dir)
+        return _vector_files[key]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Persistent, content-addressed cache wrapped around an embedding model.
+    Vectors live in one append-only float32 file that is memory-mapped for reads; a parallel file
+    of SHA-256 digests gives each vector's row, so lookups are served straight from the page cache
+    and only texts the cache has never seen are sent to the wrapped model. Any number of instances
+    (in this process or others) can share a cache_dir.
+    """
+
+    def __init__(self, model: Embeddings, cache_dir: str = "./data/embedding_cache", model_name: str = ""):
+        self.model = model
+        self.cache_dir = cache_dir
+        # Part of every key, so switching models never serves stale vectors
+        self.model_name = model_name or getattr(model, "model_name", type(model).__name__)
+        self.hits = 0
+        self.misses = 0
+        self.model_seconds = 0.0
+        self.total_seconds = 0.0
+        self._file = _vector_file(cache_dir)
+
+    def _digest(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).digest()
+
+    def lookup(self, text: str):
+        """
+        Returns the cached vector for `text` as a read-only view into the memory map, or None.
+        """
+        with self._file.lock:
+            row = self._file.rows.get(self._digest(text))
+            return None if row is None else self._file.vectors[row]
+
+    def embed_documents_array(self, texts: list) -> np.ndarray:
+        """
+        Embeds `texts` into an (n, dim) float32 array, computing only the ones not already cached.
+        """
+        start = time.perf_counter()
+        digests = [self._digest(text) for text in texts]
+        with self._file.lock:
+            novel = {}
+            for digest, text in zip(digests, texts):
+                if digest not in self._file.rows and digest not in novel:
+                    novel[digest] = text
+            self.misses += len(novel)
+            self.hits += len(texts) - len(novel)
+            if novel:
+                self._file.append(list(novel), self._compute(list(novel.values())))
+            rows = [self._file.rows[digest] for digest in digests]
+            dim = self._file.dim or 0
+            vectors = np.asarray(self._file.vectors[rows]) if rows else np.empty((0, dim), dtype=np.float32)
+            self.total_seconds += time.perf_counter() - start
+        return vectors
+
+    def _compute(self, texts: list) -> np.ndarray:
+        start = time.perf_counter()
+        vectors = np.asarray(self.model.embed_documents(texts), dtype=np.float32)
+        self.model_seconds += time.perf_counter() - start
+        return vectors
+
+    def embed_documents(self, texts: list) -> list:
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text: str) -> list:
+        return self.embed_documents_array([text])[0].tolist()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "cached_vectors": len(self._file.rows),
+            "embeddings_per_second": lookups / self.total_seconds if self.total_seconds else 0.0,
+            "model_embeddings_per_second": self.misses / self.model_seconds if self.model_seconds else 0.0,
+        }
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import re
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+WORD_RE = re.compile(r"[a-z][a-z0-9+#.]{2,}")
+REQUESTED_KEY_RE = re.compile(r'^- "(\w+)":', re.MULTILINE)
+DETECTED_SKILLS_RE = re.compile(r"^- (Present in|Missing from) the resume: (.*)$", re.MULTILINE)
+RESUME_MARKERS = ("experience", "education", "skills", "projects", "summary")
+# Reported as response_metadata["model_name"], so traces and cost estimates never mistake it for a real model
+MODEL_NAME = "fake-resume-analyzer"
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic local stand-in for ChatGroq.
+    Answers the validation and analysis prompts used by RAGEngine without any network access,
+    sleeping `latency` seconds per call so concurrency and throughput can be measured offline.
+    """
+
+    latency: float = 0.0
+    stream_chunk_size: int = 16
+    # Fraction of analysis answers that are cut off mid-JSON (chosen by prompt hash), to exercise repair
+    defect_rate: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return MODEL_NAME
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = messages[-1].content
+        if self.latency:
+            time.sleep(self.latency)
+
+        content = self._respond(prompt)
+        message = AIMessage(content=content, usage_metadata=self._usage(prompt, content),
+                            response_metadata={"model_name": MODEL_NAME})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        prompt = messages[-1].content
+        content = self._respond(prompt)
+        pieces = [content[i:i + self.stream_chunk_size] for i in range(0, len(content), self.stream_chunk_size)]
+        # Spread the configured latency evenly over the pieces, like tokens arriving from a server
+        delay = self.latency / len(pieces) if pieces else 0.0
+        for index, piece in enumerate(pieces):
+            if delay:
+                time.sleep(delay)
+            # Usage is reported once, on the final chunk, as streaming APIs do
+            last = index == len(pieces) - 1
+            usage = self._usage(prompt, content) if last else None
+            metadata = {"model_name": MODEL_NAME} if last else {}
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece, usage_metadata=usage,
+                                                             response_metadata=metadata))
+
+    def _respond(self, prompt: str) -> str:
+        if "document classifier" in prompt:
+            return json.dumps(self._classify(prompt))
+        analysis = self._analyze(prompt)
+        detected = dict(DETECTED_SKILLS_RE.findall(prompt))
+        if detected:
+            # Like a model following the prompt: the keyword-matched skill lists are taken as given
+            analysis["matching_skills"] = self._skill_list(detected["Present in"])
+            analysis["missing_skills"] = self._skill_list(detected["Missing from"])
+        if "Provide ONLY the following keys" in prompt:
+            # Follow-up for missing fields: answer just those, as a real model would
+            requested = REQUESTED_KEY_RE.findall(prompt)
+            analysis = {key: value for key, value in analysis.items() if key in requested}
+        content = json.dumps(analysis)
+        if "Analyze the match" in prompt and self._defective(prompt):
+            # Like hitting max_tokens: the answer stops partway through
+            content = content[:int(len(content) * 0.55)]
+        return content
+
+    @staticmethod
+    def _skill_list(line: str) -> list:
+        return [] if line == "none" else line.split(", ")
+
+    def _defective(self, prompt: str) -> bool:
+        if not self.defect_rate:
+            return False
+        bucket = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+        return bucket < self.defect_rate
+
+    @staticmethod
+    def _usage(prompt: str, content: str) -> dict:
+        # Rough 4-characters-per-token estimate so token accounting can be exercised offline
+        input_tokens = len(prompt) // 4
+        output_tokens = len(content) // 4
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _classify(self, prompt: str) -> dict:
+        text = prompt.split("Input Text:", 1)[-1].lower()
+        hits = sum(1 for marker in RESUME_MARKERS if marker in text)
+        is_resume = hits >= 2
+        return {
+            "is_resume": is_resume,
+            "confidence": 60 + 10 * hits if is_resume else 80,
+            "document_type": "Resume" if is_resume else "Unknown",
+        }
+
+    def _analyze(self, prompt: str) -> dict:
+        job_part, _, resume_part = prompt.partition("Resume Content:")
+        # Only the job description itself; the detected-skills lists would otherwise count as job terms
+        job_part = job_part.split("Job Description:", 1)[-1].split("Skills detected", 1)[0]
+        job_words = set(WORD_RE.findall(job_part.lower()))
+        resume_words = set(WORD_RE.findall(resume_part.lower()))
+
+        matching = sorted(job_words & resume_words)
+        missing = sorted(job_words - resume_words)
+        overlap = len(matching) / len(job_words) if job_words else 0.0
+        # Small deterministic jitter so equal overlaps still produce a stable, distinct ranking
+        jitter = int(hashlib.sha256(resume_part.encode("utf-8")).hexdigest()[:2], 16) % 5
+        score = min(100, int(overlap * 95) + jitter)
+
+        if score >= 75:
+            recommendation = "Hire"
+        elif score >= 50:
+            recommendation = "Interview"
+        else:
+            recommendation = "Reject"
+
+        return {
+            "match_score": score,
+            "missing_skills": missing[:10],
+            "matching_skills": matching[:10],
+            "summary": f"Candidate covers {len(matching)} of {len(job_words)} job description terms.",
+            "recommendation": recommendation,
+            "interview_questions": [
+                {
+                    "question": f"Describe a project where you used {skill}.",
+                    "context": "Listed on the resume and required by the role.",
+                    "answer_tip": "Use the STAR method.",
+                }
+                for skill in matching[:3]
+            ],
+            "match_breakdown": {
+                "skills_match": score,
+                "experience_match": score,
+                "education_match": score,
+                "communication_style": score,
+            },
+            "resume_improvements": [],
+        }
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import normalize_for_key
+from src.structured_output import ANALYSIS_SCHEMA
+from src.tracing import tracer
+
+# In order; a job ends in one of FINISHED_STATES
+JOB_STATES = ("queued", "parsing", "validating", "analyzing", "done", "rejected", "failed")
+FINISHED_STATES = ("done", "rejected", "failed")
+# Outcomes worth serving again for the same inputs; a failed job is always re-run
+REUSABLE_STATES = ("done", "rejected")
+
+
+class JobStore:
+    """
+    Local SQLite store of finished analysis jobs, so a result can be shown again (after a rerun, a
+    page reload or a restart) without calling the LLM. Keeps the `max_entries` most recent jobs.
+    """
+
+    def __init__(self, path: str = "./data/jobs/jobs.sqlite", max_entries: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, key TEXT, status TEXT, finished_at REAL, value TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs(key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished_at)")
+        self._conn.commit()
+
+    def save(self, job: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, key, status, finished_at, value) VALUES (?, ?, ?, ?, ?)",
+                (job["id"], job["key"], job["status"], job["finished_at"], json.dumps(job, default=str)),
+            )
+            self._conn.execute(
+                "DELETE FROM jobs WHERE job_id IN ("
+                "SELECT job_id FROM jobs ORDER BY finished_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def load(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, key: str):
+        """
+        Returns the most recent complete analysis or rejection for the same inputs, or None.
+        """
+        placeholders = ",".join("?" * len(REUSABLE_STATES))
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value FROM jobs WHERE key = ? AND status IN ({placeholders}) "
+                "ORDER BY finished_at DESC LIMIT 1",
+                (key, *REUSABLE_STATES),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+class AnalysisJobs:
+    """
+    Runs single-resume analyses on a background thread pool shared by every session in the process.
+    submit() returns a job ID at once; the job then moves through "queued", "parsing", "validating"
+    and "analyzing" to "done", "rejected" (not a resume) or "failed", and its "result" fills in
+    field by field as the analysis streams, so a page can poll get() and render partial results.
+    A job is "done" only with every analysis field present; a validation or analysis that errored
+    or came back incomplete is "failed", and failed jobs are never reused.
+    Finished jobs are written to the JobStore; only the `max_jobs` most recent stay in memory.
+    """
+
+    def __init__(self, parse_fn, max_workers: int = 4, store: JobStore = None, max_jobs: int = 200):
+        # parse_fn(data: bytes, file_name=...) -> text, e.g. ResumeParser.parse
+        self.parse_fn = parse_fn
+        self.store = store
+        self.max_jobs = max_jobs
+        self.counts = Counter()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        # Inputs key -> job ID of the latest job for them (reused unless it failed)
+        self._by_key = {}
+
+    @staticmethod
+    def make_key(data: bytes, job_description: str, options: dict = None) -> str:
+        digest = hashlib.sha256(data)
+        for part in (normalize_for_key(job_description), json.dumps(options or {}, sort_keys=True, default=str)):
+            digest.update(b"\x00")
+            digest.update(part.encode("utf-8"))
+        return digest.hexdigest()
+
+    def submit(self, engine, file_name: str, data: bytes, job_description: str, use_cache: bool = True,
+               concurrent: bool = True, options: dict = None) -> str:
+        """
+        Queues an analysis of the file `data` against `job_description` and returns its job ID.
+        `options` (e.g. the prompt token budget) only distinguish otherwise identical submissions.
+        Unless use_cache=False, submitting the same inputs again returns the existing job instead of
+        starting a new one, whether it is still running or already stored as done or rejected.
+        """
+        key = self.make_key(data, job_description, {**(options or {}), "model": getattr(engine, "model_name", "")})
+        with self._lock:
+            if use_cache:
+                existing = self._jobs.get(self._by_key.get(key))
+                if existing is not None and existing["status"] != "failed":
+                    self.counts["reused"] += 1
+                    return existing["id"]
+                stored = self.store.find(key) if self.store is not None else None
+                if stored is not None:
+                    self.counts["reused"] += 1
+                    return stored["id"]
+            job = {
+                "id": uuid.uuid4().hex[:12],
+                "key": key,
+                "file_name": file_name,
+                "job_description": job_description[:200],
+                "status": "queued",
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "validation": None,
+                "result": {},
+                "metrics": {},
+                "spans": [],
+                "error": None,
+                "traceback": None,
+            }
+            self._jobs[job["id"]] = job
+            self._by_key[key] = job["id"]
+            self.counts["submitted"] += 1
+        self._executor.submit(self._run, job, engine, data, job_description, use_cache, concurrent)
+        return job["id"]
+
+    def get(self, job_id: str):
+        """
+        Returns a snapshot of the job (safe to read while it keeps running), or None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return {**job, "result": dict(job["result"])}
+        return self.store.load(job_id) if self.store is not None else None
+
+    def _set(self, job: dict, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def _run(self, job: dict, engine, data: bytes, job_description: str, use_cache: bool, concurrent: bool):
+        started = time.time()
+        self._set(job, status="parsing", started_at=started)
+        try:
+            resume_text = self.parse_fn(data, file_name=job["file_name"])
+            self._set(job, status="validating")
+            stream = engine.validate_and_analyze_stream(resume_text, job_description, use_cache=use_cache,
+                                                        concurrent=concurrent)
+            _, validation = next(stream)
+            if "error" in validation:
+                stream.close()
+                self._finish(job, "failed", started, validation=validation,
+                             error=f"Document check failed: {validation['error']}")
+                return
+            if not validation["is_resume"]:
+                stream.close()
+                self._finish(job, "rejected", started, validation=validation)
+                return
+            self._set(job, status="analyzing", validation=validation)
+            for key, value in stream:
+                with self._lock:
+                    job["result"][key] = value
+            # Per-thread, so this is the metrics of this job's stream
+            metrics = dict(engine.last_stream_metrics)
+            with self._lock:
+                error = job["result"].get("error")
+                missing = [key for key in ANALYSIS_SCHEMA if key not in job["result"]]
+            if error is None and missing:
+                error = f"Incomplete analysis, missing {', '.join(missing)}"
+            self._finish(job, "failed" if error else "done", started, metrics=metrics, error=error)
+        except Exception as e:
+            self._finish(job, "failed", started, error=str(e), traceback=traceback.format_exc())
+
+    def _finish(self, job: dict, status: str, started: float, **fields):
+        # Spans that finished while the job ran (other jobs running at the same time may show up too)
+        spans = [span for span in tracer.recent(200) if span["ts"] >= started] if tracer.enabled else []
+        with self._lock:
+            job.update(fields, status=status, finished_at=time.time(), spans=spans)
+            self.counts[status] += 1
+            snapshot = {**job, "result": dict(job["result"])}
+        if self.store is not None:
+            self.store.save(snapshot)
+        with self._lock:
+            # Stored jobs can be dropped from memory; get() falls back to the store
+            while len(self._jobs) > self.max_jobs:
+                oldest = next((job_id for job_id, old in self._jobs.items() if old["status"] in FINISHED_STATES),
+                              None)
+                if oldest is None:
+                    break
+                dropped = self._jobs.pop(oldest)
+                if self._by_key.get(dropped["key"]) == oldest:
+                    del self._by_key[dropped["key"]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = Counter(job["status"] for job in self._jobs.values() if job["status"] not in FINISHED_STATES)
+            return {**self.counts, "active": dict(active)}
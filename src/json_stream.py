@@ -0,0 +1,89 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Tolerant incremental parser for a single streamed JSON object.
+    Feed it text chunks as they arrive; each call returns the (key, value) pairs of top-level fields
+    that became complete in that chunk. Anything before the opening brace (preambles, ```json fences)
+    is ignored, and a field whose value fails to decode is skipped rather than aborting the stream.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.result = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"
+        self._token_start = None
+        self._key = None
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        completed = []
+        buf = self.buffer
+        for pos in range(self._pos, len(buf)):
+            if self.done:
+                break
+            char = buf[pos]
+
+            if self._depth == 0:
+                # Still in the preamble; wait for the object to open
+                if char == "{":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key_string":
+                        self._key = self._decode(buf[self._token_start:pos + 1])
+                        self._expect = "colon"
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._token_start = pos
+                    self._expect = "key_string"
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_value(buf[self._token_start:pos], completed)
+                    self.done = True
+            elif self._depth == 1 and char == ":" and self._expect == "colon":
+                self._token_start = pos + 1
+                self._expect = "value"
+            elif self._depth == 1 and char == "," and self._expect == "value":
+                self._complete_value(buf[self._token_start:pos], completed)
+                self._expect = "key"
+        self._pos = len(buf)
+        return completed
+
+    def _complete_value(self, text, completed: list):
+        if self._expect != "value" or self._key is None:
+            return
+        value = self._decode(text)
+        if value is not _INVALID:
+            self.result[self._key] = value
+            completed.append((self._key, value))
+        self._key = None
+
+    @staticmethod
+    def _decode(text: str):
+        try:
+            return json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return _INVALID
+
+
+_INVALID = object()
@@ -0,0 +1,332 @@
+import hashlib
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# Scheduling order of the lanes: interactive requests (a user waiting on the page) always go first
+LANES = ("interactive", "batch")
+
+
+class RateLimiter:
+    """
+    Token-bucket scheduler for requests/minute and tokens/minute, with priority lanes.
+    Callers queue in (lane, arrival) order and only the head of the queue may take capacity, so a
+    waiting interactive request is never overtaken by batch work. A limit of None means unlimited.
+    pause() stops all admissions for a while, e.g. for a provider's Retry-After.
+    """
+
+    def __init__(self, requests_per_minute: int = None, tokens_per_minute: int = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queue = []
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+        self.waited_seconds = Counter()
+        self.admitted = Counter()
+
+    def acquire(self, tokens: int, lane: str = "interactive") -> float:
+        """
+        Blocks until the request may be sent and returns the seconds spent waiting.
+        """
+        ticket = (LANES.index(lane), next(self._arrivals))
+        start = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._queue, ticket)
+            self._condition.notify_all()
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._delay(tokens, now)
+                if self._queue[0] == ticket and delay <= 0:
+                    heapq.heappop(self._queue)
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= min(tokens, self.tokens_per_minute)
+                    self._condition.notify_all()
+                    break
+                # Only the head sleeps on the clock; everyone else waits to be notified
+                self._condition.wait(timeout=delay if self._queue[0] == ticket else None)
+            waited = time.monotonic() - start
+            self.waited_seconds[lane] += waited
+            self.admitted[lane] += 1
+        return waited
+
+    def adjust(self, tokens: int):
+        # Corrects the token bucket once the real usage of a request is known (may go negative)
+        if self.tokens_per_minute and tokens:
+            with self._condition:
+                self._tokens -= tokens
+
+    def configure(self, requests_per_minute: int = None, tokens_per_minute: int = None):
+        """
+        Replaces the limits; buckets are clamped to the new capacity (or filled when a limit is added).
+        """
+        with self._condition:
+            self._refill(time.monotonic())
+            self._requests = _resize(self._requests, self.requests_per_minute, requests_per_minute)
+            self._tokens = _resize(self._tokens, self.tokens_per_minute, tokens_per_minute)
+            self.requests_per_minute = requests_per_minute
+            self.tokens_per_minute = tokens_per_minute
+            self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def _delay(self, tokens: int, now: float) -> float:
+        delay = self._paused_until - now
+        if self.requests_per_minute and self._requests < 1:
+            delay = max(delay, (1 - self._requests) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            needed = min(tokens, self.tokens_per_minute)
+            if self._tokens < needed:
+                delay = max(delay, (needed - self._tokens) * 60 / self.tokens_per_minute)
+        return delay
+
+
+def _resize(level: float, old_limit, new_limit) -> float:
+    # A bucket keeps its level under a new limit (capped at it); one that was unlimited starts full
+    if old_limit and new_limit:
+        return min(level, new_limit)
+    return float(new_limit or 0)
+
+
+def retry_after(error) -> float:
+    """
+    Seconds to wait before retrying after `error` if it is a rate-limit (HTTP 429) response, else None.
+    Uses the Retry-After header when the provider sends one.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class LLMGateway:
+    """
+    Single entry point to one chat model, shared by every RAGEngine in the process.
+    Requests pass through a RateLimiter (requests/min, tokens/min, Retry-After, priority lanes) and
+    429 responses are retried here instead of by each caller. Identical prompts that are already in
+    flight are coalesced: later callers wait for the first request and share its answer.
+    """
+
+    def __init__(self, llm, requests_per_minute: int = None, tokens_per_minute: int = None,
+                 max_retries: int = 3, expected_output_tokens: int = 800):
+        self.llm = llm
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        # Reserved per request on top of the prompt, and corrected once the real usage is known
+        self.expected_output_tokens = expected_output_tokens
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counts = Counter()
+
+    @contextmanager
+    def lane(self, name: str):
+        """
+        Routes requests made by this thread inside the block through the given lane ("batch" for bulk work).
+        """
+        previous = getattr(self._local, "lane", "interactive")
+        self._local.lane = name
+        try:
+            yield
+        finally:
+            self._local.lane = previous
+
+    @property
+    def current_lane(self) -> str:
+        return getattr(self._local, "lane", "interactive")
+
+    def invoke(self, prompt):
+        """
+        Sends a prompt (string, PromptValue or messages) and returns the model's message.
+        A caller that joins an identical in-flight request gets the same answer with usage_metadata
+        removed, since it cost no tokens.
+        """
+        key = self._key(prompt)
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            with self._lock:
+                self.counts["coalesced"] += 1
+            message = future.result()
+            return message.model_copy(update={"usage_metadata": None})
+
+        try:
+            message = self._with_retries(lambda: self.llm.invoke(prompt), prompt)
+            future.set_result(message)
+            return message
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def stream(self, prompt):
+        """
+        Streams the model's answer chunk by chunk. Rate limiting and 429 retries apply until the first
+        chunk arrives; streams are not coalesced. The reserved tokens are settled however the stream
+        ends, including when the consumer closes it early or it raises.
+        """
+        attempt = 0
+        while True:
+            self._admit(prompt)
+            stream = self.llm.stream(prompt)
+            try:
+                first = next(stream)
+            except StopIteration:
+                # Nothing came back, so only the prompt was spent
+                self._settle(prompt, {"input_tokens": len(self._text(prompt)) // 4, "output_tokens": 0})
+                return
+            except Exception as e:
+                attempt = self._backoff(e, attempt)
+                continue
+            break
+        usage = {}
+        output_chars = 0
+        try:
+            for chunk in itertools.chain([first], stream):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                output_chars += len(chunk.content) if isinstance(chunk.content, str) else 0
+                yield chunk
+        finally:
+            stream.close()
+            # Providers report usage with the last chunk, so a stream cut short settles on an estimate
+            self._settle(prompt, usage or {"input_tokens": len(self._text(prompt)) // 4,
+                                           "output_tokens": output_chars // 4})
+
+    def _with_retries(self, call, prompt):
+        attempt = 0
+        while True:
+            self._admit(prompt)
+            try:
+                message = call()
+            except Exception as e:
+                attempt = self._backoff(e, attempt)
+                continue
+            self._settle(prompt, getattr(message, "usage_metadata", None) or {})
+            return message
+
+    def _admit(self, prompt):
+        self.limiter.acquire(self._estimate(prompt), self.current_lane)
+        with self._lock:
+            self.counts["requests"] += 1
+
+    def _backoff(self, error, attempt: int) -> int:
+        # Re-raises anything that is not a rate limit, or once the retries are used up
+        delay = retry_after(error)
+        if delay is None or attempt >= self.max_retries:
+            raise error
+        with self._lock:
+            self.counts["rate_limited"] += 1
+        # Everyone waits, not just this caller: the limit is per API key
+        self.limiter.pause(max(delay, 0.5 * 2 ** attempt))
+        return attempt + 1
+
+    def _settle(self, prompt, usage: dict):
+        if usage:
+            actual = (usage.get("input_tokens") or 0) + (usage.get("output_tokens") or 0)
+            self.limiter.adjust(actual - self._estimate(prompt))
+
+    def _estimate(self, prompt) -> int:
+        return len(self._text(prompt)) // 4 + self.expected_output_tokens
+
+    @staticmethod
+    def _text(prompt) -> str:
+        if hasattr(prompt, "to_string"):
+            return prompt.to_string()
+        if isinstance(prompt, list):
+            return "\n".join(str(getattr(message, "content", message)) for message in prompt)
+        return str(prompt)
+
+    def _key(self, prompt) -> str:
+        return hashlib.sha256(self._text(prompt).encode("utf-8")).hexdigest()
+
+    def stats(self) -> dict:
+        """
+        Requests sent, requests coalesced into an identical in-flight one, 429s retried, and
+        admissions and total queueing time per lane.
+        """
+        with self._lock:
+            stats = dict(self.counts)
+        stats["admitted"] = dict(self.limiter.admitted)
+        stats["waited_seconds"] = dict(self.limiter.waited_seconds)
+        return stats
+
+
+_gateways = {}
+_gateways_lock = threading.Lock()
+
+
+def get_gateway(model_name: str, api_key: str = None, base_url: str = None,
+                requests_per_minute: int = None, tokens_per_minute: int = None) -> LLMGateway:
+    """
+    Returns the process-wide gateway for a Groq model and API key, creating it on first use with one
+    connection-pooled HTTP client. Limits default to GROQ_REQUESTS_PER_MINUTE / GROQ_TOKENS_PER_MINUTE
+    from the environment (set them to your account's quota); without them only 429s are throttled.
+    Limits passed explicitly to a later call replace those of the existing gateway, since they describe
+    the same API key's quota.
+    """
+    api_key = api_key or os.getenv("GROQ_API_KEY") or "gsk_dummy"
+    base_url = base_url or os.getenv("GROQ_BASE_URL")
+    key = (model_name, hashlib.sha256(api_key.encode("utf-8")).hexdigest(), base_url)
+    with _gateways_lock:
+        gateway = _gateways.get(key)
+        if gateway is None:
+            import httpx
+            from langchain_groq import ChatGroq
+
+            llm = ChatGroq(
+                temperature=0,
+                groq_api_key=api_key,
+                model_name=model_name,
+                base_url=base_url,
+                # Retries (and Retry-After) are handled by the gateway for everyone at once
+                max_retries=0,
+                http_client=httpx.Client(limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                                         timeout=120.0),
+            )
+            gateway = _gateways[key] = LLMGateway(
+                llm,
+                requests_per_minute=requests_per_minute or _env_int("GROQ_REQUESTS_PER_MINUTE"),
+                tokens_per_minute=tokens_per_minute or _env_int("GROQ_TOKENS_PER_MINUTE"),
+            )
+        elif requests_per_minute or tokens_per_minute:
+            limiter = gateway.limiter
+            limiter.configure(requests_per_minute or limiter.requests_per_minute,
+                              tokens_per_minute or limiter.tokens_per_minute)
+        return gateway
+
+
+def _env_int(name: str):
+    value = os.getenv(name)
+    return int(value) if value else None
@@ -1,41 +1,291 @@
+import io
+import multiprocessing
 import os
-from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader, TextLoader
-from langchain_community.document_loaders import UnstructuredPDFLoader
-from src.utils import clean_text
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from src.tracing import tracer
+from src.utils import normalization_summary, normalize_pages
+
+SUPPORTED_FORMATS = ('.pdf', '.docx', '.txt')
+# Workers are never forked: the app starts them while its LLM and job threads run, and a forked child
+# can deadlock on a lock one of those threads held at fork time
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
 
 class ResumeParser:
     def __init__(self):
-        pass
+        # The langchain loaders and docx2txt are imported on first use, keeping app start-up fast
+        self._pdf_parser = None
+        # normalize_pages reports of the most recent documents, for normalization_stats()
+        self.normalization_reports = deque(maxlen=1000)
+
+    @property
+    def pdf_parser(self):
+        if self._pdf_parser is None:
+            from langchain_community.document_loaders.parsers.pdf import PyPDFParser
+            self._pdf_parser = PyPDFParser()
+        return self._pdf_parser
 
-    def parse(self, file_path: str) -> str:
+    def parse(self, source, file_name: str = None, max_chars: int = None, report: dict = None) -> str:
         """
-        Parses a resume file and returns the extracted text.
+        Parses a resume and returns the extracted text.
+        `source` is a file path, raw bytes (bytes / bytearray / memoryview) or a binary file-like object
+        such as a Streamlit UploadedFile; for anything but a path, `file_name` supplies the extension.
+        With `max_chars`, extraction stops as soon as that much text has been read.
+        The pages are normalized before they are joined (see src.utils.normalize_pages); pass a dict
+        as `report` to receive what normalization removed.
         Supported formats: .pdf, .docx, .txt
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
+        file_ext = self._extension(source, file_name)
+        with tracer.span("parse", format=file_ext) as span:
+            pages = list(self.iter_pages(source, file_name, max_chars))
+            span.set(chars=sum(len(page) for page in pages))
+        report = {} if report is None else report
+        with tracer.span("clean") as span:
+            # Running headers and footers only exist on real pages; DOCX and TXT yield paragraph blocks
+            text = normalize_pages(pages, dedupe_edges=file_ext == ".pdf", report=report)
+            span.set(chars_removed=report["chars_before"] - report["chars_after"])
+        self.normalization_reports.append(report)
+        return text
+
+    def normalization_stats(self) -> dict:
+        """
+        Totals over the recently parsed documents, including those parsed by parse_many's workers
+        (see src.utils.normalization_summary).
+        """
+        return normalization_summary(list(self.normalization_reports))
 
-        file_ext = os.path.splitext(file_path)[1].lower()
-        text = ""
+    def iter_pages(self, source, file_name: str = None, max_chars: int = None):
+        """
+        Yields the raw text of a resume incrementally: one item per PDF page, or per paragraph block
+        for DOCX and TXT. Stops early once `max_chars` characters have been yielded, so callers that only
+        need the beginning of a long document (e.g. validation) never extract the rest.
+        """
+        file_ext = self._extension(source, file_name)
+        if file_ext not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported file format: {file_ext}")
+        label = file_name or (source if isinstance(source, str) else "<memory>")
 
+        produced = 0
         try:
-            if file_ext == '.pdf':
-                # Try PyPDFLoader first, generic and fast
-                loader = PyPDFLoader(file_path)
-                pages = loader.load()
-                text = " ".join([page.page_content for page in pages])
-            elif file_ext == '.docx':
-                loader = Docx2txtLoader(file_path)
-                pages = loader.load()
-                text = " ".join([page.page_content for page in pages])
-            elif file_ext == '.txt':
-                loader = TextLoader(file_path, encoding='utf-8')
-                pages = loader.load()
-                text = " ".join([page.page_content for page in pages])
-            else:
-                raise ValueError(f"Unsupported file format: {file_ext}")
+            for text in self._extract(source, file_ext):
+                if max_chars is not None and produced + len(text) >= max_chars:
+                    yield text[:max_chars - produced]
+                    return
+                produced += len(text)
+                yield text
         except Exception as e:
              # Fallback or detailed error handling could go here
-             raise RuntimeError(f"Error parsing file {file_path}: {str(e)}")
+             raise RuntimeError(f"Error parsing file {label}: {str(e)}")
+
+    def parse_many(self, paths, workers: int = None, timeout: float = 60.0, max_memory_mb: int = None):
+        """
+        Parses many files in parallel worker processes and yields one result dict per file, in
+        completion order: {"path", "text", "error", "elapsed", "normalization"} with either "text"
+        (and its normalize_pages report) or "error" set.
+        A file that takes longer than `timeout` seconds has its worker killed and replaced, and on
+        POSIX each worker may grow its address space by at most `max_memory_mb` beyond what it uses
+        once started (interpreter and parsing libraries), so one malformed or huge document is
+        reported as an error instead of stalling or exhausting the import. Files are only handed to
+        workers that have finished starting up, so start-up time never counts against `timeout`.
+        """
+        queue = deque(paths)
+        workers = min(workers or os.cpu_count() or 1, len(queue))
+        pool = [_Worker(max_memory_mb) for _ in range(workers)]
+        try:
+            while queue or any(worker.path for worker in pool):
+                for worker in pool:
+                    if worker.path is None and queue and worker.is_ready():
+                        worker.submit(queue.popleft())
+
+                busy = [worker for worker in pool if worker.path is not None]
+                starting = [worker for worker in pool if not worker.ready]
+                for worker in starting:
+                    if not worker.process.is_alive():
+                        raise RuntimeError(f"Parse worker failed to start (exit code {worker.process.exitcode})")
+                deadline = min(worker.started for worker in busy) + timeout if busy else None
+                watched = busy + starting
+                wait([worker.conn for worker in watched] + [worker.process.sentinel for worker in watched],
+                     timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+                for index, worker in enumerate(pool):
+                    if worker.path is None:
+                        continue
+                    result = worker.poll()
+                    if result is None and not worker.process.is_alive():
+                        result = worker.fail("Worker process died (memory limit exceeded?)")
+                    elif result is None and time.monotonic() - worker.started > timeout:
+                        result = worker.fail(f"Timed out after {timeout:.0f}s")
+                    if result is None:
+                        continue
+                    if worker.killed:
+                        pool[index] = _Worker(max_memory_mb)
+                    if result["normalization"]:
+                        self.normalization_reports.append(result["normalization"])
+                    yield result
+        finally:
+            for worker in pool:
+                worker.close()
+
+    def _extension(self, source, file_name):
+        if isinstance(source, str):
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"File not found: {source}")
+            file_name = file_name or source
+        if not file_name:
+            raise ValueError("file_name is required to detect the format of in-memory documents")
+        return os.path.splitext(file_name)[1].lower()
+
+    def _extract(self, source, file_ext):
+        if file_ext == '.pdf':
+            # PyPDFParser extracts page by page, so early termination skips the remaining pages
+            for page in self.pdf_parser.lazy_parse(self._blob(source)):
+                yield page.page_content
+        elif file_ext == '.docx':
+            import docx2txt
+            # docx2txt reads the zip container straight from the stream, no temp file needed
+            yield from _blocks(docx2txt.process(self._stream(source)))
+        else:
+            yield from _blocks(self._blob(source).as_string())
+
+    @staticmethod
+    def _blob(source):
+        from langchain_core.document_loaders import Blob
+        if isinstance(source, str):
+            return Blob.from_path(source, encoding='utf-8')
+        if isinstance(source, bytes):
+            return Blob.from_data(source, encoding='utf-8')
+        if isinstance(source, (bytearray, memoryview)):
+            return Blob.from_data(bytes(source), encoding='utf-8')
+        # BytesIO-like objects (UploadedFile) hand over their buffer without an extra copy
+        if hasattr(source, "getvalue"):
+            return Blob.from_data(source.getvalue(), encoding='utf-8')
+        source.seek(0)
+        return Blob.from_data(source.read(), encoding='utf-8')
+
+    @staticmethod
+    def _stream(source):
+        if isinstance(source, str):
+            return source
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return io.BytesIO(source)
+        source.seek(0)
+        return source
+
+
+class _Worker:
+    # One long-lived parsing process; replaced wholesale when it hangs or dies
+
+    def __init__(self, max_memory_mb):
+        self.conn, child = _MP_CONTEXT.Pipe()
+        self.process = _MP_CONTEXT.Process(target=_worker_main, args=(child, max_memory_mb), daemon=True)
+        self.process.start()
+        child.close()
+        self.path = None
+        self.started = None
+        self.killed = False
+        # Set once the process has sent its start-up message (imports done, memory cap applied)
+        self.ready = False
+
+    def is_ready(self) -> bool:
+        if not self.ready:
+            try:
+                if self.conn.poll():
+                    self.conn.recv()
+                    self.ready = True
+            except (EOFError, OSError):
+                pass
+        return self.ready
+
+    def submit(self, path):
+        self.path = path
+        self.started = time.monotonic()
+        self.conn.send(path)
+
+    def poll(self):
+        try:
+            if not self.conn.poll():
+                return None
+            text, error, report = self.conn.recv()
+        except (EOFError, OSError):
+            return None
+        return self._finish(text, error, report)
+
+    def fail(self, error: str):
+        self.process.kill()
+        self.process.join()
+        self.killed = True
+        return self._finish(None, error)
+
+    def _finish(self, text, error, report=None):
+        result = {"path": self.path, "text": text, "error": error, "elapsed": time.monotonic() - self.started,
+                  "normalization": report}
+        self.path = None
+        return result
+
+    def close(self):
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.kill()
+        self.conn.close()
+
+
+def _worker_main(conn, max_memory_mb):
+    parser = ResumeParser()
+    # Imported up front so the memory cap below only has to cover the documents themselves
+    parser.pdf_parser
+    if max_memory_mb:
+        try:
+            import resource
+            # RLIMIT_AS counts the whole address space, so the cap is a margin over what is mapped now;
+            # where that is unknown (no /proc, e.g. macOS) no cap is set rather than an absolute one
+            current = _address_space()
+            if current is not None:
+                limit = current + max_memory_mb * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            # Not available on Windows; the timeout still applies
+            pass
+    conn.send("ready")
+    while True:
+        path = conn.recv()
+        if path is None:
+            break
+        report = {}
+        try:
+            conn.send((parser.parse(path, report=report), None, report))
+        except Exception as e:
+            conn.send((None, _error_message(e, max_memory_mb), None))
+
+
+def _address_space():
+    # Current virtual memory size in bytes (VmSize), from /proc on Linux; None where it is unavailable
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _error_message(error: Exception, max_memory_mb) -> str:
+    # Allocation failures under the cap can surface as a bare MemoryError or wrapped in another error
+    chained = error.__cause__ or error.__context__
+    if isinstance(error, MemoryError) or isinstance(chained, MemoryError):
+        return f"MemoryError: memory limit exceeded (max_memory_mb={max_memory_mb})"
+    return str(error) or type(error).__name__
+
 
-        return clean_text(text)
+def _blocks(text: str):
+    # Paragraph-sized pieces so plain-text formats stream incrementally too
+    for block in text.split("\n\n"):
+        if block.strip():
+            yield block
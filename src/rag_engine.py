@@ -1,126 +1,693 @@
 import os
-from langchain_groq import ChatGroq
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 import json
+from src.cache import ResultCache
+from src.classifier import ACCEPT, UNCERTAIN, classify_document
+from src.json_stream import IncrementalJSONParser
+from src.llm_gateway import LLMGateway, get_gateway
+from src.skills import default_skill_matcher
+from src.structured_output import ANALYSIS_SCHEMA, VALIDATION_SCHEMA, parse_structured, validate_field
+from src.tracing import tracer
+from src.utils import estimate_tokens
 
 load_dotenv()
 
+DEFAULT_MODEL_NAME = "llama-3.3-70b-versatile"
+
+# Bump whenever either template changes so cached results from the old prompts are not reused
+PROMPT_VERSION = "3"
+
+VALIDATION_TEMPLATE = """
+You are a document classifier. Your task is to determine if the input text is a valid Resume/CV.
+
+Criteria for a valid Resume/CV:
+1. Contains professional sections: 'Experience', 'Education', 'Skills', 'Projects', 'Summary'.
+2. Contains contact information (Name, Email, Phone).
+3. Is NOT a government ID (Passport, Driver's License, Aadhar, etc.).
+4. Is NOT an invoice, receipt, or random text.
+
+Input Text:
+{text}
+
+Output strictly a JSON object:
+{{
+    "is_resume": true/false,
+    "confidence": 0-100,
+    "document_type": "Resume" or "Passport" or "Invoice" or "Unknown"
+}}
+"""
+
+ANALYSIS_TEMPLATE = """
+You are an expert HR AI assistant. Your task is to evaluate a candidate's resume against a specific job description.
+
+Job Description:
+{job_description}
+
+Skills detected by keyword matching (hints: start "matching_skills" and "missing_skills" from these lists,
+drop any that the texts show are false matches, and add skills a keyword list cannot capture):
+{skill_evidence}
+
+Resume Content:
+{resume_text}
+
+Analyze the match and provide a structured JSON output with the following keys:
+- "match_score": A score between 0 and 100 indicating the fit.
+- "missing_skills": A list of critical skills missing from the resume.
+- "matching_skills": A list of skills that match the job description.
+- "summary": A brief professional summary of the candidate's fit.
+- "recommendation": "Hire", "Interview", or "Reject".
+- "interview_questions": A list of 3-5 objects, each containing:
+    - "question": The interview question.
+    - "context": Why this question is relevant to the candidate's profile.
+    - "answer_tip": A strategic tip on how to answer using the STAR method.
+- "match_breakdown": A dictionary containing sub-scores (0-100) for "skills_match", "experience_match", "education_match", and "communication_style".
+- "resume_improvements": A list of 3 actionable suggestions to improve the resume, each containing:
+    - "section": The section to improve (e.g., "Summary", "Experience").
+    - "suggestion": Specific advice on what to change.
+    - "example": A rewritten example of a bullet point or sentence to make it more impactful/ATS-friendly.
+
+Ensure the output is strictly valid JSON. Do not include any preamble or explanation outside the JSON.
+"""
+
+# Per-field instructions used when only some fields of an analysis have to be requested again
+ANALYSIS_FIELDS = {
+    "match_score": "A score between 0 and 100 indicating the fit.",
+    "missing_skills": "A list of critical skills missing from the resume.",
+    "matching_skills": "A list of skills that match the job description.",
+    "summary": "A brief professional summary of the candidate's fit.",
+    "recommendation": '"Hire", "Interview", or "Reject".',
+    "interview_questions": 'A list of 3-5 objects, each containing "question", "context" (why it is relevant '
+                           'to the candidate\'s profile) and "answer_tip" (a STAR-method tip).',
+    "match_breakdown": 'A dictionary containing sub-scores (0-100) for "skills_match", "experience_match", '
+                       '"education_match", and "communication_style".',
+    "resume_improvements": 'A list of 3 objects, each containing "section", "suggestion" and "example" '
+                           '(a rewritten, more impactful bullet point or sentence).',
+}
+
+# Stands in for the detected skills when local skill matching is turned off
+NO_SKILL_EVIDENCE = "Not available; identify the skills yourself."
+
+FOLLOW_UP_TEMPLATE = """
+You are an expert HR AI assistant. You evaluated a candidate's resume against a job description, but some
+fields of your JSON answer were missing or malformed.
+
+Job Description:
+{job_description}
+
+Resume Content:
+{resume_text}
+
+Your answer so far (keep the new fields consistent with it):
+{partial}
+
+Provide ONLY the following keys as a strictly valid JSON object:
+{fields}
+
+Do not include any preamble or explanation outside the JSON.
+"""
+
 class RAGEngine:
-    def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            # For verification purposes, we might want to allow empty key if just testing imports
-            # But the app needs it. We'll keep the check but maybe make it softer for tests?
-            # Actually, standard behavior is fine.
-            pass
-            
-        self.llm = ChatGroq(
-            temperature=0, 
-            groq_api_key=api_key or "gsk_dummy", # Placeholder for init if env missing, though verification set it?
-            model_name="llama-3.3-70b-versatile"
-        )
+    def __init__(self, llm=None, model_name: str = DEFAULT_MODEL_NAME, cache: ResultCache = None,
+                 local_classifier: bool = True, compactor=None, gateway: LLMGateway = None,
+                 local_skills: bool = True):
+        self.model_name = model_name
+        # All calls go through an LLMGateway (rate limits, 429 retries, coalescing). By default that is
+        # the process-wide Groq gateway for this model and key, shared with every other engine; an
+        # injected chat model (e.g. src.fake_llm.FakeChatModel for offline runs) gets a private one
+        if gateway is None:
+            gateway = LLMGateway(llm) if llm is not None else get_gateway(model_name, os.getenv("GROQ_API_KEY"))
+        self.gateway = gateway
+        self.llm = gateway.llm
         self.output_parser = StrOutputParser()
+        # Optional src.cache.ResultCache; None disables memoization entirely
+        self.cache = cache
+        # Try src.classifier before spending an LLM call on "is this a resume?"
+        self.local_classifier = local_classifier
+        # Optional src.compaction.PromptCompactor; None sends the full resume text to the analysis prompt
+        self.compactor = compactor
+        self.compaction = Counter()
+        # Shared src.skills.SkillMatcher whose skill lists are handed to the analysis prompt; None to let
+        # the model find the skills on its own
+        self.skill_matcher = default_skill_matcher() if local_skills else None
+        # Repairs, follow-up requests for missing fields, and tokens they saved versus full retries
+        self.structured = Counter()
+        self.validation_paths = Counter()
+        self.speculation = Counter()
+        self.token_usage = Counter()
+        # Per-thread, so one engine can be shared by concurrent Streamlit sessions
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
 
-    def validate_resume(self, text: str) -> bool:
+    @property
+    def last_stream_metrics(self) -> dict:
+        return getattr(self._local, "stream_metrics", {})
+
+    def validate_resume(self, text: str, use_cache: bool = True) -> bool:
         """
         Validates if the input text appears to be a resume/CV.
+        Set use_cache=False to bypass the result cache and force a fresh LLM call.
+        """
+        return self.validate_resume_detailed(text, use_cache=use_cache)["is_resume"]
+
+    def validate_resume_detailed(self, text: str, use_cache: bool = True) -> dict:
+        """
+        Same as validate_resume, but also reports how the decision was reached.
+        "path" is one of "too_short", "local" (fast-path classifier), "cache" or "llm", and is
+        tallied in self.validation_paths so the share of avoided LLM calls can be measured.
+        If the LLM call fails, "is_resume" is False and "error" holds the reason.
         """
+        with tracer.span("validate") as span:
+            result = self._validate_without_llm(text, use_cache)
+            if result is None:
+                result = self._validate_with_llm(text)
+            span.set(path=result["path"], is_resume=result["is_resume"])
+        return result
+
+    def _validate_without_llm(self, text: str, use_cache: bool):
+        # If text is too short, it's likely not a valid resume (or just an OCR failure)
+        if len(text.strip()) < 50:
+            return self._validation_result(False, "too_short", "Unknown", 100)
+
+        # Clear-cut documents are decided locally in milliseconds; only ambiguous ones reach the LLM
+        if self.local_classifier:
+            local = classify_document(text)
+            if local["decision"] != UNCERTAIN:
+                return self._validation_result(local["decision"] == ACCEPT, "local",
+                                               local["document_type"], local["confidence"])
+
+        cache_key = self._cache_key("validate", text[:3000])
+        if use_cache and cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return self._validation_result(cached, "cache", "Resume" if cached else "Unknown", None)
+        return None
+
+    def _validate_with_llm(self, text: str) -> dict:
         validation_prompt = PromptTemplate(
             input_variables=["text"],
-            template="""
-            You are a document classifier. Your task is to determine if the input text is a valid Resume/CV.
-            
-            Criteria for a valid Resume/CV:
-            1. Contains professional sections: 'Experience', 'Education', 'Skills', 'Projects', 'Summary'.
-            2. Contains contact information (Name, Email, Phone).
-            3. Is NOT a government ID (Passport, Driver's License, Aadhar, etc.).
-            4. Is NOT an invoice, receipt, or random text.
-            
-            Input Text:
-            {text}
-            
-            Output strictly a JSON object:
-            {{
-                "is_resume": true/false,
-                "confidence": 0-100,
-                "document_type": "Resume" or "Passport" or "Invoice" or "Unknown"
-            }}
-            """
+            template=VALIDATION_TEMPLATE
         )
-        chain = validation_prompt | self.llm | self.output_parser
-        
-        # If text is too short, it's likely not a valid resume (or just an OCR failure)
-        if len(text.strip()) < 50:
-            return False
             
         try:
-            result = chain.invoke({"text": text[:3000]})
-            # Clean json block
-            cleaned = result.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-            elif cleaned.startswith("```"):
-                cleaned = cleaned.split("```")[1].split("```")[0].strip()
-                
-            data = json.loads(cleaned)
-            return data.get("is_resume", False) and data.get("document_type", "").lower() == "resume"
+            result, _ = self._invoke_llm(validation_prompt, {"text": text[:3000]})
+            with tracer.span("post_process"):
+                data, _, _ = parse_structured(result, VALIDATION_SCHEMA)
+            is_resume = bool(data["is_resume"] and data.get("document_type", "").lower() == "resume")
         except Exception as e:
-            # Fallback
-            return False
+            # Not a verdict: reported as an error so callers do not mistake it for a rejection (and not cached)
+            return {**self._validation_result(False, "llm", "Unknown", None), "error": str(e) or type(e).__name__}
+
+        cache_key = self._cache_key("validate", text[:3000])
+        if cache_key:
+            self.cache.set(cache_key, is_resume, kind="validate")
+        return self._validation_result(is_resume, "llm", data.get("document_type", "Unknown"), data.get("confidence"))
+
+    def _validation_result(self, is_resume: bool, path: str, document_type: str, confidence) -> dict:
+        with self._stats_lock:
+            self.validation_paths[path] += 1
+        return {
+            "is_resume": is_resume,
+            "path": path,
+            "document_type": document_type,
+            "confidence": confidence,
+        }
 
-    def analyze_resume(self, resume_text: str, job_description: str) -> dict:
+    def validation_stats(self) -> dict:
         """
-        Analyzes the resume against the job description and returns a structured JSON response.
+        Returns per-path validation counts and the fraction of validations that avoided an LLM call.
         """
-        prompt_template = """
-        You are an expert HR AI assistant. Your task is to evaluate a candidate's resume against a specific job description.
-        
-        Job Description:
-        {job_description}
-        
-        Resume Content:
-        {resume_text}
-        
-        Analyze the match and provide a structured JSON output with the following keys:
-        - "match_score": A score between 0 and 100 indicating the fit.
-        - "missing_skills": A list of critical skills missing from the resume.
-        - "matching_skills": A list of skills that match the job description.
-        - "summary": A brief professional summary of the candidate's fit.
-        - "recommendation": "Hire", "Interview", or "Reject".
-        - "interview_questions": A list of 3-5 objects, each containing:
-            - "question": The interview question.
-            - "context": Why this question is relevant to the candidate's profile.
-            - "answer_tip": A strategic tip on how to answer using the STAR method.
-        - "match_breakdown": A dictionary containing sub-scores (0-100) for "skills_match", "experience_match", "education_match", and "communication_style".
-        - "resume_improvements": A list of 3 actionable suggestions to improve the resume, each containing:
-            - "section": The section to improve (e.g., "Summary", "Experience").
-            - "suggestion": Specific advice on what to change.
-            - "example": A rewritten example of a bullet point or sentence to make it more impactful/ATS-friendly.
-        
-        Ensure the output is strictly valid JSON. Do not include any preamble or explanation outside the JSON.
+        with self._stats_lock:
+            counts = dict(self.validation_paths)
+        total = sum(counts.values())
+        return {
+            "counts": counts,
+            "total": total,
+            "llm_call_reduction": (total - counts.get("llm", 0)) / total if total else 0.0,
+        }
+
+    def analyze_resume(self, resume_text: str, job_description: str, use_cache: bool = True) -> dict:
         """
-        
+        Analyzes the resume against the job description and returns a structured JSON response.
+        Set use_cache=False to bypass the result cache and force a fresh LLM call.
+        """
+        return self._analyze(resume_text, job_description, use_cache)[0]
+
+    def _analyze(self, resume_text: str, job_description: str, use_cache: bool):
+        # Returns (result, token usage of this call); the usage also tells whether the cache answered
+        with tracer.span("analyze") as span:
+            result, usage = self._analyze_uncached(resume_text, job_description, use_cache)
+            span.set(cached=not any(usage.values()), error="error" in result)
+        return result, usage
+
+    def _analyze_uncached(self, resume_text: str, job_description: str, use_cache: bool):
+        cache_key = self._analysis_cache_key(resume_text, job_description)
+        if use_cache and cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached, {"input_tokens": 0, "output_tokens": 0}
+
         prompt = PromptTemplate(
-            input_variables=["job_description", "resume_text"],
-            template=prompt_template
+            input_variables=["job_description", "resume_text", "skill_evidence"],
+            template=ANALYSIS_TEMPLATE
         )
         
-        chain = prompt | self.llm | self.output_parser
-        response = chain.invoke({"job_description": job_description, "resume_text": resume_text})
-        
-        try:
-            # Attempt to parse JSON. If the model includes markdown blocks like ```json ... ```, strip them.
-            cleaned_response = response.strip()
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response.split("```json")[1].split("```")[0].strip()
-            elif cleaned_response.startswith("```"):
-                cleaned_response = cleaned_response.split("```")[1].split("```")[0].strip()
-                
-            return json.loads(cleaned_response)
-        except json.JSONDecodeError:
+        skill_match, skill_evidence = self._skill_match(resume_text, job_description)
+        prompt_resume = self._prompt_resume(resume_text, job_description)
+        response, usage = self._invoke_llm(prompt, {"job_description": job_description, "resume_text": prompt_resume,
+                                                    "skill_evidence": skill_evidence})
+
+        # Fences, prose, quoting and truncation are repaired; fields still missing are requested on their own
+        with tracer.span("post_process") as span:
+            result, missing, repairs = parse_structured(response, ANALYSIS_SCHEMA)
+            span.set(repairs=repairs, missing=len(missing))
+        self._record_structured(repairs)
+        missing = self._complete_analysis(result, missing, job_description, prompt_resume, usage)
+
+        if not result:
             return {
                 "error": "Failed to parse API response",
                 "raw_response": response
+            }, usage
+        if skill_match is not None:
+            result["skill_match"] = skill_match
+
+        # Only complete analyses are cached, so anything still missing is retried on the next call
+        if cache_key and not missing:
+            self.cache.set(cache_key, result, kind="analyze")
+        return result, usage
+
+    def _complete_analysis(self, result: dict, missing: list, job_description: str, prompt_resume: str,
+                           usage: dict) -> list:
+        # Asks only for the missing fields of a partial analysis and merges them into `result` in place.
+        # `usage` (the first call's) is increased by the follow-up's tokens. Returns the fields still missing
+        if not result or not missing:
+            return missing
+        prompt = PromptTemplate(
+            input_variables=["job_description", "resume_text", "partial", "fields"],
+            template=FOLLOW_UP_TEMPLATE
+        )
+        fields = "\n".join(f'- "{key}": {ANALYSIS_FIELDS[key]}' for key in missing)
+        # Only the headline fields are echoed back; the long lists would add tokens without adding consistency
+        partial = {key: result[key] for key in ("match_score", "recommendation", "match_breakdown") if key in result}
+        full_retry_tokens = usage["input_tokens"] + usage["output_tokens"]
+        response, reask_usage = self._invoke_llm(prompt, {"job_description": job_description,
+                                                          "resume_text": prompt_resume,
+                                                          "partial": json.dumps(partial), "fields": fields})
+        with tracer.span("post_process", reask=True):
+            extra, _, _ = parse_structured(response, ANALYSIS_SCHEMA)
+        for key in missing:
+            if key in extra:
+                result[key] = extra[key]
+        still_missing = [key for key in missing if key not in result]
+
+        reask_tokens = reask_usage["input_tokens"] + reask_usage["output_tokens"]
+        with self._stats_lock:
+            self.structured["reasks"] += 1
+            self.structured["reasked_fields"] += len(missing)
+            self.structured["reask_tokens"] += reask_tokens
+            # What re-running the whole analysis would have cost instead
+            self.structured["full_retry_tokens"] += full_retry_tokens
+            self.structured["incomplete"] += bool(still_missing)
+        for key in usage:
+            usage[key] += reask_usage[key]
+        return still_missing
+
+    def _record_structured(self, repairs: list):
+        with self._stats_lock:
+            self.structured["responses"] += 1
+            self.structured["repaired"] += bool(repairs)
+            for repair in repairs:
+                self.structured[f"repair_{repair}"] += 1
+
+    def structured_output_stats(self) -> dict:
+        """
+        Returns counters for analysis output handling: responses parsed, responses that needed repair
+        (by kind), follow-up requests for missing fields ("reasks") and their rate, and the tokens
+        saved by those follow-ups compared with re-running the full analysis.
+        """
+        with self._stats_lock:
+            stats = dict(self.structured)
+        responses = stats.get("responses", 0)
+        stats["reask_rate"] = stats.get("reasks", 0) / responses if responses else 0.0
+        stats["tokens_saved"] = stats.get("full_retry_tokens", 0) - stats.get("reask_tokens", 0)
+        return stats
+
+    def validate_and_analyze(self, resume_text: str, job_description: str, use_cache: bool = True,
+                             concurrent: bool = True) -> dict:
+        """
+        Validates and analyzes a resume, returning {"validation": ..., "analysis": ...}.
+        "analysis" is None when the document is rejected. With concurrent=True and a validation that
+        needs the LLM, the analysis is streamed speculatively alongside it (see
+        validate_and_analyze_stream), so latency is roughly the slower of the two calls instead of
+        their sum; a rejection stops the analysis stream, and its result is never cached.
+        """
+        validation = self._validate_without_llm(resume_text, use_cache)
+        if validation is not None or not concurrent:
+            if validation is None:
+                validation = self._validate_with_llm(resume_text)
+            analysis = self.analyze_resume(resume_text, job_description, use_cache) if validation["is_resume"] else None
+            return {"validation": validation, "analysis": analysis}
+
+        analysis = {}
+        for key, value in self.validate_and_analyze_stream(resume_text, job_description, use_cache, concurrent=True):
+            if key == "validation":
+                validation = value
+            else:
+                analysis[key] = value
+        return {"validation": validation, "analysis": analysis if validation["is_resume"] else None}
+
+    def analyze_resume_stream(self, resume_text: str, job_description: str, use_cache: bool = True):
+        """
+        Streaming variant of analyze_resume. Yields (key, value) pairs for each top-level field of
+        the analysis (match_score, match_breakdown, matching_skills, ...) as soon as that field is
+        complete in the model's output. If the output cannot be parsed, yields ("error", ...) and
+        ("raw_response", ...) like analyze_resume. Time to first score and total latency of the
+        last call made from the current thread are stored in self.last_stream_metrics.
+        """
+        metrics = {}
+        yield from self._stream_analysis(resume_text, job_description, use_cache, metrics)
+
+    def _stream_analysis(self, resume_text: str, job_description: str, use_cache: bool, metrics: dict,
+                         accepted=None):
+        # accepted: for speculative runs, a callable that waits for the validation and returns whether
+        # it accepted the document; the result is cached only if it did
+        start = time.perf_counter()
+        metrics.update({"time_to_first_token": None, "time_to_first_score": None, "total": None,
+                        "cached": False, "output_chars": 0})
+        self._local.stream_metrics = metrics
+
+        cache_key = self._analysis_cache_key(resume_text, job_description)
+        if use_cache and cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                metrics["cached"] = True
+                metrics["time_to_first_score"] = metrics["total"] = time.perf_counter() - start
+                tracer.record("analyze", metrics["total"], cached=True, stream=True)
+                yield from cached.items()
+                return
+
+        prompt = PromptTemplate(
+            input_variables=["job_description", "resume_text", "skill_evidence"],
+            template=ANALYSIS_TEMPLATE
+        )
+        parser = IncrementalJSONParser()
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        model = self.model_name
+        # Time spent in incremental JSON parsing, reported as the post_process stage
+        parse_seconds = 0.0
+        # Fields yielded so far, already validated against ANALYSIS_SCHEMA
+        result = {}
+        # Computed locally in milliseconds, so the skill overlap is shown before the model starts answering
+        skill_match, skill_evidence = self._skill_match(resume_text, job_description)
+        if skill_match is not None:
+            yield "skill_match", skill_match
+        try:
+            inputs = {"job_description": job_description,
+                      "resume_text": self._prompt_resume(resume_text, job_description, metrics),
+                      "skill_evidence": skill_evidence}
+            prompt_value = prompt.format_prompt(**inputs)
+            # Usage only arrives with the last chunk; this is what a stream closed early has already sent
+            metrics["input_tokens_estimate"] = estimate_tokens(prompt_value.to_string())
+            for chunk in self.gateway.stream(prompt_value):
+                if metrics["time_to_first_token"] is None:
+                    metrics["time_to_first_token"] = time.perf_counter() - start
+                chunk_usage = getattr(chunk, "usage_metadata", None) or {}
+                usage["input_tokens"] += chunk_usage.get("input_tokens", 0)
+                usage["output_tokens"] += chunk_usage.get("output_tokens", 0)
+                if getattr(chunk, "response_metadata", None):
+                    model = self._response_model(chunk)
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                metrics["output_chars"] += len(text)
+                parse_start = time.perf_counter()
+                fields = parser.feed(text)
+                parse_seconds += time.perf_counter() - parse_start
+                for key, value in fields:
+                    valid, value = validate_field(ANALYSIS_SCHEMA, key, value)
+                    if not valid:
+                        continue
+                    if key == "match_score" and metrics["time_to_first_score"] is None:
+                        metrics["time_to_first_score"] = time.perf_counter() - start
+                    result[key] = value
+                    yield key, value
+        finally:
+            # Also runs when the consumer stops early (generator closed), which ends the HTTP stream
+            metrics["total"] = time.perf_counter() - start
+            metrics["usage"] = usage
+            with self._stats_lock:
+                self.token_usage.update(usage)
+            # Generators cannot hold a span open across yields, so the stages are recorded afterwards
+            tracer.record("llm", metrics["total"], model=model, stream=True,
+                          time_to_first_token=metrics["time_to_first_token"], **usage)
+            tracer.record("post_process", parse_seconds, incremental=True)
+            tracer.record("analyze", metrics["total"], cached=False, stream=True,
+                          time_to_first_score=metrics["time_to_first_score"])
+
+        # Recover what the incremental parser could not (e.g. a truncated tail), then re-ask for the rest
+        repairs = []
+        if not parser.done:
+            recovered, _, repairs = parse_structured(parser.buffer, ANALYSIS_SCHEMA)
+            for key, value in recovered.items():
+                if key not in result:
+                    result[key] = value
+                    yield key, value
+        self._record_structured(repairs)
+        missing = [key for key in ANALYSIS_SCHEMA if key not in result]
+        known = set(result)
+        missing = self._complete_analysis(result, missing, job_description, inputs["resume_text"], usage)
+        for key in ANALYSIS_SCHEMA:
+            if key in result and key not in known:
+                yield key, result[key]
+
+        if not result:
+            yield "error", "Failed to parse API response"
+            yield "raw_response", parser.buffer
+            return
+        if skill_match is not None:
+            result["skill_match"] = skill_match
+
+        # Only complete analyses are cached, so anything still missing is retried on the next call
+        if cache_key and not missing and (accepted is None or accepted()):
+            self.cache.set(cache_key, result, kind="analyze")
+
+    def validate_and_analyze_stream(self, resume_text: str, job_description: str, use_cache: bool = True,
+                                    concurrent: bool = True):
+        """
+        Streaming counterpart of validate_and_analyze. Always yields ("validation", dict) first and,
+        for accepted documents, the analysis fields as analyze_resume_stream produces them.
+        In concurrent mode, fields streamed before the LLM validation returns are held back until it
+        accepts the document; a rejection closes the analysis stream (before its LLM call if the
+        validation was quick enough) and records the partial cost. A validation that failed with an
+        error is yielded (with its "error") and counted separately from rejections.
+        """
+        validation = self._validate_without_llm(resume_text, use_cache)
+        if validation is None and not concurrent:
+            validation = self._validate_with_llm(resume_text)
+        if validation is not None:
+            yield "validation", validation
+            if validation["is_resume"]:
+                yield from self.analyze_resume_stream(resume_text, job_description, use_cache)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        validation_future = executor.submit(self._validate_with_llm, resume_text)
+        executor.shutdown(wait=False)
+        with self._stats_lock:
+            self.speculation["speculative_runs"] += 1
+
+        metrics = {}
+        stream = self._stream_analysis(resume_text, job_description, use_cache, metrics,
+                                       accepted=lambda: validation_future.result()["is_resume"])
+        held_back = []
+        try:
+            for item in stream:
+                if validation is None and validation_future.done():
+                    validation = validation_future.result()
+                    if not validation["is_resume"]:
+                        break
+                    yield "validation", validation
+                    yield from held_back
+                if validation is None:
+                    held_back.append(item)
+                else:
+                    yield item
+        finally:
+            stream.close()
+
+        if validation is None:
+            validation = validation_future.result()
+            if validation["is_resume"]:
+                yield "validation", validation
+                yield from held_back
+                return
+        if validation["is_resume"]:
+            return
+
+        with self._stats_lock:
+            # An error is not a verdict on the document, so it must not inflate the rejection rate
+            self.speculation["validation_errors" if "error" in validation else "rejected"] += 1
+            # The analysis LLM call had not started yet (the stream was closed while matching skills)
+            if "usage" not in metrics:
+                self.speculation["cancelled"] += 1
+            else:
+                self.speculation["discarded"] += 1
+                usage = metrics["usage"]
+                # Streams report usage at the end, so a stream closed early falls back to estimates
+                self.speculation["wasted_output_tokens"] += (usage.get("output_tokens")
+                                                             or metrics.get("output_chars", 0) // 4)
+                self.speculation["wasted_input_tokens"] += (usage.get("input_tokens")
+                                                            or metrics.get("input_tokens_estimate", 0))
+        yield "validation", validation
+
+    def speculation_stats(self) -> dict:
+        """
+        Returns counters for concurrent validate_and_analyze runs: how many ran speculatively, how many
+        were rejected and how many had a validation that failed with an error ("validation_errors"),
+        how many of those analyses were cancelled before their LLM call started or discarded after it
+        started, and the tokens spent on discarded analyses.
+        """
+        with self._stats_lock:
+            return dict(self.speculation)
+
+    def _invoke_llm(self, prompt: PromptTemplate, inputs: dict):
+        # Returns (text, token usage); usage is empty for models that do not report it
+        with tracer.span("llm") as span:
+            message = self.gateway.invoke(prompt.format_prompt(**inputs))
+            metadata = getattr(message, "usage_metadata", None) or {}
+            usage = {
+                "input_tokens": metadata.get("input_tokens", 0),
+                "output_tokens": metadata.get("output_tokens", 0),
             }
+            span.set(model=self._response_model(message), **usage)
+        with self._stats_lock:
+            self.token_usage.update(usage)
+        return self.output_parser.invoke(message), usage
+
+    def _response_model(self, message) -> str:
+        # The model that actually answered, as reported by the provider, falling back to the configured one
+        metadata = getattr(message, "response_metadata", None) or {}
+        return metadata.get("model_name") or metadata.get("model") or self.model_name
+
+    def _skill_match(self, resume_text: str, job_description: str):
+        # Returns (SkillMatcher.match result or None, the lines handing it to the model). Always matched
+        # on the full resume, so skills outside the chunks kept by compaction still count
+        if self.skill_matcher is None:
+            return None, NO_SKILL_EVIDENCE
+        with tracer.span("skills"):
+            match = self.skill_matcher.match(resume_text, job_description)
+        return match, "\n".join([
+            f"- Required by the job: {', '.join(match['required_skills']) or 'none detected'}",
+            f"- Present in the resume: {', '.join(match['matching_skills']) or 'none'}",
+            f"- Missing from the resume: {', '.join(match['missing_skills']) or 'none'}",
+            f"- Other skills in the resume: "
+            f"{', '.join(s for s in match['resume_skills'] if s not in match['required_skills']) or 'none'}",
+        ])
+
+    def _prompt_resume(self, resume_text: str, job_description: str, metrics: dict = None) -> str:
+        # The resume text as it goes into the analysis prompt, compacted when a compactor is configured
+        if self.compactor is None:
+            return resume_text
+        compaction = self.compactor.compact(resume_text, job_description)
+        if metrics is not None:
+            metrics["resume_tokens_before"] = compaction["tokens_before"]
+            metrics["resume_tokens_after"] = compaction["tokens_after"]
+        with self._stats_lock:
+            self.compaction["calls"] += 1
+            self.compaction["compacted"] += compaction["compacted"]
+            self.compaction["tokens_before"] += compaction["tokens_before"]
+            self.compaction["tokens_after"] += compaction["tokens_after"]
+        return compaction["text"]
+
+    def compaction_stats(self) -> dict:
+        """
+        Returns how many analysis prompts were compacted and the estimated resume tokens before and after.
+        """
+        with self._stats_lock:
+            stats = dict(self.compaction)
+        before = stats.get("tokens_before", 0)
+        stats["token_reduction"] = (before - stats.get("tokens_after", 0)) / before if before else 0.0
+        return stats
+
+    def gateway_stats(self) -> dict:
+        """
+        Returns the shared LLM gateway's counters (see LLMGateway.stats); they cover every engine using it.
+        """
+        return self.gateway.stats()
+
+    def _analysis_cache_key(self, resume_text: str, job_description: str):
+        # The compactor and the skill taxonomy both change the prompt, so they are part of the key
+        variants = [component.signature for component in (self.compactor, self.skill_matcher) if component is not None]
+        return self._cache_key("analyze", resume_text, job_description, *variants)
+
+    def _cache_key(self, kind: str, *texts: str):
+        if self.cache is None:
+            return None
+        return ResultCache.make_key(kind, self.model_name, PROMPT_VERSION, *texts)
+
+    def screen_resume(self, name: str, resume_text: str, job_description: str, validate: bool = True,
+                      use_cache: bool = True) -> dict:
+        """
+        Runs validation and analysis for a single candidate and flattens the outcome into one row.
+        Errors are captured in the row instead of raised so one bad resume cannot abort a batch.
+        """
+        start = time.perf_counter()
+        row = {"name": name, "is_resume": None, "match_score": None, "recommendation": None,
+               "analysis": None, "error": None}
+        try:
+            if validate:
+                validation = self.validate_resume_detailed(resume_text, use_cache=use_cache)
+                row["is_resume"] = validation["is_resume"]
+                if "error" in validation:
+                    row["is_resume"] = None
+                    row["error"] = f"Validation failed: {validation['error']}"
+                elif not row["is_resume"]:
+                    row["error"] = "Not a valid resume"
+            if row["error"] is None:
+                analysis = self.analyze_resume(resume_text, job_description, use_cache=use_cache)
+                row["analysis"] = analysis
+                if "error" in analysis:
+                    row["error"] = analysis["error"]
+                else:
+                    row["match_score"] = analysis.get("match_score", 0)
+                    row["recommendation"] = analysis.get("recommendation", "N/A")
+        except Exception as e:
+            row["error"] = str(e)
+        row["elapsed"] = time.perf_counter() - start
+        return row
+
+    def _screen_batch(self, name: str, text: str, job_description: str, validate: bool, use_cache: bool):
+        # Bulk screening yields to interactive requests sharing the same gateway
+        with self.gateway.lane("batch"):
+            return self.screen_resume(name, text, job_description, validate, use_cache)
+
+    def analyze_many(self, resumes, job_description: str, max_workers: int = 8, validate: bool = True,
+                     use_cache: bool = True):
+        """
+        Screens many resumes against one job description with bounded LLM concurrency.
+        `resumes` is an iterable of (name, text) pairs and is consumed lazily, so it can be fed by a
+        parsing pipeline. Yields one row per candidate (see screen_resume) in completion order.
+        """
+        resumes = iter(resumes)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            exhausted = False
+            while pending or not exhausted:
+                # Keep at most max_workers calls in flight; pull more input only when a slot frees up
+                while not exhausted and len(pending) < max_workers:
+                    try:
+                        name, text = next(resumes)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(executor.submit(self._screen_batch, name, text, job_description,
+                                                validate, use_cache))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from functools import lru_cache
+
+# Canonical skill name -> aliases. Matching is case-insensitive on whole words, so aliases only need
+# the spellings that differ; the canonical name matches itself unless it is in ALIAS_ONLY. Aliases
+# that are also common English or resume words ("rest", "spring", "node", "lambda", "ci", "ml") and
+# one-letter languages (C, R) are left out: a wrong skill in the prompt is worse than one the model
+# has to find itself.
+DEFAULT_TAXONOMY = {
+    # Languages
+    "Python": ["python3", "py3"],
+    "Java": ["java 8", "java 11", "java 17"],
+    "JavaScript": ["js", "ecmascript", "es6"],
+    "TypeScript": [],
+    "Go": ["golang"],
+    "Rust": ["rustlang"],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["csharp", "c sharp"],
+    "Kotlin": [],
+    "Swift": ["swiftui", "swift programming"],
+    "Scala": [],
+    "Ruby": [],
+    "PHP": [],
+    "SQL": ["t-sql", "pl/sql", "ansi sql"],
+    "Bash": ["shell scripting", "shell script"],
+    "MATLAB": [],
+    # Web and backend frameworks
+    "React": ["react.js", "reactjs"],
+    "Angular": ["angular.js", "angularjs"],
+    "Vue.js": ["vue", "vuejs"],
+    "Next.js": ["nextjs"],
+    "Node.js": ["nodejs", "node js"],
+    "Express.js": ["expressjs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": [],
+    "Spring Boot": ["springboot", "spring framework", "spring mvc"],
+    "Ruby on Rails": ["ror"],
+    ".NET": ["dotnet", "asp.net", ".net core"],
+    "GraphQL": [],
+    "REST APIs": ["restful", "rest api", "restful apis"],
+    "gRPC": [],
+    "HTML": ["html5"],
+    "CSS": ["css3", "sass", "scss"],
+    # Data stores and messaging
+    "PostgreSQL": ["postgres", "psql"],
+    "MySQL": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search", "opensearch"],
+    "Cassandra": [],
+    "DynamoDB": [],
+    "Snowflake": [],
+    "BigQuery": ["big query"],
+    "Kafka": ["apache kafka"],
+    "RabbitMQ": [],
+    # Cloud and infrastructure
+    "AWS": ["amazon web services", "ec2", "s3", "aws lambda"],
+    "Azure": ["microsoft azure"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Docker": ["containerization", "containerized"],
+    "Kubernetes": ["k8s", "eks", "gke", "aks"],
+    "Terraform": ["iac", "infrastructure as code"],
+    "Ansible": [],
+    "Helm": ["helm chart", "helm charts"],
+    "CI/CD": ["ci/cd pipelines", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": [],
+    "GitHub Actions": [],
+    "Git": ["github", "gitlab"],
+    "Linux": ["unix", "ubuntu"],
+    "Prometheus": [],
+    "Grafana": [],
+    "Microservices": ["microservice", "micro-services"],
+    # Data and machine learning
+    "Machine Learning": ["machine-learning"],
+    "Deep Learning": ["neural networks"],
+    "NLP": ["natural language processing"],
+    "Computer Vision": ["image recognition"],
+    "LLMs": ["llm", "large language models", "generative ai", "genai"],
+    "PyTorch": ["torch"],
+    "TensorFlow": ["keras"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Spark": ["apache spark", "pyspark", "spark sql", "spark streaming"],
+    "Hadoop": [],
+    "Airflow": ["apache airflow"],
+    "dbt": [],
+    "ETL": ["elt", "data pipelines"],
+    "Data Visualization": ["tableau", "power bi", "looker"],
+    "Statistics": ["statistical analysis"],
+    "MLOps": ["mlflow", "kubeflow"],
+    # Practices and soft skills that job descriptions ask for explicitly
+    "Agile": ["scrum", "kanban"],
+    "Testing": ["unit testing", "integration testing", "test automation", "pytest", "junit", "tdd"],
+    "System Design": ["distributed systems"],
+    "Communication": ["communication skills"],
+    "Leadership": ["team lead", "mentoring"],
+}
+
+# Skills whose name is also an everyday word ("go the extra mile", "at the helm", "spark new ideas",
+# "swift-paced"); they are found only through their aliases
+ALIAS_ONLY = {"Go", "Swift", "Helm", "Spark", "Testing"}
+
+
+class SkillMatcher:
+    """
+    Finds taxonomy skills in text with an Aho-Corasick automaton over every alias, so a document is
+    scanned once, left to right, whatever the taxonomy size. Matches must start and end on word
+    boundaries ("Java" does not match inside "JavaScript"). Skills in `alias_only` (ALIAS_ONLY by
+    default) are not matched by their own name. The automaton is built once and is read-only
+    afterwards, so one matcher can be shared by all threads.
+    """
+
+    def __init__(self, taxonomy: dict = None, alias_only=None):
+        self.taxonomy = dict(DEFAULT_TAXONOMY if taxonomy is None else taxonomy)
+        self.alias_only = set(ALIAS_ONLY if alias_only is None else alias_only)
+        # Canonical name -> the lower-cased spellings that are matched for it
+        self.aliases = {
+            canonical: {alias.lower() for alias in aliases} | (set() if canonical in self.alias_only else {canonical.lower()})
+            for canonical, aliases in self.taxonomy.items()
+        }
+        # Stable across processes, for cache keys of results that depend on the taxonomy
+        spec = json.dumps([self.taxonomy, sorted(self.alias_only)], sort_keys=True)
+        self.signature = hashlib.sha256(spec.encode("utf-8")).hexdigest()[:16]
+        self._build()
+        # Job descriptions repeat across a batch, so their skills are computed once
+        self.required_skills = lru_cache(maxsize=64)(self.extract)
+
+    @classmethod
+    def from_file(cls, path: str, extend: bool = True) -> "SkillMatcher":
+        """
+        Loads a JSON taxonomy ({"Canonical name": ["alias", ...]}), added to the default one unless extend=False.
+        """
+        with open(path, encoding="utf-8") as f:
+            taxonomy = json.load(f)
+        if extend:
+            taxonomy = {**DEFAULT_TAXONOMY, **taxonomy}
+        return cls(taxonomy)
+
+    def _build(self):
+        # Trie of the lower-cased aliases: _goto[state] maps a character to the next state and
+        # _outputs[state] lists (alias length, canonical name) for aliases ending there
+        self._goto = [{}]
+        self._outputs = [[]]
+        for canonical, aliases in self.aliases.items():
+            for alias in aliases:
+                state = 0
+                for char in alias:
+                    if char not in self._goto[state]:
+                        self._goto.append({})
+                        self._outputs.append([])
+                        self._goto[state][char] = len(self._goto) - 1
+                    state = self._goto[state][char]
+                self._outputs[state].append((len(alias), canonical))
+
+        # Breadth-first failure links, folded into the transitions so scanning never backtracks: once a
+        # state is dequeued it gets its failure state's edges for every character it has no child for
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fail[child] = self._goto[fail[state]].get(char, 0) if state else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[fail[child]]
+                queue.append(child)
+            for char, target in self._goto[fail[state]].items():
+                self._goto[state].setdefault(char, target)
+
+    def find(self, text: str) -> dict:
+        """
+        Returns {canonical skill: occurrences} for every taxonomy skill in `text`.
+        """
+        goto, outputs = self._goto, self._outputs
+        lowered = text.lower()
+        end = len(lowered)
+        found = {}
+        state = 0
+        for pos, char in enumerate(lowered):
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                # A match counts only if the characters on either side are not part of a word
+                if pos + 1 < end and lowered[pos + 1].isalnum():
+                    continue
+                for length, canonical in outputs[state]:
+                    start = pos - length + 1
+                    if start == 0 or not lowered[start - 1].isalnum():
+                        found[canonical] = found.get(canonical, 0) + 1
+        return found
+
+    def extract(self, text: str) -> list:
+        """
+        Returns the canonical names of the taxonomy skills in `text`, in taxonomy order.
+        """
+        found = self.find(text)
+        return [skill for skill in self.taxonomy if skill in found]
+
+    def match(self, resume_text: str, job_description: str) -> dict:
+        """
+        Compares the skills of a resume with those the job description asks for.
+        Returns "required_skills", "resume_skills", "matching_skills", "missing_skills" and
+        "skills_score" (0-100 share of required skills present, None if the job names none).
+        """
+        required = self.required_skills(job_description)
+        resume = self.extract(resume_text)
+        present = set(resume)
+        matching = [skill for skill in required if skill in present]
+        return {
+            "required_skills": required,
+            "resume_skills": resume,
+            "matching_skills": matching,
+            "missing_skills": [skill for skill in required if skill not in present],
+            "skills_score": round(100 * len(matching) / len(required)) if required else None,
+        }
+
+
+_default_matcher = None
+_default_lock = threading.Lock()
+
+
+def default_skill_matcher() -> SkillMatcher:
+    """
+    Returns the process-wide matcher for DEFAULT_TAXONOMY, extended with the JSON file named by the
+    SKILL_TAXONOMY_PATH environment variable if set. Built on first use.
+    """
+    global _default_matcher
+    with _default_lock:
+        if _default_matcher is None:
+            path = os.getenv("SKILL_TAXONOMY_PATH")
+            _default_matcher = SkillMatcher.from_file(path) if path else SkillMatcher()
+        return _default_matcher
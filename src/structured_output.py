@@ -0,0 +1,273 @@
+import json
+import re
+
+TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+LITERALS = {"True": "true", "False": "false", "None": "null"}
+SCORE_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def extract_json_object(text: str):
+    """
+    Returns (object_text, truncated) for the first JSON object in `text`, ignoring any preamble or
+    ```json fences around it. When the object never closes, the text from its opening brace to the
+    end is returned with truncated=True. Returns (None, False) if there is no object at all.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None, False
+    depth, quote, escape = 0, None, False
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if quote:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1], False
+    return text[start:], True
+
+
+def _normalize(text: str):
+    # One pass outside strings: single-quoted strings become double-quoted, Python literals become
+    # JSON ones. Also returns the positions of commas outside strings with the open containers there,
+    # which are the places a truncated object can be cut and closed
+    out, stack, cuts = [], [], []
+    quote, escape, pos = None, False, 0
+    while pos < len(text):
+        char = text[pos]
+        if quote:
+            if escape:
+                escape = False
+                out.append(char)
+            elif char == "\\" and quote == "'" and text[pos + 1:pos + 2] == "'":
+                # \' is not a valid JSON escape, and inside double quotes it needs none
+                out.append("'")
+                pos += 2
+                continue
+            elif char == "\\":
+                escape = True
+                out.append(char)
+            elif char == quote:
+                quote = None
+                out.append('"')
+            elif char == '"' and quote == "'":
+                out.append('\\"')
+            else:
+                out.append(char)
+            pos += 1
+            continue
+        if char in "\"'":
+            quote = char
+            out.append('"')
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            out.append(char)
+        elif char == ",":
+            cuts.append((len(out), list(stack)))
+            out.append(char)
+        elif char.isalpha():
+            end = pos
+            while end < len(text) and text[end].isalpha():
+                end += 1
+            word = text[pos:end]
+            out.append(LITERALS.get(word, word))
+            pos = end
+            continue
+        else:
+            out.append(char)
+        pos += 1
+    return "".join(out), stack, cuts, quote is not None
+
+
+def repair_json(text: str):
+    """
+    Parses `text` as a JSON object, repairing the defects LLMs commonly produce: surrounding prose or
+    code fences, single-quoted strings, Python literals, trailing commas and truncated output (the
+    incomplete tail is dropped back to the last complete top-level member, so a list or object that
+    was cut off counts as missing rather than being returned partially). Returns (dict or None,
+    repairs) where repairs lists what had to be fixed.
+    """
+    candidate, truncated = extract_json_object(text)
+    if candidate is None:
+        return None, []
+    try:
+        data = json.loads(candidate)
+        return (data, []) if isinstance(data, dict) else (None, [])
+    except json.JSONDecodeError:
+        pass
+
+    repairs = []
+    normalized, stack, cuts, open_string = _normalize(candidate)
+    if normalized != candidate:
+        repairs.append("quotes_or_literals")
+    without_commas = TRAILING_COMMA_RE.sub(r"\1", normalized)
+    if without_commas != normalized:
+        repairs.append("trailing_commas")
+    if truncated or stack:
+        repairs.append("truncation")
+
+    attempts = []
+    # Closing the object is only safe after a complete top-level value; a cut-off string or number
+    # ("summary": "Stro / "match_score": 8) or a nested list ("matching_skills": ["Python", "SQL")
+    # would otherwise be accepted with the wrong or partial content
+    if not open_string and len(stack) <= 1 and without_commas.rstrip().endswith(("}", "]", '"')):
+        attempts.append(without_commas + "".join(reversed(stack)))
+    # Otherwise cut back to each earlier comma between top-level members and close the object there
+    attempts += [TRAILING_COMMA_RE.sub(r"\1", normalized[:cut]) + "".join(reversed(open_at_cut))
+                 for cut, open_at_cut in reversed(cuts) if len(open_at_cut) == 1]
+    for attempt in attempts:
+        try:
+            data = json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data, repairs
+    return None, repairs
+
+
+# Field validators: each returns the value coerced to its schema type or raises ValueError
+
+def score(value) -> int:
+    if isinstance(value, str):
+        match = SCORE_RE.search(value)
+        if match is None:
+            raise ValueError("not a score")
+        value = match.group()
+    value = round(float(value))
+    if not 0 <= value <= 100:
+        raise ValueError("score out of range")
+    return int(value)
+
+
+def string(value) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("not a non-empty string")
+    return value
+
+
+def boolean(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    raise ValueError("not a boolean")
+
+
+def optional_number(value):
+    if value is None:
+        return None
+    return float(value) if not isinstance(value, (int, float)) else value
+
+
+def string_list(value) -> list:
+    if isinstance(value, str):
+        value = [part.strip() for part in value.split(",") if part.strip()]
+    if not isinstance(value, list):
+        raise ValueError("not a list")
+    return [str(item) for item in value]
+
+
+def choice(*options):
+    def validate(value) -> str:
+        for option in options:
+            if isinstance(value, str) and value.strip().lower() == option.lower():
+                return option
+        raise ValueError(f"not one of {options}")
+    return validate
+
+
+def scores(*keys):
+    def validate(value) -> dict:
+        if not isinstance(value, dict):
+            raise ValueError("not an object")
+        return {key: score(value[key]) for key in keys}
+    return validate
+
+
+def object_list(*keys, allow_strings: bool = False):
+    def validate(value) -> list:
+        if not isinstance(value, list):
+            raise ValueError("not a list")
+        items = []
+        for item in value:
+            if allow_strings and isinstance(item, str):
+                items.append(item)
+            elif isinstance(item, dict) and all(key in item for key in keys):
+                items.append(item)
+            else:
+                raise ValueError(f"list items need {keys}")
+        return items
+    return validate
+
+
+ANALYSIS_SCHEMA = {
+    "match_score": score,
+    "missing_skills": string_list,
+    "matching_skills": string_list,
+    "summary": string,
+    "recommendation": choice("Hire", "Interview", "Reject"),
+    "interview_questions": object_list("question", allow_strings=True),
+    "match_breakdown": scores("skills_match", "experience_match", "education_match", "communication_style"),
+    "resume_improvements": object_list("section", "suggestion"),
+}
+
+VALIDATION_SCHEMA = {
+    "is_resume": boolean,
+    "document_type": string,
+    "confidence": optional_number,
+}
+
+
+def validate_field(schema: dict, key: str, value):
+    """
+    Returns (True, coerced value) if `value` is valid for `key`, else (False, None).
+    Keys outside the schema are passed through unchanged.
+    """
+    validator = schema.get(key)
+    if validator is None:
+        return True, value
+    try:
+        return True, validator(value)
+    except (ValueError, TypeError, KeyError):
+        return False, None
+
+
+def validate(data: dict, schema: dict):
+    """
+    Validates `data` against `schema`. Returns (valid fields, names of missing or invalid fields).
+    """
+    result, missing = {}, []
+    for key, value in data.items():
+        ok, coerced = validate_field(schema, key, value)
+        if ok:
+            result[key] = coerced
+    for key in schema:
+        if key not in result:
+            missing.append(key)
+    return result, missing
+
+
+def parse_structured(text: str, schema: dict):
+    """
+    Extracts, repairs and validates a model response in one step.
+    Returns (valid fields, missing field names, repairs applied); the fields are empty if no object
+    could be recovered at all.
+    """
+    data, repairs = repair_json(text)
+    if data is None:
+        return {}, list(schema), repairs
+    result, missing = validate(data, schema)
+    return result, missing, repairs
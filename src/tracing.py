@@ -0,0 +1,224 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+# USD per million tokens (input, output); used for cost estimates only, update when pricing changes
+MODEL_PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+# Upper bounds (seconds) of the Prometheus latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return 0.0
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1e6
+
+
+class _NullSpan:
+    # Shared do-nothing span handed out while tracing is disabled, so instrumented code costs one call
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name: str, attributes: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.id = None
+        self.parent = None
+        self.start = None
+
+    def __enter__(self):
+        self.id, self.parent = self.tracer._push()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self.start
+        self.tracer._pop()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.tracer._finish(self.name, duration, self.attributes, self.id, self.parent)
+        return False
+
+    def set(self, **attributes):
+        """
+        Adds attributes (token counts, model name, result sizes...) once they are known.
+        """
+        self.attributes.update(attributes)
+
+
+class Tracer:
+    """
+    Process-wide, opt-in span recorder for the pipeline stages (parse, clean, validate, analyze, llm,
+    post_process). Finished spans are kept in a bounded in-memory buffer, aggregated per stage and per
+    model, optionally appended to a JSON-lines log, and can be exported in Prometheus text format.
+    While disabled, span() returns a shared no-op object and nothing is recorded.
+    """
+
+    def __init__(self, enabled: bool = False, log_path: str = None, max_spans: int = 1000):
+        self.enabled = enabled
+        self.log_path = log_path
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._reset_aggregates()
+
+    def configure(self, enabled: bool = None, log_path: str = None):
+        if enabled is not None:
+            self.enabled = enabled
+        if log_path is not None:
+            self.log_path = log_path or None
+
+    def _reset_aggregates(self):
+        self._counts = Counter()
+        self._seconds = Counter()
+        self._buckets = {}
+        self._tokens = Counter()
+        self._cost = Counter()
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._reset_aggregates()
+
+    def span(self, name: str, **attributes):
+        """
+        Context manager timing one stage. Spans opened inside it on the same thread record it as parent.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attributes)
+
+    def record(self, name: str, duration: float, **attributes):
+        """
+        Records a span that was timed elsewhere (e.g. in a worker process or across a stream).
+        """
+        if self.enabled:
+            stack = getattr(self._local, "stack", None)
+            self._finish(name, duration, attributes, next(self._ids), stack[-1] if stack else None)
+
+    def _push(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        span_id = next(self._ids)
+        parent = stack[-1] if stack else None
+        stack.append(span_id)
+        return span_id, parent
+
+    def _pop(self):
+        self._local.stack.pop()
+
+    def _finish(self, name: str, duration: float, attributes: dict, span_id: int, parent):
+        model = attributes.get("model")
+        input_tokens = attributes.get("input_tokens", 0) or 0
+        output_tokens = attributes.get("output_tokens", 0) or 0
+        if model and (input_tokens or output_tokens):
+            attributes.setdefault("cost_usd", estimate_cost(model, input_tokens, output_tokens))
+        record = {"ts": time.time(), "span": name, "id": span_id, "parent": parent,
+                  "duration_ms": duration * 1000, **attributes}
+        with self._lock:
+            self._spans.append(record)
+            self._counts[name] += 1
+            self._seconds[name] += duration
+            buckets = self._buckets.setdefault(name, [0] * len(BUCKETS))
+            for i, bound in enumerate(BUCKETS):
+                if duration <= bound:
+                    buckets[i] += 1
+            if model:
+                self._tokens[(model, "input")] += input_tokens
+                self._tokens[(model, "output")] += output_tokens
+                self._cost[model] += attributes.get("cost_usd", 0.0)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    def recent(self, limit: int = 50) -> list:
+        with self._lock:
+            return list(self._spans)[-limit:]
+
+    def summary(self) -> dict:
+        """
+        Per-stage {"count", "total_seconds", "mean_ms", "p50_ms", "p95_ms"} (percentiles over the
+        buffered spans) and per-model {"input_tokens", "output_tokens", "cost_usd"}.
+        """
+        with self._lock:
+            spans = list(self._spans)
+            counts, seconds = dict(self._counts), dict(self._seconds)
+            tokens, cost = dict(self._tokens), dict(self._cost)
+        durations = {}
+        for record in spans:
+            durations.setdefault(record["span"], []).append(record["duration_ms"])
+        stages = {}
+        for name, count in counts.items():
+            recent = sorted(durations.get(name, [0.0]))
+            stages[name] = {
+                "count": count,
+                "total_seconds": seconds[name],
+                "mean_ms": seconds[name] / count * 1000,
+                "p50_ms": recent[len(recent) // 2],
+                "p95_ms": recent[min(len(recent) - 1, int(len(recent) * 0.95))],
+            }
+        models = {}
+        for (model, direction), count in tokens.items():
+            models.setdefault(model, {"input_tokens": 0, "output_tokens": 0, "cost_usd": cost.get(model, 0.0)})
+            models[model][f"{direction}_tokens"] = count
+        return {"stages": stages, "models": models}
+
+    def prometheus(self) -> str:
+        """
+        Returns all aggregates in the Prometheus text exposition format.
+        """
+        with self._lock:
+            counts, seconds = dict(self._counts), dict(self._seconds)
+            buckets = {name: list(values) for name, values in self._buckets.items()}
+            tokens, cost = dict(self._tokens), dict(self._cost)
+        lines = ["# HELP resume_analyzer_stage_seconds Time spent per pipeline stage.",
+                 "# TYPE resume_analyzer_stage_seconds histogram"]
+        for name in sorted(counts):
+            for bound, count in zip(BUCKETS, buckets[name]):
+                lines.append(f'resume_analyzer_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'resume_analyzer_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {counts[name]}')
+            lines.append(f'resume_analyzer_stage_seconds_sum{{stage="{name}"}} {seconds[name]:.6f}')
+            lines.append(f'resume_analyzer_stage_seconds_count{{stage="{name}"}} {counts[name]}')
+        lines += ["# HELP resume_analyzer_llm_tokens_total LLM tokens by model and direction.",
+                  "# TYPE resume_analyzer_llm_tokens_total counter"]
+        for (model, direction), count in sorted(tokens.items()):
+            lines.append(f'resume_analyzer_llm_tokens_total{{model="{model}",direction="{direction}"}} {count}')
+        lines += ["# HELP resume_analyzer_llm_cost_usd_total Estimated LLM cost by model.",
+                  "# TYPE resume_analyzer_llm_cost_usd_total counter"]
+        for model, value in sorted(cost.items()):
+            lines.append(f'resume_analyzer_llm_cost_usd_total{{model="{model}"}} {value:.6f}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        # Written atomically so a node-exporter textfile collector never reads a partial file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(temp_path, path)
+
+
+# The process-wide tracer used by the parser and the RAG engine; disabled until configured
+tracer = Tracer()
@@ -1,4 +1,9 @@
 import re
+import time
+import unicodedata
+from collections import Counter
+
+from src.classifier import HEADING_RE
 
 def clean_text(text: str) -> str:
     """
@@ -15,3 +20,150 @@ def clean_text(text: str) -> str:
     # text = text.encode("ascii", "ignore").decode()
     
     return text
+
+
+def estimate_tokens(text: str) -> int:
+    # Same ~4 characters per token heuristic used for usage estimates elsewhere in the project
+    return len(text) // 4
+
+
+# Applied after NFKC, which already folds ligatures (ﬁ -> fi), full-width forms and non-breaking spaces.
+# Bullet glyphs (including the private-use ones Word/Wingdings fonts leave in PDFs) become "-",
+# typographic quotes and dashes become ASCII, and invisible characters are dropped
+FOLD_MAP = {
+    **dict.fromkeys("•◦▪▫●○■□►▶▸➢➤✓✔❖◆◇⁃‣∙\uf0a7\uf0b7\uf0d8\uf0fc\uf076", "-"),
+    **dict.fromkeys("‘’‚′", "'"),
+    **dict.fromkeys("“”„″", '"'),
+    **dict.fromkeys("\u2010\u2011\u2012–—―−", "-"),
+    **dict.fromkeys("\u00ad\u200b\u200c\u200d\u2060\ufeff", ""),
+}
+# One compiled scan instead of str.translate, which is slow for non-ASCII tables
+FOLD_RE = re.compile("[" + "".join(FOLD_MAP) + "]")
+
+PAGE_NUMBER_RE = re.compile(r"(?:page\s*)?-?\s*\d{1,3}\s*(?:(?:/|of)\s*\d{1,3})?\s*-?", re.I)
+# Explicit page references inside a header or footer line ("Page 2", "2 of 3", "2/3"). Other numbers are
+# kept, so content lines such as "Acme Corp 2019" / "Acme Corp 2021" or "10 years of Python" / "5 years
+# of Python" stay distinct and are never mistaken for a running header
+PAGE_REF_RE = re.compile(r"\bpage\s*\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?\b|\b\d{1,3}\s*(?:/|of)\s*\d{1,3}\b")
+HYPHENATED_RE = re.compile(r"[^\W\d_]-$")
+# Lines examined at the top and bottom of each page when looking for running headers and footers
+EDGE_LINES = 3
+
+
+def normalize_pages(pages, dedupe_edges: bool = True, report: dict = None) -> str:
+    """
+    Normalizes extracted text page by page before it is joined: Unicode NFKC, ligature, bullet,
+    quote and dash folding, whitespace collapsed within lines, page numbers and running headers/footers
+    repeated across pages dropped (the first occurrence of a header is kept), words hyphenated across
+    a line break rejoined, and recognised section headings marked as "## Heading" on their own line.
+    Pass dedupe_edges=False when the items are not real pages (DOCX/TXT blocks).
+    If `report` is given it is filled with chars/tokens before and after, what was removed or
+    rejoined, and the seconds taken.
+    """
+    start = time.perf_counter()
+    chars_before = 0
+    folded = []
+    for page in pages:
+        chars_before += len(page)
+        text = page
+        # Pure-ASCII pages (most DOCX/TXT text) have nothing to normalize or fold
+        if not text.isascii():
+            text = FOLD_RE.sub(_fold, unicodedata.normalize("NFKC", text))
+        folded.append([" ".join(line.split()) for line in text.splitlines()])
+
+    counts = Counter()
+    repeated = _repeated_edges(folded) if dedupe_edges and len(folded) > 1 else set()
+    lines = []
+    for number, page in enumerate(folded):
+        edges = _edge_indexes(page) if dedupe_edges else ()
+        for index, line in enumerate(page):
+            if index in edges:
+                if PAGE_NUMBER_RE.fullmatch(line):
+                    counts["page_numbers"] += 1
+                    continue
+                if number and _edge_key(line) in repeated:
+                    counts["header_footer_lines"] += 1
+                    continue
+            _append_line(lines, line, counts)
+
+    text = "\n".join(lines)
+    if report is not None:
+        # Counted as if the pages were joined with single separators, as parse() used to do
+        chars_before += max(len(folded) - 1, 0)
+        report.update(counts)
+        report.update({
+            "chars_before": chars_before,
+            "chars_after": len(text),
+            "tokens_before": chars_before // 4,
+            "tokens_after": estimate_tokens(text),
+            "seconds": time.perf_counter() - start,
+        })
+    return text
+
+
+def _fold(match) -> str:
+    return FOLD_MAP[match.group()]
+
+
+def _edge_indexes(lines: list) -> set:
+    content = [index for index, line in enumerate(lines) if line]
+    return set(content[:EDGE_LINES] + content[-EDGE_LINES:])
+
+
+def _edge_key(line: str) -> str:
+    return PAGE_REF_RE.sub("#", line.lower())
+
+
+def _repeated_edges(pages: list) -> set:
+    # Edge lines (page references masked, so "Page 2 of 3" matches "Page 3 of 3") found on at least half the pages
+    seen = Counter()
+    for lines in pages:
+        seen.update({_edge_key(lines[index]) for index in _edge_indexes(lines)})
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {key for key, count in seen.items() if count >= threshold}
+
+
+def _append_line(lines: list, line: str, counts: Counter):
+    # Blank lines are dropped: paragraph and page breaks cost tokens and the heading markers carry the structure
+    if not line:
+        return
+    # "engi-" + "neering" -> "engineering", also across a page break
+    if lines and line[0].islower() and HYPHENATED_RE.search(lines[-1]):
+        lines[-1] = lines[-1][:-1] + line
+        counts["hyphenations"] += 1
+        return
+    if len(line) <= 40 and HEADING_RE.fullmatch(line):
+        lines.append(f"## {line.rstrip(':').rstrip()}")
+        counts["sections"] += 1
+        return
+    lines.append(line)
+
+
+def normalization_summary(reports) -> dict:
+    """
+    Totals a sequence of normalize_pages reports: documents, chars and estimated tokens before and
+    after and removed (absolute and as a fraction; negative when the section markers added more
+    than was removed), header/footer lines, page numbers, hyphenations, and throughput
+    in MB/s of input text.
+    """
+    totals = Counter()
+    documents = 0
+    for report in reports:
+        documents += 1
+        totals.update(report)
+    before = totals["chars_before"]
+    return {
+        "documents": documents,
+        "chars_before": before,
+        "chars_after": totals["chars_after"],
+        "tokens_before": totals["tokens_before"],
+        "tokens_after": totals["tokens_after"],
+        "chars_removed": before - totals["chars_after"],
+        "tokens_removed": totals["tokens_before"] - totals["tokens_after"],
+        "token_reduction": 1 - totals["tokens_after"] / totals["tokens_before"] if totals["tokens_before"] else 0.0,
+        "header_footer_lines": totals["header_footer_lines"],
+        "page_numbers": totals["page_numbers"],
+        "hyphenations": totals["hyphenations"],
+        "sections": totals["sections"],
+        "mb_per_second": before / 2 ** 20 / totals["seconds"] if totals["seconds"] else 0.0,
+    }
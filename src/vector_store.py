@@ -1,53 +1,553 @@
+import hashlib
+import json
 import os
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+import shutil
+import tempfile
+import threading
+import faiss
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
+from src.docstore import ChunkStore
+from src.embedding_cache import CachedEmbeddings
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.sqlite"
+DELTA_LOG = "delta.jsonl"
+DELTA_VECTORS = "delta.f32"
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+
+def build_index(index_type: str, vectors: np.ndarray, nlist: int = 1024, pq_m: int = 48, hnsw_m: int = 32):
+    """
+    Builds an empty-of-data but trained FAISS index of the given type for vectors shaped like `vectors`.
+    "flat" is exact search; "ivf_flat" and "ivf_pq" cluster vectors into nlist lists (the latter also
+    compresses them into pq_m-byte codes); "hnsw" is a graph index that needs no training.
+    """
+    dim = vectors.shape[1]
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        return faiss.IndexHNSWFlat(dim, hnsw_m)
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unsupported index type: {index_type}")
+
+    # Never ask for more clusters than there are training points
+    nlist = max(1, min(nlist, len(vectors)))
+    quantizer = faiss.IndexFlatL2(dim)
+    if index_type == "ivf_flat":
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+    else:
+        if dim % pq_m:
+            raise ValueError(f"pq_m ({pq_m}) must divide the embedding dimension ({dim})")
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, 8)
+    index.train(np.ascontiguousarray(vectors, dtype=np.float32))
+    return index
+
+
+def set_search_params(index, nprobe: int = None, ef_search: int = None):
+    """
+    Applies query-time knobs: nprobe (IVF lists scanned per query) and efSearch (HNSW beam width).
+    Larger values raise recall at the cost of latency; indexes without the knob are left unchanged.
+    """
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and nprobe:
+        ivf.nprobe = nprobe
+    if isinstance(index, faiss.IndexHNSW) and ef_search:
+        index.hnsw.efSearch = ef_search
+
+
+def min_train_size(index_type: str, nlist: int) -> int:
+    # FAISS wants ~39 points per centroid for k-means, and PQ needs 256 points for its 8-bit codebooks
+    if index_type == "ivf_flat":
+        return 39 * nlist
+    if index_type == "ivf_pq":
+        return max(39 * nlist, 256)
+    return 0
+
+
+def resume_key(text: str, metadata: dict) -> str:
+    # Candidate names are not unique, so a resume without an explicit ID or file name is keyed by its content
+    key = metadata.get("resume_id") or metadata.get("source")
+    return str(key) if key else hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class LazyHuggingFaceEmbeddings(Embeddings):
+    """
+    HuggingFaceEmbeddings that imports sentence-transformers and loads the model on the first embed
+    call rather than at construction, so creating a VectorStoreManager (or loading an index whose
+    chunks are all served from the embedding cache) never pays the model start-up cost.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
+        self.model_name = model_name
+        self._model = None
+        # Concurrent first calls (e.g. batch screening threads) must not load the model twice
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                from langchain_huggingface import HuggingFaceEmbeddings
+                self._model = HuggingFaceEmbeddings(model_name=self.model_name)
+        return self._model
+
+    def embed_documents(self, texts: list) -> list:
+        return self.model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list:
+        return self.model.embed_query(text)
+
+
+class StoreRetriever(BaseRetriever):
+    """
+    LangChain retriever over a VectorStoreManager's similarity_search.
+    """
+    store: object
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list:
+        return self.store.similarity_search(query, k=self.k)
+
 
 class VectorStoreManager:
-    def __init__(self, persist_directory="./data/faiss_index"):
+    def __init__(self, persist_directory="./data/faiss_index", embedding_model=None,
+                 embed_batch_size: int = 256, compact_every: int = 5000,
+                 embedding_cache_dir="./data/embedding_cache", index_type: str = "flat",
+                 nlist: int = 1024, pq_m: int = 48, hnsw_m: int = 32, nprobe: int = 16,
+                 ef_search: int = 64, mmap: bool = False):
         self.persist_directory = persist_directory
-        self.embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index type: {index_type}")
+        if os.path.exists(os.path.join(persist_directory, "index.pkl")):
+            raise ValueError(f"{persist_directory} holds an index saved in the old pickle format; "
+                             "delete it and re-ingest the resumes")
+        # Index backend; see build_index. IVF variants start as an exact flat index and are trained
+        # once enough vectors have been ingested (min_train_size)
+        self.index_type = index_type
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.hnsw_m = hnsw_m
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        # Memory-map the saved index instead of reading it into RAM (reloaded into memory on first write)
+        self.mmap = mmap
+        self._mmapped = False
+        # Lazily built (id_key, matrix) for rank_candidates; reset whenever vectors are added or removed
+        self._candidates = None
+        self.embedding_model = embedding_model or LazyHuggingFaceEmbeddings()
+        # Serve previously seen chunks from the on-disk cache; None disables it. A CachedEmbeddings passed
+        # in (e.g. the one a PromptCompactor uses) is used as is
+        if embedding_cache_dir and not isinstance(self.embedding_model, CachedEmbeddings):
+            self.embedding_model = CachedEmbeddings(self.embedding_model, embedding_cache_dir)
+        # Texts per embed_documents call; larger batches amortize model overhead
+        self.embed_batch_size = embed_batch_size
+        # Number of logged chunks after which the delta log is folded into the base index
+        self.compact_every = compact_every
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=200
+        )
+
+        # Chunk text and metadata stay on disk; the index maps vectors to chunk ids (IndexIDMap2)
+        self.docstore = ChunkStore(os.path.join(self.persist_directory, DOCSTORE_FILE))
+        # Ids of deleted chunks still in an index that cannot drop vectors in place (IVF, HNSW);
+        # searches skip them and compact() rebuilds the index without them
+        self._tombstones = np.empty(0, dtype=np.int64)
+
         # Load existing index if available
-        if os.path.exists(os.path.join(self.persist_directory, "index.faiss")):
-            self.vector_db = FAISS.load_local(self.persist_directory, self.embedding_model, allow_dangerous_deserialization=True)
+        if os.path.exists(os.path.join(self.persist_directory, INDEX_FILE)):
+            self.index = self._load_local()
         else:
-            self.vector_db = None # Lazy initialization or handle in add_resume
+            self.index = None # Lazy initialization or handle in add_resume
+
+        # Replay chunks added since the last compaction, then line the index up with the docstore
+        self.pending_deltas = self._replay_deltas()
+        self._reconcile()
 
     def add_resume(self, text: str, metadata: dict):
         """
-        Splits text and adds it to the vector store.
+        Splits text and adds it to the vector store, replacing any earlier copy of the same resume.
         """
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200
-        )
-        chunks = text_splitter.split_text(text)
-        documents = [Document(page_content=chunk, metadata=metadata) for chunk in chunks]
-        
-        if self.vector_db is None:
-            self.vector_db = FAISS.from_documents(documents, self.embedding_model)
+        self.add_resumes([(text, metadata)])
+
+    def add_resumes(self, batch, persist: bool = True) -> int:
+        """
+        Splits and embeds many resumes at once and upserts them into the vector store.
+        `batch` is an iterable of (text, metadata) pairs. Each resume is keyed by metadata "resume_id" or
+        "source" (the file name), or else a hash of its text, so re-adding a resume replaces its chunks
+        instead of duplicating them, and re-adding it unchanged is a no-op. Chunks from all resumes are embedded
+        together in batches of embed_batch_size, and new vectors are appended to the delta log
+        instead of rewriting the whole index. Returns the number of chunks indexed.
+        """
+        # The last copy of a resume wins, so one batch never indexes the same resume twice
+        resumes = {}
+        for text, metadata in batch:
+            resumes[resume_key(text, metadata)] = (text, metadata)
+        return self._upsert(resumes, persist)
+
+    def upsert_resume(self, resume_id: str, text: str, metadata: dict = None, persist: bool = True) -> int:
+        """
+        Indexes `text` as resume `resume_id`, replacing the vectors and chunks of any earlier version.
+        Returns the number of chunks indexed (0 if the resume was already stored unchanged).
+        """
+        return self._upsert({str(resume_id): (text, dict(metadata or {}))}, persist)
+
+    def delete_resume(self, resume_id: str) -> int:
+        """
+        Removes a resume's chunks and vectors. Returns the number of chunks removed.
+        """
+        with self.docstore.transaction():
+            removed = self.docstore.remove(str(resume_id))
+        self._remove_ids(np.asarray(removed, dtype=np.int64))
+        return len(removed)
+
+    def _upsert(self, resumes: dict, persist: bool) -> int:
+        pending = {}
+        for resume_id, (text, metadata) in resumes.items():
+            content = json.dumps([text, metadata], sort_keys=True, default=str)
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if self.docstore.digest(resume_id) == digest:
+                continue
+            pending[resume_id] = (self.text_splitter.split_text(text), metadata, digest)
+        if not pending:
+            return 0
+
+        texts = [chunk for chunks, _, _ in pending.values() for chunk in chunks]
+        vectors = [self._embed(texts[start:start + self.embed_batch_size])
+                   for start in range(0, len(texts), self.embed_batch_size)]
+        vectors = np.concatenate(vectors) if vectors else None
+
+        removed, ids = [], []
+        with self.docstore.transaction():
+            for resume_id, (chunks, metadata, digest) in pending.items():
+                old, new = self.docstore.put(resume_id, chunks, metadata, digest)
+                removed.extend(old)
+                ids.extend(new)
+            # Logged before the docstore commits: a crash in between leaves log records for ids that
+            # were never committed, which replay ignores
+            if persist and ids:
+                self._append_deltas(ids, vectors)
+        self._remove_ids(np.asarray(removed, dtype=np.int64))
+        if ids:
+            self._add_vectors(np.asarray(ids, dtype=np.int64), vectors)
+        if persist and self.pending_deltas >= self.compact_every:
+            self.compact()
+        return len(texts)
+
+    def compact(self):
+        """
+        Writes the full index to disk (dropping deleted vectors) and truncates the delta log.
+        Runs automatically every compact_every logged chunks; call it explicitly after a bulk import.
+        """
+        if self.index is None:
+            return
+        self._purge_tombstones()
+        # Save next to the live file and swap it in, so a memory-mapped index is never overwritten in place
+        staging = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(self.persist_directory)))
+        try:
+            faiss.write_index(self.index, os.path.join(staging, INDEX_FILE))
+            os.makedirs(self.persist_directory, exist_ok=True)
+            os.replace(os.path.join(staging, INDEX_FILE), os.path.join(self.persist_directory, INDEX_FILE))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        for name in (DELTA_LOG, DELTA_VECTORS):
+            path = os.path.join(self.persist_directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+        self.pending_deltas = 0
+
+    def _load_local(self):
+        # Optional mmap, plus the configured search parameters
+        index_path = os.path.join(self.persist_directory, INDEX_FILE)
+        if self.mmap:
+            # IO_FLAG_MMAP maps IVF lists but still copies flat vector storage into RAM; IO_FLAG_MMAP_IFC
+            # (faiss >= 1.10) maps flat and HNSW storage zero-copy, and any write would abort, see _writable
+            flags = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+            if flags is None or self.index_type.startswith("ivf"):
+                flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            index = faiss.read_index(index_path, flags)
+            self._mmapped = True
         else:
-            self.vector_db.add_documents(documents)
-            
-        self.vector_db.save_local(self.persist_directory)
+            index = faiss.read_index(index_path)
+        set_search_params(index, self.nprobe, self.ef_search)
+        return index
 
-    def add_resume(self, text: str, metadata: dict):
+    def _embed(self, texts):
+        # CachedEmbeddings hands back float32 rows directly; plain models return lists of floats
+        if isinstance(self.embedding_model, CachedEmbeddings):
+            return self.embedding_model.embed_documents_array(texts)
+        return np.asarray(self.embedding_model.embed_documents(texts), dtype=np.float32)
+
+    def embedding_stats(self) -> dict:
         """
-        Splits text and adds it to the vector store.
+        Hit rate and throughput of the embedding cache (empty when caching is disabled).
         """
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200
-        )
-        chunks = text_splitter.split_text(text)
-        documents = [Document(page_content=chunk, metadata=metadata) for chunk in chunks]
-        self.vector_db.add_documents(documents)
-        # self.vector_db.persist() # Chroma 0.4+ persists automatically or needs explicit call depending on version, generic langchain wrapper handles it usually.
+        if isinstance(self.embedding_model, CachedEmbeddings):
+            return self.embedding_model.stats()
+        return {}
+
+    def index_stats(self) -> dict:
+        """
+        Resumes and chunks stored, deleted vectors awaiting compaction, logged chunks and docstore size.
+        """
+        docstore = self.docstore.stats()
+        return {
+            "resumes": docstore["resumes"],
+            "chunks": docstore["chunks"],
+            "vectors": self.index.ntotal if self.index is not None else 0,
+            "tombstones": len(self._tombstones),
+            "pending_deltas": self.pending_deltas,
+            "docstore_bytes": docstore["bytes"],
+        }
+
+    def _inner(self):
+        return faiss.downcast_index(self.index.index)
+
+    def _wrap(self, inner, vectors, ids):
+        # Vectors are addressed by chunk id, so they can be removed without renumbering the docstore
+        set_search_params(inner, self.nprobe, self.ef_search)
+        index = faiss.IndexIDMap2(inner)
+        if len(ids):
+            index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), ids)
+        return index
+
+    def _index_ids(self) -> np.ndarray:
+        if self.index is None:
+            return np.empty(0, dtype=np.int64)
+        return faiss.vector_to_array(self.index.id_map)
+
+    def _writable(self):
+        # Memory-mapped indexes are read-only; pull it into RAM before the first write
+        if not self._mmapped:
+            return
+        self.index = faiss.read_index(os.path.join(self.persist_directory, INDEX_FILE))
+        set_search_params(self.index, self.nprobe, self.ef_search)
+        self._mmapped = False
+        if len(self._tombstones) and isinstance(self._inner(), faiss.IndexFlat):
+            self.index.remove_ids(self._tombstones)
+            self._tombstones = np.empty(0, dtype=np.int64)
+
+    def _add_vectors(self, ids, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.index is None:
+            inner = build_index("hnsw" if self.index_type == "hnsw" else "flat", vectors[:1], hnsw_m=self.hnsw_m)
+            self.index = self._wrap(inner, vectors, ids)
+        else:
+            self._writable()
+            self.index.add_with_ids(vectors, ids)
+        self._candidates = None
+        self._maybe_train()
+
+    def _remove_ids(self, ids):
+        if self.index is None or not len(ids):
+            return
+        self._candidates = None
+        # A flat index drops vectors in place (a memmove); IVF and HNSW would need a rebuild
+        if isinstance(self._inner(), faiss.IndexFlat) and not self._mmapped:
+            self.index.remove_ids(ids)
+        else:
+            self._tombstones = np.union1d(self._tombstones, ids)
+
+    def _reconstruct_all(self):
+        # Vectors in index order, matching _index_ids
+        inner = self._inner()
+        ivf = faiss.try_extract_index_ivf(inner)
+        if ivf is not None:
+            # IVF lists are not addressable by position until a direct map exists
+            ivf.make_direct_map()
+        return inner.reconstruct_n(0, inner.ntotal)
+
+    def _purge_tombstones(self):
+        if not len(self._tombstones):
+            return
+        self._writable()
+        if not len(self._tombstones):
+            return
+        ids = self._index_ids()
+        keep = ~np.isin(ids, self._tombstones)
+        vectors = self._reconstruct_all()[keep]
+        # A cloned index keeps its training (IVF centroids, PQ codebooks); only the vectors are re-added
+        fresh = faiss.clone_index(self._inner())
+        fresh.reset()
+        self.index = self._wrap(fresh, vectors, ids[keep])
+        self._tombstones = np.empty(0, dtype=np.int64)
+
+    def _maybe_train(self):
+        # Swap the bootstrap flat index for the configured IVF index once there is enough data to train it
+        inner = self._inner()
+        if self.index_type not in ("ivf_flat", "ivf_pq") or not isinstance(inner, faiss.IndexFlat):
+            return
+        if inner.ntotal < min_train_size(self.index_type, self.nlist):
+            return
+        vectors = inner.reconstruct_n(0, inner.ntotal)
+        trained = build_index(self.index_type, vectors, nlist=self.nlist, pq_m=self.pq_m)
+        self.index = self._wrap(trained, vectors, self._index_ids())
+
+    def _append_deltas(self, ids, vectors):
+        os.makedirs(self.persist_directory, exist_ok=True)
+        array = np.asarray(vectors, dtype=np.float32)
+        dim = array.shape[1]
+        vectors_path = os.path.join(self.persist_directory, DELTA_VECTORS)
+        first_row = os.path.getsize(vectors_path) // (4 * dim) if os.path.exists(vectors_path) else 0
+        # Vectors are written before the log records that point at them, so a crash in between
+        # only leaves unreferenced rows behind
+        with open(vectors_path, "ab") as f:
+            # Drop any torn partial row left by an interrupted write
+            f.truncate(first_row * 4 * dim)
+            f.write(array.tobytes())
+        with open(os.path.join(self.persist_directory, DELTA_LOG), "a", encoding="utf-8") as f:
+            for offset, chunk_id in enumerate(ids):
+                f.write(json.dumps({"id": int(chunk_id), "dim": dim, "row": first_row + offset}) + "\n")
+        self.pending_deltas += len(ids)
+
+    def _replay_deltas(self) -> int:
+        log_path = os.path.join(self.persist_directory, DELTA_LOG)
+        vectors_path = os.path.join(self.persist_directory, DELTA_VECTORS)
+        if not os.path.exists(log_path) or not os.path.exists(vectors_path):
+            return 0
+
+        records = []
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn write from a crash; skip it
+                    continue
+        if not records:
+            return 0
+
+        dim = records[0]["dim"]
+        vectors = np.fromfile(vectors_path, dtype=np.float32)
+        vectors = vectors[:vectors.size // dim * dim].reshape(-1, dim)
+        # Only chunks the docstore still holds and the saved index does not already contain: later
+        # upserts and deletes supersede earlier records, and a crash mid-compaction can leave both
+        missing = set(np.setdiff1d(self.docstore.ids(), self._index_ids()).tolist())
+        replay = [r for r in records if r.get("id") in missing and r["row"] < len(vectors)]
+        if replay:
+            self._add_vectors(np.array([r["id"] for r in replay], dtype=np.int64), vectors[[r["row"] for r in replay]])
+        return len(records)
+
+    def _reconcile(self):
+        # Vectors whose chunks were deleted are removed (or tombstoned); chunks that never got a
+        # persisted vector (added with persist=False and never compacted) are dropped from the docstore
+        live, present = self.docstore.ids(), self._index_ids()
+        self._remove_ids(np.setdiff1d(present, live))
+        orphans = np.setdiff1d(live, present)
+        if len(orphans):
+            self.docstore.discard(orphans)
+
+    def rank_candidates(self, job_description: str, top_n: int = 10, aggregate: str = "max", top_k: int = 3,
+                        id_key: str = "resume_id", resume_ids=None) -> list:
+        """
+        Ranks stored resumes (not chunks) by similarity to a job description.
+        The description is embedded once and scored against every chunk with one matrix product;
+        chunk scores are then grouped by resume (or by metadata[id_key] when id_key is not "resume_id")
+        and aggregated per resume with "max" or "mean_top_k" (mean of the resume's top_k chunks).
+        `resume_ids` optionally restricts the pool.
+        Returns up to top_n dicts with "resume_id", "score", "chunks" and "metadata", best first.
+        """
+        if self.index is None or self.index.ntotal == len(self._tombstones):
+            return []
+        if aggregate not in ("max", "mean_top_k"):
+            raise ValueError(f"Unsupported aggregate: {aggregate}")
+
+        vectors, owners, owner_ids, owner_metadata = self._candidate_matrix(id_key)
+        query = np.asarray(self.embedding_model.embed_query(job_description), dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        # Cosine similarity of every chunk to the job description
+        scores = vectors @ query
+
+        if resume_ids is not None:
+            allowed = np.isin(owner_ids, list(resume_ids))
+            keep = allowed[owners]
+            scores, owners = scores[keep], owners[keep]
+            if not len(scores):
+                return []
+
+        counts = np.bincount(owners, minlength=len(owner_ids))
+        if aggregate == "max":
+            totals = np.full(len(owner_ids), -np.inf, dtype=np.float32)
+            np.maximum.at(totals, owners, scores)
+        else:
+            # Sort by (owner, -score) and keep each owner's first top_k rows
+            order = np.lexsort((-scores, owners))
+            sorted_owners = owners[order]
+            starts = np.searchsorted(sorted_owners, sorted_owners, side="left")
+            in_top_k = (np.arange(len(order)) - starts) < top_k
+            sums = np.bincount(sorted_owners[in_top_k], weights=scores[order][in_top_k], minlength=len(owner_ids))
+            totals = np.where(counts > 0, sums / np.maximum(np.minimum(counts, top_k), 1), -np.inf)
+
+        candidates = np.flatnonzero(counts > 0)
+        best = candidates[np.argsort(-totals[candidates], kind="stable")][:top_n]
+        return [
+            {"resume_id": owner_ids[i], "score": float(totals[i]), "chunks": int(counts[i]),
+             "metadata": owner_metadata[i]}
+            for i in best
+        ]
+
+    def _candidate_matrix(self, id_key: str):
+        # Normalized chunk vectors plus a chunk -> resume mapping, rebuilt only after the index changes
+        cached = self._candidates
+        if cached is not None and cached[0] == id_key:
+            return cached[1]
+
+        ids = self._index_ids()
+        vectors = self._reconstruct_all()
+        if len(self._tombstones):
+            keep = ~np.isin(ids, self._tombstones)
+            ids, vectors = ids[keep], vectors[keep]
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        # Two queries over the docstore instead of one lookup per chunk
+        chunk_resumes = self.docstore.owners()
+        resume_metadata = self.docstore.resume_metadata()
+        codes, owner_ids, owner_metadata = {}, [], []
+        owners = np.empty(len(ids), dtype=np.int64)
+        for position, chunk_id in enumerate(ids.tolist()):
+            resume_id = chunk_resumes[chunk_id]
+            metadata = resume_metadata[resume_id]
+            owner = resume_id if id_key == "resume_id" else metadata.get(id_key) or resume_id
+            if owner not in codes:
+                codes[owner] = len(owner_ids)
+                owner_ids.append(owner)
+                owner_metadata.append(metadata)
+            owners[position] = codes[owner]
+
+        result = (vectors, owners, np.array(owner_ids, dtype=object), owner_metadata)
+        self._candidates = (id_key, result)
+        return result
 
     def similarity_search(self, query: str, k: int = 3):
-        return self.vector_db.similarity_search(query, k=k)
+        """
+        Returns the k chunks nearest to `query` as Documents; only those k are read from the docstore.
+        """
+        if self.index is None or self.index.ntotal == 0:
+            return []
+        vector = np.asarray([self.embedding_model.embed_query(query)], dtype=np.float32)
+        if not len(self._tombstones):
+            _, ids = self.index.search(vector, k)
+        else:
+            # Deleted chunks still in an IVF/HNSW index are filtered inside the search
+            selector = faiss.IDSelectorNot(faiss.IDSelectorBatch(self._tombstones))
+            inner = self._inner()
+            if faiss.try_extract_index_ivf(inner) is not None:
+                params = faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+            elif isinstance(inner, faiss.IndexHNSW):
+                params = faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+            else:
+                params = faiss.SearchParameters(sel=selector)
+            _, ids = self.index.search(vector, k, params=params)
+        return self.docstore.get([int(chunk_id) for chunk_id in ids[0] if chunk_id >= 0])
 
-    def get_retriever(self):
-        return self.vector_db.as_retriever()
+    def get_retriever(self, k: int = 4):
+        return StoreRetriever(store=self, k=k)